@@ -1,4 +1,4 @@
-from .models import Agent
+from .models import Agent, VisitedMap
 
 class AgentFactory:
     @staticmethod
@@ -27,7 +27,7 @@ class AgentFactory:
             
         elif type_key == "explorer":
             new_agent.vision_radius = 5
-            new_agent.visited = set() # Memoria
+            new_agent.visited = VisitedMap() # Memoria
             
         elif type_key == "collector":
             new_agent.vision_radius = 10
@@ -1,6 +1,197 @@
 # backend/app/agents/models.py
 
-from typing import Dict, Any, List
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+# Posiciones que guarda cada agente por defecto (buffer circular)
+DEFAULT_PATH_CAPACITY = 500
+
+
+class PathHistory:
+    """
+    Historial de movimiento en un buffer circular compacto.
+
+    Guarda como máximo `capacity` posiciones con x, y intercaladas en un array de
+    enteros, así una simulación ilimitada no crece en memoria. `total` cuenta todas
+    las posiciones registradas desde el inicio, incluidas las ya descartadas.
+    """
+    __slots__ = ("capacity", "total", "_data", "_start")
+
+    def __init__(self, points=None, capacity: int = DEFAULT_PATH_CAPACITY):
+        self.capacity = max(1, int(capacity))
+        self.total = 0
+        self._data = array('i')
+        self._start = 0  # Índice (en posiciones) de la más antigua cuando el buffer está lleno
+        if points:
+            self.extend(points)
+
+    def append(self, point):
+        x, y = point
+        if len(self._data) < 2 * self.capacity:
+            self._data.append(x)
+            self._data.append(y)
+        else:
+            i = 2 * self._start
+            self._data[i] = x
+            self._data[i + 1] = y
+            self._start = (self._start + 1) % self.capacity
+        self.total += 1
+
+    def extend(self, points):
+        for point in points:
+            self.append(point)
+
+    def clear(self):
+        self._data = array('i')
+        self._start = 0
+        self.total = 0
+
+    def set_capacity(self, capacity: int):
+        """Cambia el límite conservando las posiciones más recientes."""
+        capacity = max(1, int(capacity))
+        if capacity == self.capacity:
+            return
+        points = self.tail(capacity)
+        total = self.total
+        self.capacity = capacity
+        self.clear()
+        self.extend(points)
+        self.total = total
+
+    def tail(self, n: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Últimas `n` posiciones en orden cronológico (todas las guardadas si n es None)."""
+        count = len(self)
+        n = count if n is None else max(0, min(n, count))
+        data, start, cap = self._data, self._start, self.capacity
+        points = []
+        for k in range(count - n, count):
+            i = 2 * ((start + k) % cap)
+            points.append((data[i], data[i + 1]))
+        return points
+
+    def to_list(self) -> List[Tuple[int, int]]:
+        return self.tail()
+
+    def __len__(self):
+        return len(self._data) // 2
+
+    def __iter__(self):
+        return iter(self.tail())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.tail()[index]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("PathHistory index out of range")
+        i = 2 * ((self._start + index) % self.capacity)
+        return self._data[i], self._data[i + 1]
+
+
+class VisitedMap:
+    """
+    Celdas que pisó un agente como mapa de bits: un bit por celda del grid
+    (índice x * height + y), en lugar de un set de tuplas que crece toda la
+    corrida. Se usa igual que el set (add, in, len, iteración). Si llega una
+    celda fuera del tamaño actual el mapa se agranda.
+    """
+    __slots__ = ("width", "height", "count", "_bits")
+
+    def __init__(self, width: int = 0, height: int = 0, cells=None):
+        self.width = max(0, int(width))
+        self.height = max(0, int(height))
+        self.count = 0
+        self._bits = bytearray((self.width * self.height + 7) // 8)
+        if cells:
+            for cell in cells:
+                self.add(cell)
+
+    def add(self, cell):
+        x, y = cell
+        if x < 0 or y < 0:
+            return
+        if x >= self.width or y >= self.height:
+            self.resize(max(self.width, x + 1), max(self.height, y + 1))
+        i = x * self.height + y
+        mask = 1 << (i & 7)
+        if not self._bits[i >> 3] & mask:
+            self._bits[i >> 3] |= mask
+            self.count += 1
+
+    def resize(self, width: int, height: int):
+        """Cambia el tamaño conservando las celdas que siguen dentro."""
+        cells = list(self)
+        self.width, self.height = int(width), int(height)
+        self.count = 0
+        self._bits = bytearray((self.width * self.height + 7) // 8)
+        for cell in cells:
+            if cell[0] < self.width and cell[1] < self.height:
+                self.add(cell)
+
+    def clear(self):
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+    def __contains__(self, cell) -> bool:
+        x, y = cell
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        i = x * self.height + y
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        H = self.height
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    i = byte_index * 8 + bit
+                    yield i // H, i % H
+
+
+class SearchStats:
+    """
+    Costo de las búsquedas de camino de un agente: la última llamada y el acumulado.
+    Solo cuentan las búsquedas reales (seguir un plan o un camino cacheado no suma).
+    `requested` es la estrategia que eligió el usuario y `used` la que corrió; si
+    el motor la reemplazó, `overrideReason` dice por qué (unknown_strategy,
+    weighted_terrain, large_map, dynamic_walls o unstable_layout).
+    """
+    __slots__ = ("calls", "expanded", "micros", "last")
+
+    def __init__(self):
+        self.calls = 0
+        self.expanded = 0
+        self.micros = 0
+        self.last: Optional[Dict[str, Any]] = None
+
+    def record(self, stats: Dict[str, Any]):
+        self.calls += 1
+        self.expanded += stats.get("expanded", 0)
+        self.micros += stats.get("micros", 0)
+        self.last = stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        last = self.last or {}
+        return {
+            "algorithm": last.get("algorithm"),
+            "requested": last.get("requested"),
+            "used": last.get("algorithm"),
+            "overrideReason": last.get("override"),
+            "expanded": last.get("expanded", 0),
+            "frontierPeak": last.get("frontier_peak", 0),
+            "micros": last.get("micros", 0),
+            "calls": self.calls,
+            "totalExpanded": self.expanded,
+            "totalMicros": self.micros,
+        }
+
 
 class Agent:
     def __init__(self, agent_id: str, x: int, y: int):
@@ -20,15 +211,20 @@ class Agent:
         self.steps_taken = 0      # Contador de pasos
         
         # Memoria interna
-        self.visited = set() 
+        self.visited = VisitedMap()  # El motor lo dimensiona al tamaño del grid
         self.inbox = [] 
         self.q_table = {}
         self.custom_code = None
         
         # Historial de movimiento (para estadísticas)
-        self.path_history = [(x, y)] # Guardamos el inicio
+        self.path_history = PathHistory([(x, y)]) # Guardamos el inicio
+        self.search_stats = SearchStats() # Costo de sus búsquedas de camino
 
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, path_tail: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Serializa el agente. Con `path_tail` solo se incluyen las últimas N posiciones
+        del historial (modo en vivo); sin él, todo lo que guarda el buffer.
+        """
         return {
             "id": self.id,
             "x": self.x,
@@ -39,5 +235,8 @@ class Agent:
             "strategy": self.strategy,
             "visionRadius": self.vision_radius,
             "steps": self.steps_taken,        
-            "path": self.path_history         
+            "path": self.path_history.tail(path_tail),
+            "pathTotal": self.path_history.total,
+            "cellsVisited": len(self.visited),
+            "search": self.search_stats.to_dict()
         }
\ No newline at end of file
@@ -0,0 +1,74 @@
+# backend/app/algorithms/assignment.py
+"""
+Asignación de tareas a agentes (p. ej. comida a cooperativos) con el algoritmo
+de subasta de Bertsekas.
+
+Cada agente puja por la tarea que más le conviene al precio actual (beneficio
+menos precio) y sube su precio en la diferencia con la segunda mejor opción más
+un ε; el dueño anterior de esa tarea vuelve a pujar. Un agente siempre puede
+quedarse sin tarea (beneficio 0, nunca sube de precio), así que sobran agentes
+o tareas sin problema.
+
+El beneficio de una tarea es `top - costo` con `top = n·max_costo + 1` (n =
+agentes que pujan): un agente más con tarea suma al menos `top - max_costo`,
+más de lo que cualquier reparto puede ahorrar en costo (a lo sumo
+(n-1)·max_costo), así que primero se asigna la mayor cantidad de agentes
+posible y, entre esos repartos, el de menor costo total. Con costos enteros y
+ε < 1/n el resultado es óptimo. Si hay muchos empates la subasta puede
+alargarse en pujas de a ε: cada BIDS_PER_AGENT pujas por agente ε se duplica,
+así el tiempo queda acotado y el resultado queda a menos de n·ε del óptimo
+(en ese caso la garantía de cantidad máxima ya no es exacta).
+
+Las opciones son ralas: cada agente lista solo las tareas que ve.
+"""
+from collections import deque
+from typing import Dict, Hashable, Optional
+
+NONE = object()  # Opción "sin tarea"
+BIDS_PER_AGENT = 64
+
+
+def auction_assignment(costs: Dict[Hashable, Dict[Hashable, int]],
+                       stats: Optional[Dict] = None) -> Dict[Hashable, Hashable]:
+    """
+    `costs`: agente -> {tarea: costo entero >= 0}. Devuelve agente -> tarea para
+    los agentes que recibieron una (cada tarea a lo sumo a uno).
+    """
+    bidders = [a for a, options in costs.items() if options]
+    if not bidders:
+        return {}
+    top = len(bidders) * max(c for a in bidders for c in costs[a].values()) + 1
+    benefit = {a: {t: top - c for t, c in costs[a].items()} for a in bidders}
+    prices: Dict[Hashable, float] = {}
+    owner: Dict[Hashable, Hashable] = {}
+    assigned: Dict[Hashable, Hashable] = {}
+    eps = 1.0 / (len(bidders) + 1)
+    bids = 0
+    budget = BIDS_PER_AGENT * len(bidders)
+    queue = deque(bidders)
+    while queue:
+        a = queue.popleft()
+        best, best_value, second_value = NONE, 0.0, 0.0
+        for t, b in benefit[a].items():
+            value = b - prices.get(t, 0.0)
+            if value > best_value:
+                best, best_value, second_value = t, value, best_value
+            elif value > second_value:
+                second_value = value
+        if best is NONE:
+            continue  # Ninguna tarea le deja beneficio: se queda sin tarea
+        bids += 1
+        if bids % budget == 0:
+            eps *= 2
+        prices[best] = prices.get(best, 0.0) + best_value - second_value + eps
+        previous = owner.get(best)
+        if previous is not None:
+            del assigned[previous]
+            queue.append(previous)
+        owner[best] = a
+        assigned[a] = best
+    if stats is not None:
+        stats["bids"] = bids
+        stats["bidders"] = len(bidders)
+        stats["eps"] = eps
+    return dict(assigned)
@@ -0,0 +1,239 @@
+# backend/app/algorithms/connectivity.py
+"""
+Índice de componentes conexas de las celdas transitables de un GridMap.
+
+Dos celdas están en la misma componente si existe algún camino entre ellas, así
+que "¿se puede llegar a esta comida?" se responde en O(1) sin lanzar una
+búsqueda que, si la meta está encerrada, recorrería toda la zona alcanzable.
+
+El índice se mantiene con los cambios de obstáculos en lugar de recalcularse:
+- una celda que se abre une las componentes de sus vecinos (union-find);
+- una celda que se cierra solo puede partir su componente si sus vecinos dejan
+  de tocarse alrededor de ella; si el anillo de 8 celdas que la rodea los sigue
+  conectando no hace falta nada. Si no, un BFS acotado desde los vecinos
+  decide si siguen unidos o si se separó una zona chica (que recibe una
+  etiqueta nueva); solo si el BFS se queda sin presupuesto se reconstruye todo.
+"""
+from array import array
+from collections import deque
+from typing import Callable, Iterable, List
+
+from .grid import GridMap, Cell
+
+BLOCKED = -1
+# Celdas que puede recorrer el BFS local antes de rendirse y reetiquetar el mapa entero
+LOCAL_SEARCH_BUDGET = 4096
+
+# Anillo de 8 celdas alrededor de una celda, en orden: celdas consecutivas son vecinas
+_RING = ((-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0))
+
+
+class ConnectivityIndex:
+    """Etiqueta de componente por celda (BLOCKED en obstáculos) + union-find de etiquetas."""
+
+    def __init__(self, grid: GridMap):
+        self.width = grid.width
+        self.height = grid.height
+        self.version = grid.version
+        self.rebuilds = 1  # Veces que se etiquetó el mapa completo (incluida esta)
+        self._label = array('i')
+        self._parent: List[int] = []
+        self._label_all(grid)
+
+    # --- CONSULTAS ---
+
+    def component(self, i: int) -> int:
+        """Componente de la celda i (BLOCKED si es un obstáculo)."""
+        label = self._label[i]
+        return BLOCKED if label == BLOCKED else self._find(label)
+
+    def components_of(self, grid: GridMap, cell: Cell) -> List[int]:
+        """
+        Componentes desde las que se puede salir de `cell`: la suya o, si está
+        sobre un obstáculo (p. ej. un agente encima de un muro dinámico), las de sus vecinos.
+        """
+        if not grid.contains(*cell):
+            return []
+        i = grid.index(*cell)
+        c = self.component(i)
+        if c != BLOCKED:
+            return [c]
+        return [self.component(j) for j in grid.neighbors(i)]
+
+    def connected(self, grid: GridMap, start: Cell, goal: Cell) -> bool:
+        """¿Hay camino de start a goal? (la meta tiene que ser transitable)"""
+        if start == goal:
+            return True
+        if not grid.contains(*goal):
+            return False
+        target = self.component(grid.index(*goal))
+        return target != BLOCKED and target in self.components_of(grid, start)
+
+    def connected_to(self, grid: GridMap, start: Cell) -> Callable[[Cell], bool]:
+        """
+        Igual que connected() con un inicio fijo: las componentes de `start` se
+        buscan una sola vez y se prueban muchas metas (p. ej. toda la comida visible).
+        """
+        components = set(self.components_of(grid, start)) - {BLOCKED}
+
+        def test(goal: Cell) -> bool:
+            if goal == start:
+                return True
+            return grid.contains(*goal) and self.component(grid.index(*goal)) in components
+
+        return test
+
+    # --- MANTENIMIENTO ---
+
+    def update(self, grid: GridMap, changed_cells: Iterable[Cell]) -> bool:
+        """
+        Aplica las celdas cuyos obstáculos cambiaron para llegar a `grid`.
+        Devuelve False si algún cambio pudo partir una componente y el índice se
+        reconstruyó completo.
+        """
+        if grid.width != self.width or grid.height != self.height:
+            raise ValueError("ConnectivityIndex: el mapa cambió de tamaño")
+        label, passable = self._label, grid.passable
+        opened, closed = [], []
+        for x, y in changed_cells:
+            if not grid.contains(x, y):
+                continue
+            i = grid.index(x, y)
+            if passable[i] and label[i] == BLOCKED:
+                opened.append(i)
+            elif not passable[i] and label[i] != BLOCKED:
+                closed.append(i)
+
+        self.version = grid.version
+        # Primero los cierres, de a uno: cada uno se revisa sobre el mapa que dejaron
+        # los anteriores (las etiquetas), no sobre el final, porque un camino viejo
+        # pudo pasar por varias celdas cerradas seguidas
+        for i in closed:
+            label[i] = BLOCKED
+            if not self._ring_connected(grid, i) and not self._split_locally(grid, i):
+                self._label_all(grid)
+                self.rebuilds += 1
+                return False
+        for i in opened:
+            root = None
+            for j in grid.adjacency[i]:
+                if label[j] == BLOCKED:
+                    continue
+                other = self._find(label[j])
+                if root is None:
+                    root = other
+                elif other != root:
+                    self._parent[other] = root
+            if root is None:
+                root = len(self._parent)
+                self._parent.append(root)
+            label[i] = root
+        # Las celdas abiertas vecinas entre sí se unen al procesar la segunda
+        return True
+
+    # --- INTERNOS ---
+
+    def _find(self, label: int) -> int:
+        parent = self._parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        while parent[label] != root:  # Compresión de caminos
+            parent[label], label = root, parent[label]
+        return root
+
+    def _label_all(self, grid: GridMap):
+        """
+        Etiqueta todo el mapa por tramos: cada tramo vertical de celdas transitables
+        de una columna recibe una etiqueta (asignada de una vez al array) y se une
+        con los tramos de la columna anterior que toca. Vecinos en 4 direcciones.
+        """
+        height, passable = grid.height, grid.passable
+        label = array('i', [BLOCKED]) * grid.size
+        self._label = label
+        parent = self._parent = []
+        previous = []  # Tramos (y0, y1, etiqueta) de la columna anterior
+        for x in range(grid.width):
+            base = x * height
+            column = passable[base:base + height]
+            runs = []
+            y0 = column.find(1)
+            while y0 != -1:
+                y1 = column.find(0, y0)
+                if y1 == -1:
+                    y1 = height
+                c = len(parent)
+                parent.append(c)
+                label[base + y0:base + y1] = array('i', [c]) * (y1 - y0)
+                runs.append((y0, y1, c))
+                y0 = column.find(1, y1)
+            # Tramos ordenados en las dos columnas: se recorren en paralelo
+            k = 0
+            for y0, y1, c in runs:
+                while k < len(previous) and previous[k][1] <= y0:
+                    k += 1
+                j = k
+                while j < len(previous) and previous[j][0] < y1:
+                    a, b = self._find(c), self._find(previous[j][2])
+                    if a != b:
+                        parent[a] = b
+                    j += 1
+            previous = runs
+
+    def _split_locally(self, grid: GridMap, i: int) -> bool:
+        """
+        Resuelve el cierre de i con BFS acotados desde sus vecinos: o se reencuentran
+        (no hubo corte) o uno agota su zona, que pasa a ser una componente nueva.
+        False si se acabó el presupuesto sin poder decidir.
+        """
+        label, adjacency = self._label, grid.adjacency
+        pending = {j for j in adjacency[i] if label[j] != BLOCKED}
+        budget = LOCAL_SEARCH_BUDGET
+        while len(pending) > 1:
+            source = pending.pop()
+            seen = {source}
+            queue = deque([source])
+            found = 0
+            while queue and found < len(pending) and len(seen) <= budget:
+                current = queue.popleft()
+                for j in adjacency[current]:
+                    if j not in seen and label[j] != BLOCKED:
+                        seen.add(j)
+                        queue.append(j)
+                        if j in pending:
+                            found += 1
+            if found == len(pending):
+                return True  # Todos los vecinos siguen conectados
+            if queue:
+                return False  # Sin presupuesto: no se sabe
+            # La zona de `source` quedó aislada: etiqueta propia
+            new = len(self._parent)
+            self._parent.append(new)
+            for j in seen:
+                label[j] = new
+            pending -= seen
+            budget -= len(seen)
+        return True
+
+    def _ring_connected(self, grid: GridMap, i: int) -> bool:
+        """¿Los vecinos transitables de i siguen conectados por el anillo que la rodea?"""
+        x, y = grid.cell(i)
+        label = self._label
+        ring = [grid.contains(x + dx, y + dy) and label[grid.index(x + dx, y + dy)] != BLOCKED
+                for dx, dy in _RING]
+        # Tramos de celdas transitables consecutivas en el anillo (circular)
+        runs = []
+        run = None
+        for k, open_cell in enumerate(ring):
+            if open_cell:
+                if run is None:
+                    run = len(runs)
+                    runs.append([])
+                if k % 2 == 1:  # Posiciones impares del anillo: vecinos en 4 direcciones
+                    runs[run].append(k)
+            else:
+                run = None
+        if len(runs) > 1 and ring[0] and ring[-1]:
+            runs[0].extend(runs.pop())  # El último tramo continúa en el primero
+        return sum(1 for r in runs if r) <= 1
+
@@ -0,0 +1,153 @@
+# backend/app/algorithms/dstar_lite.py
+"""
+D* Lite (Koenig & Likhachev) sobre un GridMap de 4 vecinos con costo uniforme.
+
+Busca hacia atrás, desde la meta hacia el agente, y conserva g / rhs entre
+ticks. Cuando cambian unas pocas celdas (un muro dinámico que se movió) solo
+se reparan los nodos afectados en lugar de planificar desde cero; el agente
+puede avanzar entre llamadas (el término km mantiene válidas las claves).
+"""
+import heapq
+from typing import Iterable, List, Optional
+
+from .grid import GridMap, Cell
+
+INF = float('inf')
+
+
+class DStarLite:
+    """Estado de búsqueda incremental de un agente hacia una meta fija."""
+
+    def __init__(self, grid: GridMap, start: Cell, goal: Cell, version=None):
+        self.grid = grid
+        self.version = version
+        self.goal = goal
+        self.start = start
+        self._last = start
+        self._km = 0
+        self._g = {}
+        self._rhs = {}
+        self._queue = []
+        self.expanded = 0  # Nodos expandidos en la última llamada
+        self.frontier_peak = 0  # Tamaño máximo de la cola en la última llamada
+        g = self._index(goal)
+        if g is not None:
+            self._rhs[g] = 0
+            heapq.heappush(self._queue, (self._key(g), g))
+        self._compute()
+
+    # --- API ---
+
+    def update(self, grid: GridMap, start: Cell, changed_cells: Iterable[Cell], version=None):
+        """Nuevo mapa, nueva posición del agente y celdas que cambiaron desde la última llamada."""
+        self.grid = grid
+        self.version = version
+        affected = set()
+        if start != self.start:
+            self._km += self._h(self._last, start)
+            self._last = start
+            # La celda del agente es un caso especial de _passable: se revisan ambas
+            for cell in (self.start, start):
+                i = self._index(cell)
+                if i is not None:
+                    affected.add(i)
+            self.start = start
+        for x, y in changed_cells:
+            i = self._index((x, y))
+            if i is None:
+                continue
+            affected.add(i)
+            affected.update(grid.adjacency[i])
+        for i in affected:
+            self._update_vertex(i)
+        self._compute()
+
+    def path(self) -> List[Cell]:
+        """Camino [start, ..., goal] siguiendo g (vacío si la meta es inalcanzable)."""
+        s = self._index(self.start)
+        goal = self._index(self.goal)
+        if s is None or goal is None or self._g.get(s, INF) == INF:
+            return []
+        grid = self.grid
+        path = [self.start]
+        current = s
+        for _ in range(grid.size):
+            if current == goal:
+                return path
+            best, best_cost = None, INF
+            for n in grid.adjacency[current]:
+                if not grid.passable[n]:
+                    continue
+                cost = 1 + self._g.get(n, INF)
+                if cost < best_cost:
+                    best, best_cost = n, cost
+            if best is None:
+                return []
+            current = best
+            path.append(grid.cell(current))
+        return []
+
+    # --- INTERNOS ---
+
+    def _index(self, cell: Cell) -> Optional[int]:
+        return self.grid.index(*cell) if self.grid.contains(*cell) else None
+
+    @staticmethod
+    def _h(a: Cell, b: Cell) -> int:
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def _key(self, i: int):
+        m = min(self._g.get(i, INF), self._rhs.get(i, INF))
+        return (m + self._h(self.start, self.grid.cell(i)) + self._km, m)
+
+    def _passable(self, i: int) -> bool:
+        # La celda del agente cuenta como transitable aunque el mapa diga otra cosa
+        return bool(self.grid.passable[i]) or self.grid.cell(i) == self.start
+
+    def _update_vertex(self, i: int):
+        grid = self.grid
+        if grid.cell(i) != self.goal:
+            best = INF
+            if self._passable(i):
+                for n in grid.adjacency[i]:
+                    if grid.passable[n]:
+                        cost = 1 + self._g.get(n, INF)
+                        if cost < best:
+                            best = cost
+            self._rhs[i] = best
+        if self._g.get(i, INF) != self._rhs.get(i, INF):
+            heapq.heappush(self._queue, (self._key(i), i))
+
+    def _compute(self):
+        self.expanded = 0
+        self.frontier_peak = len(self._queue)
+        s = self._index(self.start)
+        if s is None:
+            return
+        queue, g, rhs = self._queue, self._g, self._rhs
+        adjacency = self.grid.adjacency
+        while queue:
+            k_old, u = queue[0]
+            g_u, rhs_u = g.get(u, INF), rhs.get(u, INF)
+            if g_u == rhs_u:
+                heapq.heappop(queue)  # Entrada vieja: el nodo ya es consistente
+                continue
+            k_new = self._key(u)
+            if k_old < k_new:
+                heapq.heapreplace(queue, (k_new, u))
+                continue
+            if not (k_old < self._key(s) or rhs.get(s, INF) != g.get(s, INF)):
+                break
+            heapq.heappop(queue)
+            self.expanded += 1
+            if len(queue) > self.frontier_peak:
+                self.frontier_peak = len(queue)
+            if g_u > rhs_u:
+                g[u] = rhs_u
+                for p in adjacency[u]:
+                    self._update_vertex(p)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for p in adjacency[u]:
+                    self._update_vertex(p)
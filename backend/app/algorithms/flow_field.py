@@ -0,0 +1,130 @@
+# backend/app/algorithms/flow_field.py
+"""
+Campos de distancia (flow fields) sobre un GridMap.
+
+Un BFS multi-origen desde todas las metas a la vez (p. ej. toda la comida)
+deja en cada celda la distancia a la meta más cercana y cuál es. Cualquier
+agente lee su siguiente paso en O(1) mirando a sus vecinos, sin lanzar una
+búsqueda propia: con 50 recolectores y 20 comidas se hace un solo recorrido
+del mapa en lugar de 50 A*.
+"""
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from .grid import GridMap, Cell
+
+UNREACHABLE = -1
+
+
+class DistanceField:
+    """
+    Distancia (en pasos) y meta más cercana para cada celda del mapa.
+    Con `max_distance` el recorrido se corta a esa profundidad: las celdas más
+    lejanas quedan como inalcanzables (útil cuando solo importa el radio de visión).
+    """
+
+    def __init__(self, grid: GridMap, sources: Iterable[Cell], version=None,
+                 max_distance: Optional[int] = None):
+        self.grid = grid
+        self.version = version
+        self.max_distance = max_distance
+        n = grid.size
+        self.dist = array('i', [UNREACHABLE]) * n
+        self.source = array('i', [UNREACHABLE]) * n
+
+        dist, source = self.dist, self.source
+        adjacency, passable = grid.adjacency, grid.passable
+        queue = deque()
+        for x, y in sources:
+            if not grid.contains(x, y):
+                continue
+            i = grid.index(x, y)
+            if dist[i] == UNREACHABLE:
+                dist[i] = 0
+                source[i] = i
+                queue.append(i)
+
+        while queue:
+            current = queue.popleft()
+            d = dist[current] + 1
+            if max_distance is not None and d > max_distance:
+                break  # BFS: todo lo que queda en la cola está igual de lejos o más
+            for j in adjacency[current]:
+                if passable[j] and dist[j] == UNREACHABLE:
+                    dist[j] = d
+                    source[j] = source[current]
+                    queue.append(j)
+
+    def distance(self, x: int, y: int) -> Optional[int]:
+        """Pasos hasta la meta más cercana (None si no hay camino)."""
+        if not self.grid.contains(x, y):
+            return None
+        d = self.dist[self.grid.index(x, y)]
+        return None if d == UNREACHABLE else d
+
+    def source_at(self, x: int, y: int) -> Optional[Cell]:
+        """Meta más cercana a la celda (la que se alcanza siguiendo el campo)."""
+        if not self.grid.contains(x, y):
+            return None
+        s = self.source[self.grid.index(x, y)]
+        return None if s == UNREACHABLE else self.grid.cell(s)
+
+    def next_move(self, x: int, y: int) -> Tuple[int, int]:
+        """(dx, dy) que baja un paso por el campo; (0, 0) si ya está en la meta o no hay camino."""
+        if not self.grid.contains(x, y):
+            return 0, 0
+        grid = self.grid
+        i = grid.index(x, y)
+        d = self.dist[i]
+        if d <= 0:
+            return 0, 0
+        fallback = None
+        for j in grid.adjacency[i]:
+            if self.dist[j] == d - 1:
+                # Preferimos el vecino que lleva a la misma meta (coherente con source_at)
+                if self.source[j] == self.source[i]:
+                    fallback = j
+                    break
+                if fallback is None:
+                    fallback = j
+        if fallback is None:
+            return 0, 0
+        nx, ny = grid.cell(fallback)
+        return nx - x, ny - y
+
+
+def local_routes(grid: GridMap, start: Cell, targets: Iterable[Cell],
+                 max_distance: int) -> Dict[Cell, Tuple[int, Cell]]:
+    """
+    BFS acotado desde `start` hacia unas pocas metas cercanas: para cada meta
+    alcanzada a <= max_distance pasos devuelve (distancia, primera celda del camino).
+    Marca las celdas vistas en un dict en lugar de arrays del tamaño del mapa, así
+    que cuesta lo que mide el rombo de radio max_distance y no el mapa entero.
+    """
+    if not grid.contains(*start):
+        return {}
+    pending = {grid.index(x, y) for x, y in targets if grid.contains(x, y)}
+    origin = grid.index(*start)
+    routes: Dict[Cell, Tuple[int, Cell]] = {}
+    if origin in pending:
+        pending.discard(origin)
+        routes[start] = (0, start)
+    adjacency, passable = grid.adjacency, grid.passable
+    first = {origin: origin}  # celda vista -> primer paso desde start
+    frontier = [origin]
+    d = 0
+    while frontier and pending and d < max_distance:
+        d += 1
+        nxt = []
+        for current in frontier:
+            step = first[current]
+            for j in adjacency[current]:
+                if passable[j] and j not in first:
+                    first[j] = j if current == origin else step
+                    nxt.append(j)
+                    if j in pending:
+                        pending.discard(j)
+                        routes[grid.cell(j)] = (d, grid.cell(first[j]))
+        frontier = nxt
+    return routes
@@ -0,0 +1,203 @@
+# backend/app/algorithms/grid.py
+"""
+Representación compacta del mapa para los algoritmos de búsqueda.
+
+Cada celda (x, y) se numera como i = x * height + y (así el orden de los índices
+coincide con el de las tuplas y los empates en las colas de prioridad se
+resuelven igual que antes). Se guarda:
+
+- passable: bytearray con 1 si la celda es transitable.
+- adjacency: tabla de vecinos dentro de los límites por celda, precalculada
+  una sola vez por tamaño de mapa y orden de direcciones.
+
+Los algoritmos consultan passable[j] al expandir en lugar de recorrer la lista
+de obstáculos por cada vecino. Los datos derivados del mapa que algunos
+algoritmos precalculan (p. ej. las tablas de saltos de JPS) se guardan en
+`derived`, así viven exactamente lo mismo que la versión del mapa.
+
+El costo del terreno va aparte (CostMap) porque cambia por su cuenta: es un
+array con el costo de entrar a cada celda, con el mismo índice que GridMap.
+"""
+import math
+from array import array
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+# Orden de vecinos de Pathfinding (Up, Down, Right, Left en coordenadas de pantalla)
+PATHFINDING_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+# Orden de vecinos de SearchAlgorithms
+SEARCH_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# (width, height, directions) -> (celdas, adyacencia): compartido entre mapas del mismo tamaño
+_tables: Dict[Tuple[int, int, Tuple[Cell, ...]], Tuple[List[Cell], List[Tuple[int, ...]]]] = {}
+# Tamaños guardados a la vez (las de 1000x1000 ocupan decenas de MB); se descarta el más viejo
+MAX_CACHED_TABLES = 4
+
+
+def _get_tables(width: int, height: int, directions):
+    key = (width, height, tuple(directions))
+    tables = _tables.pop(key, None)
+    if tables is None:
+        while len(_tables) >= MAX_CACHED_TABLES:
+            del _tables[next(iter(_tables))]
+        cells = list(product(range(width), range(height)))
+
+        def neighbours(x, y):
+            return tuple((x + dx) * height + (y + dy) for dx, dy in directions
+                         if 0 <= x + dx < width and 0 <= y + dy < height)
+
+        # Las celdas interiores de una columna tienen todos sus vecinos a los mismos
+        # desplazamientos: se arman de a columna con zip en vez de celda por celda
+        offsets = [dx * height + dy for dx, dy in directions]
+        adjacency = []
+        for x in range(width):
+            if 0 < x < width - 1 and height > 2:
+                base = x * height
+                adjacency.append(neighbours(x, 0))
+                adjacency.extend(zip(*[range(base + 1 + o, base + height - 1 + o) for o in offsets]))
+                adjacency.append(neighbours(x, height - 1))
+            else:
+                adjacency.extend(neighbours(x, y) for y in range(height))
+        tables = (cells, adjacency)
+    _tables[key] = tables  # Al final: el más usado es el último en descartarse
+    return tables
+
+
+class GridMap:
+    """
+    Máscara de transitabilidad + tabla de vecinos de un mapa concreto.
+    Se construye una vez por versión del mapa de obstáculos y se reutiliza
+    en todas las búsquedas hasta que cambie.
+    """
+
+    def __init__(self, width: int, height: int, obstacles=(), destructible_passable: bool = True,
+                 directions=PATHFINDING_DIRECTIONS, version: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.version = version
+        self.cells, self.adjacency = _get_tables(width, height, directions)
+        self.derived: Dict[str, object] = {}  # nombre -> datos precalculados sobre este mapa
+        self.passable = bytearray(b"\x01") * (width * height)
+        for o in obstacles:
+            # Los destructibles no bloquean en Pathfinding: el agente puede romperlos
+            if destructible_passable and o.get('destructible', False):
+                continue
+            if 0 <= o['x'] < width and 0 <= o['y'] < height:
+                self.passable[o['x'] * height + o['y']] = 0
+
+    @property
+    def size(self) -> int:
+        return self.width * self.height
+
+    def contains(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def index(self, x: int, y: int) -> int:
+        return x * self.height + y
+
+    def cell(self, i: int) -> Cell:
+        return self.cells[i]
+
+    def is_passable(self, x: int, y: int) -> bool:
+        return self.contains(x, y) and bool(self.passable[x * self.height + y])
+
+    def neighbors(self, i: int) -> List[int]:
+        """Índices de los vecinos transitables de la celda i."""
+        passable = self.passable
+        return [j for j in self.adjacency[i] if passable[j]]
+
+
+# Costo mínimo de una celda: con 0 o negativos las búsquedas dejarían de ser correctas
+MIN_TERRAIN_COST = 0.1
+# Costo máximo: el movimiento descuenta energía proporcional al costo
+MAX_TERRAIN_COST = 100.0
+
+
+def terrain_cost(value) -> float:
+    """Costo válido de terreno: un número finito, recortado a [MIN_TERRAIN_COST, MAX_TERRAIN_COST]."""
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        try:
+            cost = float(value)
+        except ValueError:
+            cost = math.nan
+        if math.isfinite(cost):
+            return min(MAX_TERRAIN_COST, max(MIN_TERRAIN_COST, cost))
+    raise ValueError(f"Costo de terreno inválido: {value!r}")
+
+
+class CostMap:
+    """
+    Costo de entrar a cada celda (terreno). 1.0 es terreno normal.
+    `values` es un array de doubles indexado como GridMap (i = x * height + y) para
+    que los bucles de búsqueda y movimiento lo lean sin pasar por diccionarios.
+    `version` aumenta con cada cambio (los caminos con pesos dependen de ella).
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.values = array('d', [1.0]) * (width * height)
+        self.version = 0
+        self.base = 1.0  # Costo de relleno (el de fill)
+        self.min_cost = 1.0
+        self.uniform = True  # Todas las celdas cuestan lo mismo: las búsquedas sin pesos sirven
+        self._cells: List[Dict] = []  # Celdas con costo distinto de `base`
+
+    def get(self, x: int, y: int) -> float:
+        return self.values[x * self.height + y]
+
+    def fill(self, cost: float = 1.0):
+        self.update(fill=cost)
+
+    def set_many(self, cells: Iterable[Dict]):
+        """Asigna en bloque [{"x", "y", "cost"}, ...] (las celdas fuera del mapa se ignoran)."""
+        self.update(cells=cells)
+
+    def update(self, cells: Optional[Iterable[Dict]] = None, fill: Optional[float] = None):
+        """
+        `fill` rellena todo el mapa y luego `cells` fija celdas sueltas. Se valida todo
+        antes de tocar nada: con un valor inválido (ValueError) el terreno no cambia.
+        """
+        base = self.base if fill is None else terrain_cost(fill)
+        changes = []
+        H = self.height
+        for c in cells or ():
+            try:
+                x, y = int(c['x']), int(c['y'])
+                cost = terrain_cost(c.get('cost', base))
+            except (KeyError, TypeError, AttributeError, ValueError) as e:
+                raise ValueError(f"Celda de terreno inválida {c!r}: {e}")
+            if 0 <= x < self.width and 0 <= y < H:
+                changes.append((x * H + y, cost))
+        if fill is None and not changes:
+            return
+        if fill is not None:
+            self.base = base
+            self.values = array('d', [base]) * (self.width * H)
+        values = self.values
+        for i, cost in changes:
+            values[i] = cost
+        self._changed()
+
+    def load(self, data: Optional[Dict]):
+        """
+        Restaura lo que devolvió to_dict() (None o vacío = terreno normal).
+        Lanza ValueError si los datos no tienen ese formato.
+        """
+        data = data or {}
+        if not isinstance(data, dict):
+            raise ValueError(f"Terreno inválido: {data!r}")
+        self.update(cells=data.get('cells'), fill=data.get('fill', 1.0))
+
+    def to_dict(self) -> Dict:
+        """Relleno + celdas que difieren de él (formato de set_many)."""
+        return {"fill": self.base, "cells": self._cells}
+
+    def _changed(self):
+        self.version += 1
+        values, H, base = self.values, self.height, self.base
+        self.min_cost = min(values) if values else base
+        self._cells = [{"x": i // H, "y": i % H, "cost": v} for i, v in enumerate(values) if v != base]
+        self.uniform = not self._cells
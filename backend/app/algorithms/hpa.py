@@ -0,0 +1,336 @@
+# backend/app/algorithms/hpa.py
+"""
+HPA* (Hierarchical Path-Finding A*) para mapas grandes (cientos de celdas por lado).
+
+El mapa se divide en clusters cuadrados. En cada borde entre dos clusters, cada
+tramo de celdas transitables a ambos lados es una entrada: tramos cortos dejan
+una transición en el medio y los largos una en cada punta. Las celdas de las
+transiciones son los nodos de un grafo abstracto:
+- aristas entre clusters (costo 1) de cada transición,
+- aristas dentro de un cluster con la distancia real entre sus nodos (BFS
+  limitado al cluster), calculadas una vez y guardadas.
+
+Una consulta conecta el inicio y la meta con los nodos de su cluster, corre A*
+sobre el grafo abstracto (unos pocos nodos por cluster en vez de todas las
+celdas) y luego refina cada tramo con un BFS dentro de un solo cluster. El
+camino es casi mínimo, no necesariamente mínimo.
+
+Los clusters se arman recién cuando una consulta los necesita (al salir de su
+cluster o al expandir uno de sus nodos en el A* abstracto): en un mapa de
+cientos de celdas por lado el primer camino no paga el grafo entero, solo los
+clusters por los que pasa la búsqueda. Cuando cambian obstáculos se descartan
+los clusters tocados (y el vecino de cada borde que cambió), que se vuelven a
+armar al próximo uso.
+"""
+import heapq
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .grid import GridMap, Cell
+
+DEFAULT_CLUSTER_SIZE = 10
+# Tramos de entrada de este largo o más dejan dos transiciones (una en cada punta)
+LONG_ENTRANCE = 6
+
+START, GOAL = -1, -2  # Nodos virtuales del grafo abstracto durante una consulta
+
+
+class ClusterGraph:
+    """Grafo abstracto de entradas entre clusters de un GridMap."""
+
+    def __init__(self, grid: GridMap, cluster_size: int = DEFAULT_CLUSTER_SIZE):
+        self.grid = grid
+        self.version = grid.version
+        self.cluster_size = cluster_size
+        self.columns = -(-grid.width // cluster_size)
+        self.rows = -(-grid.height // cluster_size)
+        # Se completan a medida que se usan (ver _cluster_nodes / _border_transitions)
+        self.transitions: Dict[Tuple[str, int, int], List[Tuple[int, int]]] = {}
+        self.nodes: Dict[int, Set[int]] = {}  # cluster armado -> celdas nodo
+        self.edges: Dict[int, Dict[int, int]] = {}  # celda nodo -> {celda nodo: costo}
+        self.rebuilt_clusters = 0  # Clusters armados desde la construcción / última actualización
+
+    @staticmethod
+    def for_grid(grid: GridMap) -> "ClusterGraph":
+        graph = grid.derived.get("hpa")
+        if graph is None:
+            graph = ClusterGraph(grid)
+            grid.derived["hpa"] = graph
+        return graph
+
+    # --- MANTENIMIENTO ---
+
+    def update(self, grid: GridMap, changed_cells: Iterable[Cell]):
+        """Pasa al mapa `grid` descartando solo lo que tocan las celdas cambiadas."""
+        if grid.width != self.grid.width or grid.height != self.grid.height:
+            raise ValueError("ClusterGraph: el mapa cambió de tamaño")
+        self.grid = grid
+        self.version = grid.version
+        size = self.cluster_size
+        touched = set()
+        borders = set()
+        for x, y in changed_cells:
+            if not grid.contains(x, y):
+                continue
+            cx, cy = x // size, y // size
+            touched.add(cx * self.rows + cy)
+            # Una celda en el borde del cluster cambia las entradas de ese borde
+            if x % size == size - 1:
+                borders.add(("v", cx, cy))
+            if x % size == 0 and cx > 0:
+                borders.add(("v", cx - 1, cy))
+            if y % size == size - 1:
+                borders.add(("h", cx, cy))
+            if y % size == 0 and cy > 0:
+                borders.add(("h", cx, cy - 1))
+        for border in borders:
+            if self._has_border(border):
+                self.transitions.pop(border, None)
+                touched.update(self._border_clusters(border))
+        for cluster in touched:
+            for n in self.nodes.pop(cluster, ()):
+                self.edges.pop(n, None)
+        self.rebuilt_clusters = 0
+
+    # --- CONSULTA ---
+
+    def find_path(self, start: Cell, goal: Cell, stats: Optional[Dict] = None) -> List[Cell]:
+        """Camino [start, ..., goal] celda por celda (vacío si no hay camino)."""
+        grid = self.grid
+        if not (grid.contains(*start) and grid.contains(*goal)):
+            return []
+        if start == goal:
+            return [start]
+        s, g = grid.index(*start), grid.index(*goal)
+        if not grid.passable[g]:
+            return []
+        expanded = 0
+
+        # Inicio y meta conectados a los nodos de su cluster
+        start_cluster, goal_cluster = self._cluster_of(s), self._cluster_of(g)
+        start_parents = self._local_bfs(s, start_cluster)
+        start_clusters = {start_cluster}
+        if not grid.passable[s]:
+            # Inicio sobre un obstáculo: puede salir hacia un vecino de otro cluster sin pasar por una entrada
+            for n in grid.neighbors(s):
+                cluster = self._cluster_of(n)
+                if cluster != start_cluster and n not in start_parents:
+                    parents = self._local_bfs(n, cluster)
+                    parents[n] = s
+                    start_parents.update(parents)
+                    start_clusters.add(cluster)
+        expanded += len(start_parents)
+        if g in start_parents:
+            # Misma zona del mismo cluster: basta el BFS local
+            self._record(stats, expanded, 1)
+            return self._walk_back(start_parents, g)
+        goal_parents = self._local_bfs(g, goal_cluster)
+        expanded += len(goal_parents)
+        start_links = {n: self._depth(start_parents, n) for c in start_clusters
+                       for n in self._cluster_nodes(c) if n in start_parents}
+        goal_links = {n: self._depth(goal_parents, n) for n in self._cluster_nodes(goal_cluster)
+                      if n in goal_parents}
+
+        # A* sobre el grafo abstracto
+        cells = grid.cells
+        gx, gy = goal
+        # Empates de f: primero el más cercano a la meta (en campo abierto hay muchísimos)
+        queue = [(0, 0, START)]
+        came_from = {START: None}
+        cost_so_far = {START: 0}
+        closed = set()
+        peak = 1
+        while queue:
+            _, _, current = heapq.heappop(queue)
+            if current in closed:
+                continue
+            closed.add(current)
+            expanded += 1
+            if current == GOAL:
+                break
+            if current == START:
+                neighbours = start_links.items()
+            else:
+                neighbours = list(self._node_edges(current).items())
+                if current in goal_links:
+                    neighbours.append((GOAL, goal_links[current]))
+            for n, cost in neighbours:
+                new_cost = cost_so_far[current] + cost
+                if n not in cost_so_far or new_cost < cost_so_far[n]:
+                    cost_so_far[n] = new_cost
+                    if n == GOAL:
+                        h = 0
+                    else:
+                        nx, ny = cells[n]
+                        h = abs(gx - nx) + abs(gy - ny)
+                    heapq.heappush(queue, (new_cost + h, h, n))
+                    came_from[n] = current
+            if len(queue) > peak:
+                peak = len(queue)
+        self._record(stats, expanded, peak)
+        if GOAL not in came_from:
+            return []
+
+        abstract = []
+        current = came_from[GOAL]
+        while current != START:
+            abstract.append(current)
+            current = came_from[current]
+        abstract.reverse()
+
+        # Refinar: inicio -> primer nodo, nodo -> nodo, último nodo -> meta
+        path = self._walk_back(start_parents, abstract[0])
+        for a, b in zip(abstract, abstract[1:]):
+            if self._cluster_of(a) != self._cluster_of(b):
+                path.append(cells[b])  # Arista entre clusters: celdas vecinas
+            else:
+                path.extend(self._walk_back(self._local_bfs(a, self._cluster_of(a), stop=b), b)[1:])
+        current = goal_parents[abstract[-1]]
+        while current is not None:
+            path.append(cells[current])
+            current = goal_parents[current]
+        return path
+
+    # --- INTERNOS ---
+
+    @staticmethod
+    def _record(stats, expanded, frontier_peak):
+        if stats is not None:
+            stats["expanded"] = expanded
+            stats["frontier_peak"] = frontier_peak
+
+    def _cluster_of(self, i: int) -> int:
+        x, y = self.grid.cells[i]
+        return (x // self.cluster_size) * self.rows + y // self.cluster_size
+
+    def _bounds(self, cluster: int):
+        cx, cy = divmod(cluster, self.rows)
+        size = self.cluster_size
+        return (cx * size, min(self.grid.width, (cx + 1) * size),
+                cy * size, min(self.grid.height, (cy + 1) * size))
+
+    def _has_border(self, border) -> bool:
+        # Cada cluster es dueño del borde a su derecha ("v") y del de abajo ("h")
+        kind, cx, cy = border
+        if not (0 <= cx < self.columns and 0 <= cy < self.rows):
+            return False
+        return cx + 1 < self.columns if kind == "v" else cy + 1 < self.rows
+
+    def _border_clusters(self, border) -> Tuple[int, int]:
+        kind, cx, cy = border
+        own = cx * self.rows + cy
+        return (own, (cx + 1) * self.rows + cy) if kind == "v" else (own, own + 1)
+
+    def _border_transitions(self, border) -> List[Tuple[int, int]]:
+        """Transiciones (celda de un lado, celda del otro) de un borde entre dos clusters."""
+        transitions = self.transitions.get(border)
+        if transitions is None:
+            transitions = self._build_border(border)
+            self.transitions[border] = transitions
+        return transitions
+
+    def _build_border(self, border) -> List[Tuple[int, int]]:
+        kind, cx, cy = border
+        grid, size = self.grid, self.cluster_size
+        passable, H = grid.passable, grid.height
+        if kind == "v":
+            x = (cx + 1) * size - 1
+            pairs = [(x * H + y, (x + 1) * H + y) for y in range(cy * size, min(H, (cy + 1) * size))]
+        else:
+            y = (cy + 1) * size - 1
+            pairs = [(x * H + y, x * H + y + 1) for x in range(cx * size, min(grid.width, (cx + 1) * size))]
+
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and passable[a] and passable[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) >= LONG_ENTRANCE:
+                    transitions.extend((run[0], run[-1]))
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+        return transitions
+
+    def _cluster_borders(self, cluster: int):
+        cx, cy = divmod(cluster, self.rows)
+        for border in (("v", cx, cy), ("h", cx, cy), ("v", cx - 1, cy), ("h", cx, cy - 1)):
+            if self._has_border(border):
+                yield border
+
+    def _cluster_nodes(self, cluster: int) -> Set[int]:
+        """Nodos del cluster, armándolo si todavía no se usó."""
+        nodes = self.nodes.get(cluster)
+        if nodes is None:
+            nodes = self._build_cluster(cluster)
+        return nodes
+
+    def _node_edges(self, node: int) -> Dict[int, int]:
+        """Aristas de un nodo (las de su cluster se arman al primer uso)."""
+        edges = self.edges.get(node)
+        if edges is None:
+            self._cluster_nodes(self._cluster_of(node))
+            edges = self.edges.get(node, {})
+        return edges
+
+    def _build_cluster(self, cluster: int) -> Set[int]:
+        """Nodos, aristas internas (BFS en el cluster) y aristas hacia clusters vecinos."""
+        edges = self.edges
+        nodes = set()
+        inter = []
+        for border in self._cluster_borders(cluster):
+            own = self._border_clusters(border)[0] == cluster
+            for a, b in self._border_transitions(border):
+                mine, other = (a, b) if own else (b, a)
+                nodes.add(mine)
+                inter.append((mine, other))
+        self.nodes[cluster] = nodes
+        for n in nodes:
+            edges[n] = {}
+        for mine, other in inter:
+            edges[mine][other] = 1
+        for n in nodes:
+            parents = self._local_bfs(n, cluster)
+            for m in nodes:
+                if m != n and m in parents:
+                    edges[n][m] = self._depth(parents, m)
+        self.rebuilt_clusters += 1
+        return nodes
+
+    def _local_bfs(self, source: int, cluster: int, stop: Optional[int] = None) -> Dict[int, Optional[int]]:
+        """BFS desde `source` sin salir del cluster. Devuelve los padres de lo alcanzado."""
+        grid = self.grid
+        x0, x1, y0, y1 = self._bounds(cluster)
+        cells, adjacency, passable = grid.cells, grid.adjacency, grid.passable
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == stop:
+                break
+            for j in adjacency[current]:
+                if j in parents or not passable[j]:
+                    continue
+                x, y = cells[j]
+                if x0 <= x < x1 and y0 <= y < y1:
+                    parents[j] = current
+                    queue.append(j)
+        return parents
+
+    @staticmethod
+    def _depth(parents, i: int) -> int:
+        depth = 0
+        while parents[i] is not None:
+            i = parents[i]
+            depth += 1
+        return depth
+
+    def _walk_back(self, parents, i: int) -> List[Cell]:
+        path = []
+        while i is not None:
+            path.append(self.grid.cells[i])
+            i = parents[i]
+        path.reverse()
+        return path
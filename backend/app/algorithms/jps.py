@@ -0,0 +1,210 @@
+# backend/app/algorithms/jps.py
+"""
+Jump Point Search para grids de 4 vecinos con costo uniforme.
+
+En vez de expandir cada celda, la búsqueda avanza en línea recta ("salta")
+hasta un punto donde el camino óptimo podría girar:
+- la meta,
+- un vecino forzado (una celda lateral que se abre justo después de un muro),
+- al moverse en vertical, una fila desde la que un salto horizontal llega a
+  otro punto de salto.
+Sobre esos puntos se corre A* con distancia Manhattan.
+
+Los saltos no dependen de la meta salvo por la propia meta, así que se
+precalculan (estilo JPS+) una vez por versión del mapa y se guardan en
+GridMap.derived: cada salto es O(1) y la meta se resuelve al consultar.
+"""
+import heapq
+from array import array
+from typing import Dict, List, Optional
+
+from .grid import GridMap, Cell
+
+NONE = -1
+
+
+class JumpTables:
+    """
+    Para cada celda y dirección: el siguiente punto de salto (índice >= 0) o,
+    si antes hay un muro, la última celda transitable codificada como -(i) - 1.
+    Los índices son de un mapa con borde de 1 celda: p = (x + 1) * (height + 2) + (y + 1).
+    """
+
+    def __init__(self, grid: GridMap):
+        W, H = grid.width, grid.height
+        Hp = H + 2
+        self.stride = Hp
+        pad = bytearray((W + 2) * Hp)
+        for x in range(W):
+            row = grid.passable[x * H:(x + 1) * H]
+            pad[(x + 1) * Hp + 1:(x + 1) * Hp + 1 + H] = row
+        self.pad = pad
+
+        size = len(pad)
+        self.right = array('i', [NONE]) * size
+        self.left = array('i', [NONE]) * size
+        self.down = array('i', [NONE]) * size
+        self.up = array('i', [NONE]) * size
+
+        # Horizontal: se recorre cada fila desde el extremo hacia el que se salta
+        for table, dx, xs in ((self.right, 1, range(W - 1, -1, -1)), (self.left, -1, range(W))):
+            step = dx * Hp
+            for y in range(H):
+                for x in xs:
+                    p = (x + 1) * Hp + (y + 1)
+                    if not pad[p]:
+                        continue
+                    q = p + step
+                    if not pad[q]:
+                        table[p] = -p - 1
+                    elif (pad[q - 1] and not pad[p - 1]) or (pad[q + 1] and not pad[p + 1]):
+                        table[p] = q
+                    else:
+                        table[p] = table[q]
+
+        # Vertical: además del vecino forzado, para en filas con salto horizontal
+        right, left = self.right, self.left
+        for table, dy, ys in ((self.down, 1, range(H - 1, -1, -1)), (self.up, -1, range(H))):
+            for x in range(W):
+                for y in ys:
+                    p = (x + 1) * Hp + (y + 1)
+                    if not pad[p]:
+                        continue
+                    q = p + dy
+                    if not pad[q]:
+                        table[p] = -p - 1
+                    elif ((pad[q - Hp] and not pad[p - Hp]) or (pad[q + Hp] and not pad[p + Hp])
+                          or right[q] >= 0 or left[q] >= 0):
+                        table[p] = q
+                    else:
+                        table[p] = table[q]
+
+    @staticmethod
+    def for_grid(grid: GridMap) -> "JumpTables":
+        tables = grid.derived.get("jps")
+        if tables is None:
+            tables = JumpTables(grid)
+            grid.derived["jps"] = tables
+        return tables
+
+
+def jps(grid: GridMap, start: Cell, goal: Cell, stats: Optional[Dict] = None) -> List[Cell]:
+    """Camino [start, ..., goal] celda por celda (vacío si no hay camino)."""
+    if not (grid.contains(*start) and grid.contains(*goal)):
+        return []
+    if start == goal:
+        return [start]
+    tables = JumpTables.for_grid(grid)
+    Hp = tables.stride
+    pad = tables.pad
+    s = (start[0] + 1) * Hp + start[1] + 1
+    g = (goal[0] + 1) * Hp + goal[1] + 1
+    gx, gy = divmod(g, Hp)
+    horizontal = {Hp: tables.right, -Hp: tables.left}
+    vertical = {1: tables.down, -1: tables.up}
+
+    def between(p, q, end, step):
+        # ¿q está después de p y no más allá de end, avanzando con `step`?
+        return p < q <= end if step > 0 else end <= q < p
+
+    def jump_horizontal(p, step):
+        v = horizontal[step][p]
+        end = v if v >= 0 else -v - 1
+        if p % Hp == gy and between(p, g, end, step):
+            return g
+        return v if v >= 0 else NONE
+
+    def jump_vertical(p, step):
+        v = vertical[step][p]
+        end = v if v >= 0 else -v - 1
+        best = v if v >= 0 else NONE
+        if p // Hp == gx:
+            if between(p, g, end, step):
+                return g
+        else:
+            # Fila de la meta: un salto horizontal desde ahí puede llegar a ella
+            r = (p // Hp) * Hp + gy
+            if between(p, r, end, step) and (best == NONE or between(p, r, best, step)):
+                toward = Hp if gx > p // Hp else -Hp
+                if jump_horizontal(r, toward) == g:
+                    best = r
+        return best
+
+    queue = [(abs(goal[0] - start[0]) + abs(goal[1] - start[1]), s)]
+    came_from = {s: None}
+    cost_so_far = {s: 0}
+    closed = set()
+    seeds = set()
+    if not pad[s]:
+        # El inicio está sobre un obstáculo: se sale por sus vecinos como si fueran inicios
+        closed.add(s)
+        queue = []
+        for step in (1, -1, Hp, -Hp):
+            n = s + step
+            if pad[n]:
+                nx, ny = divmod(n, Hp)
+                seeds.add(n)
+                came_from[n] = s
+                cost_so_far[n] = 1
+                heapq.heappush(queue, (1 + abs(gx - nx) + abs(gy - ny), n))
+    expanded = 0
+    peak = 1
+
+    while queue:
+        _, current = heapq.heappop(queue)
+        if current in closed:
+            continue
+        closed.add(current)
+        expanded += 1
+        if current == g:
+            break
+
+        parent = came_from[current]
+        if parent is None or current in seeds:
+            steps = (1, -1, Hp, -Hp)
+        elif abs(current - parent) >= Hp:
+            # Llegó en horizontal: sigue recto o gira a los lados
+            forward = Hp if current > parent else -Hp
+            steps = (-1, 1, forward)
+        else:
+            forward = 1 if current > parent else -1
+            steps = (-Hp, Hp, forward)
+
+        cx, cy = divmod(current, Hp)
+        for step in steps:
+            if not pad[current + step]:
+                continue
+            jump_point = jump_vertical(current, step) if step in (1, -1) else jump_horizontal(current, step)
+            if jump_point == NONE or jump_point in closed:
+                continue
+            jx, jy = divmod(jump_point, Hp)
+            new_cost = cost_so_far[current] + abs(jx - cx) + abs(jy - cy)
+            if jump_point not in cost_so_far or new_cost < cost_so_far[jump_point]:
+                cost_so_far[jump_point] = new_cost
+                heapq.heappush(queue, (new_cost + abs(gx - jx) + abs(gy - jy), jump_point))
+                came_from[jump_point] = current
+        if len(queue) > peak:
+            peak = len(queue)
+
+    if stats is not None:
+        stats["expanded"] = expanded
+        stats["frontier_peak"] = peak
+    if g not in came_from:
+        return []
+
+    # Reconstruir celda por celda: entre puntos de salto el tramo es recto
+    jump_points = []
+    current = g
+    while current is not None:
+        jump_points.append(divmod(current, Hp))
+        current = came_from[current]
+    jump_points.reverse()
+    path = [start]
+    for (ax, ay), (bx, by) in zip(jump_points, jump_points[1:]):
+        step_x = (bx > ax) - (bx < ax)
+        step_y = (by > ay) - (by < ay)
+        while (ax, ay) != (bx, by):
+            ax += step_x
+            ay += step_y
+            path.append((ax - 1, ay - 1))
+    return path
@@ -0,0 +1,94 @@
+# backend/app/algorithms/landmarks.py
+"""
+Heurística ALT (A*, Landmarks y desigualdad Triangular) sobre un GridMap.
+
+Se eligen unas pocas celdas "landmark" y se guarda la distancia real desde cada
+una a todo el mapa. Por la desigualdad triangular, para cualquier landmark L:
+
+    dist(n, meta) >= |dist(L, meta) - dist(L, n)|
+
+así que el máximo sobre los landmarks (y la distancia Manhattan) sigue siendo
+admisible y consistente, pero en mapas con muros (habitaciones, laberintos)
+estima mucho mejor que Manhattan y A* expande una fracción de las celdas.
+
+Las tablas dependen solo de los obstáculos: se calculan una vez por versión
+del mapa y se guardan en GridMap.derived, igual que las tablas de JPS. Cada
+búsqueda usa solo los ACTIVE_LANDMARKS que mejor acotan su par inicio/meta:
+evaluar todos en cada nodo cuesta más de lo que ahorran en expansiones.
+"""
+from typing import Callable, List, Optional
+
+from .grid import GridMap
+from .flow_field import DistanceField, UNREACHABLE
+
+DEFAULT_LANDMARKS = 4
+ACTIVE_LANDMARKS = 2
+
+
+class Landmarks:
+    """Distancias exactas desde `count` landmarks repartidos por el mapa."""
+
+    def __init__(self, grid: GridMap, count: int = DEFAULT_LANDMARKS):
+        self.grid = grid
+        self.cells: List[int] = []
+        self.tables = []
+        passable = grid.passable
+        first = next((i for i in range(grid.size) if passable[i]), None)
+        if first is None:
+            return
+
+        # Puntos más lejanos: cada landmark nuevo es la celda más alejada de los ya elegidos.
+        # Las celdas que ningún landmark alcanza (otra zona cerrada) se eligen primero.
+        unreached = grid.size + 1
+        nearest = [unreached if p else UNREACHABLE for p in passable]
+        seed = DistanceField(grid, [grid.cell(first)]).dist
+        candidate = seed.index(max(seed))
+        while len(self.cells) < count and nearest[candidate] > 0:
+            dist = DistanceField(grid, [grid.cell(candidate)]).dist
+            self.cells.append(candidate)
+            self.tables.append(dist)
+            nearest = [d if 0 <= d < n else n for d, n in zip(dist, nearest)]
+            candidate = nearest.index(max(nearest))
+
+    @staticmethod
+    def for_grid(grid: GridMap) -> "Landmarks":
+        landmarks = grid.derived.get("alt")
+        if landmarks is None:
+            landmarks = Landmarks(grid)
+            grid.derived["alt"] = landmarks
+        return landmarks
+
+    def heuristic_to(self, goal: int, start: Optional[int] = None,
+                     active: int = ACTIVE_LANDMARKS) -> Optional[Callable[[int], float]]:
+        """
+        h(n) hacia la celda `goal`. Devuelve None si la meta no está en la zona de
+        ningún landmark (queda solo Manhattan). Una celda que un landmark no alcanza
+        pero la meta sí está en otra zona: h = infinito.
+        Con `start` se quedan los `active` landmarks con mejor cota para ese inicio
+        (el máximo sobre un subconjunto sigue siendo admisible y consistente).
+        """
+        bounds = [(table, table[goal]) for table in self.tables if table[goal] != UNREACHABLE]
+        if not bounds:
+            return None
+        if start is not None and len(bounds) > active:
+            def gain(bound):
+                table, to_goal = bound
+                d = table[start]
+                return float('inf') if d == UNREACHABLE else abs(to_goal - d)
+            bounds = sorted(bounds, key=gain, reverse=True)[:active]
+        cells = self.grid.cells
+        gx, gy = cells[goal]
+
+        def h(n: int) -> float:
+            x, y = cells[n]
+            best = abs(gx - x) + abs(gy - y)
+            for table, to_goal in bounds:
+                d = table[n]
+                if d == UNREACHABLE:
+                    return float('inf')
+                d = to_goal - d if to_goal > d else d - to_goal
+                if d > best:
+                    best = d
+            return best
+
+        return h
@@ -2,117 +2,226 @@ import heapq
 import collections
 import math
 
+from .grid import GridMap
+from .search import SearchAlgorithms
+from .jps import jps as jump_point_search
+from .landmarks import Landmarks
+from .hpa import ClusterGraph
+
 class Pathfinding:
     @staticmethod
-    def get_neighbors(x, y, width, height, obstacles):
-        # Movimiento en 4 direcciones (Up, Down, Left, Right)
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        neighbors = []
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            # Verificar límites y obstáculos
-            if 0 <= nx < width and 0 <= ny < height:
-                is_obstacle = False
-                for obs in obstacles:
-                    if obs['x'] == nx and obs['y'] == ny and not obs.get('destructible', False):
-                        is_obstacle = True
-                        break
-                if not is_obstacle:
-                    neighbors.append((nx, ny))
-        return neighbors
+    def get_grid(width, height, obstacles, grid=None):
+        # Si el motor ya tiene el GridMap de la versión actual del mapa lo reutilizamos
+        if grid is not None and grid.width == width and grid.height == height:
+            return grid
+        return GridMap(width, height, obstacles)
 
     @staticmethod
-    def bfs(start, goal, width, height, obstacles):
-        queue = collections.deque([start])
-        came_from = {start: None}
-        
+    def get_neighbors(x, y, width, height, obstacles, grid=None):
+        # Movimiento en 4 direcciones (Up, Down, Left, Right), sin obstáculos indestructibles
+        grid = Pathfinding.get_grid(width, height, obstacles, grid)
+        if not grid.contains(x, y):
+            return []
+        return [grid.cell(j) for j in grid.neighbors(grid.index(x, y))]
+
+    @staticmethod
+    def bfs(start, goal, width, height, obstacles, grid=None, stats=None):
+        grid = Pathfinding.get_grid(width, height, obstacles, grid)
+        if not (grid.contains(*start) and grid.contains(*goal)):
+            return []
+        adjacency, passable = grid.adjacency, grid.passable
+        s, g = grid.index(*start), grid.index(*goal)
+        queue = collections.deque([s])
+        came_from = {s: None}
+        expanded = 0
+        peak = 1
+
         while queue:
             current = queue.popleft()
-            if current == goal:
+            expanded += 1
+            if current == g:
                 break
-            
-            for next_node in Pathfinding.get_neighbors(current[0], current[1], width, height, obstacles):
-                if next_node not in came_from:
+
+            for next_node in adjacency[current]:
+                if passable[next_node] and next_node not in came_from:
                     queue.append(next_node)
                     came_from[next_node] = current
-        
-        return Pathfinding.reconstruct_path(came_from, start, goal)
+            if len(queue) > peak:
+                peak = len(queue)
+
+        Pathfinding._record(stats, expanded, peak)
+        return Pathfinding.reconstruct_path(came_from, s, g, grid)
+
+    @staticmethod
+    def bidirectional_bfs(start, goal, width, height, obstacles, grid=None, stats=None):
+        # Mismo camino mínimo que bfs buscando desde los dos extremos (pasillos largos)
+        grid = Pathfinding.get_grid(width, height, obstacles, grid)
+        return SearchAlgorithms.bidirectional_bfs(start, goal, width, height, obstacles, grid=grid, stats=stats)
 
     @staticmethod
-    def dfs(start, goal, width, height, obstacles):
-        stack = [start]
-        came_from = {start: None}
-        
+    def dfs(start, goal, width, height, obstacles, grid=None, stats=None):
+        grid = Pathfinding.get_grid(width, height, obstacles, grid)
+        if not (grid.contains(*start) and grid.contains(*goal)):
+            return []
+        adjacency, passable = grid.adjacency, grid.passable
+        s, g = grid.index(*start), grid.index(*goal)
+        stack = [s]
+        came_from = {s: None}
+        expanded = 0
+        peak = 1
+
         while stack:
             current = stack.pop()
-            if current == goal:
+            expanded += 1
+            if current == g:
                 break
-            
-            for next_node in Pathfinding.get_neighbors(current[0], current[1], width, height, obstacles):
-                if next_node not in came_from:
+
+            for next_node in adjacency[current]:
+                if passable[next_node] and next_node not in came_from:
                     stack.append(next_node)
                     came_from[next_node] = current
-        
-        return Pathfinding.reconstruct_path(came_from, start, goal)
+            if len(stack) > peak:
+                peak = len(stack)
+
+        Pathfinding._record(stats, expanded, peak)
+        return Pathfinding.reconstruct_path(came_from, s, g, grid)
 
     @staticmethod
-    def dijkstra(start, goal, width, height, obstacles, grid_costs=None):
-        # Priority Queue: (cost, (x, y))
-        queue = [(0, start)]
-        came_from = {start: None}
-        cost_so_far = {start: 0}
-        
+    def dijkstra(start, goal, width, height, obstacles, grid_costs=None, grid=None, stats=None):
+        grid = Pathfinding.get_grid(width, height, obstacles, grid)
+        if not (grid.contains(*start) and grid.contains(*goal)):
+            return []
+        adjacency, passable = grid.adjacency, grid.passable
+        s, g = grid.index(*start), grid.index(*goal)
+        costs = Pathfinding._cost_values(grid_costs, grid)
+        # Priority Queue: (cost, índice de celda)
+        queue = [(0, s)]
+        came_from = {s: None}
+        cost_so_far = {s: 0}
+        expanded = 0
+        peak = 1
+
         while queue:
             current_cost, current = heapq.heappop(queue)
-            
-            if current == goal:
+            expanded += 1
+
+            if current == g:
                 break
-            
-            for next_node in Pathfinding.get_neighbors(current[0], current[1], width, height, obstacles):
-                # Costo base 1, más costo del terreno si existiera
-                new_cost = cost_so_far[current] + 1 
+
+            for next_node in adjacency[current]:
+                if not passable[next_node]:
+                    continue
+                # Costo de entrar a la celda: 1, o el del terreno si hay capa de costos
+                new_cost = cost_so_far[current] + (1 if costs is None else costs[next_node])
                 if next_node not in cost_so_far or new_cost < cost_so_far[next_node]:
                     cost_so_far[next_node] = new_cost
                     priority = new_cost
                     heapq.heappush(queue, (priority, next_node))
                     came_from[next_node] = current
-                    
-        return Pathfinding.reconstruct_path(came_from, start, goal)
+            if len(queue) > peak:
+                peak = len(queue)
+
+        Pathfinding._record(stats, expanded, peak)
+        return Pathfinding.reconstruct_path(came_from, s, g, grid)
 
     @staticmethod
-    def a_star(start, goal, width, height, obstacles):
-        queue = [(0, start)]
-        came_from = {start: None}
-        cost_so_far = {start: 0}
-        
+    def a_star(start, goal, width, height, obstacles, grid=None, stats=None, landmarks=False, grid_costs=None):
+        grid = Pathfinding.get_grid(width, height, obstacles, grid)
+        if not (grid.contains(*start) and grid.contains(*goal)):
+            return []
+        adjacency, passable, cells = grid.adjacency, grid.passable, grid.cells
+        s, g = grid.index(*start), grid.index(*goal)
+        gx, gy = goal
+        costs = Pathfinding._cost_values(grid_costs, grid)
+        # Con terreno la heurística se escala por el costo mínimo para seguir siendo admisible
+        scale = 1 if costs is None else getattr(grid_costs, "min_cost", None) or min(costs)
+        # Con landmarks la heurística es ALT (nunca menor que Manhattan)
+        heuristic = Landmarks.for_grid(grid).heuristic_to(g, s) if landmarks else None
+        if heuristic is not None and passable[s] and heuristic(s) == math.inf:
+            Pathfinding._record(stats, 0, 0)
+            return []  # Inicio y meta en zonas separadas por muros
+        # Con ALT los empates de f se rompen por menor h (más cerca de la meta): la
+        # heurística es casi exacta y así no se abre todo el frente de costo igual
+        queue = [(0, s)] if heuristic is None else [(0, 0, s)]
+        came_from = {s: None}
+        cost_so_far = {s: 0}
+        expanded = 0
+        peak = 1
+
         while queue:
-            _, current = heapq.heappop(queue)
-            
-            if current == goal:
+            current = heapq.heappop(queue)[-1]
+            expanded += 1
+
+            if current == g:
                 break
-            
-            for next_node in Pathfinding.get_neighbors(current[0], current[1], width, height, obstacles):
-                new_cost = cost_so_far[current] + 1
+
+            for next_node in adjacency[current]:
+                if not passable[next_node]:
+                    continue
+                new_cost = cost_so_far[current] + (1 if costs is None else costs[next_node])
                 if next_node not in cost_so_far or new_cost < cost_so_far[next_node]:
+                    if heuristic is None:
+                        # Heurística Manhattan
+                        nx, ny = cells[next_node]
+                        priority = new_cost + (abs(gx - nx) + abs(gy - ny)) * scale
+                        heapq.heappush(queue, (priority, next_node))
+                    else:
+                        h = heuristic(next_node)
+                        if h == math.inf:
+                            continue  # Zona desde la que no se llega a la meta
+                        h *= scale
+                        heapq.heappush(queue, (new_cost + h, h, next_node))
                     cost_so_far[next_node] = new_cost
-                    # Heurística Manhattan
-                    priority = new_cost + abs(goal[0] - next_node[0]) + abs(goal[1] - next_node[1])
-                    heapq.heappush(queue, (priority, next_node))
                     came_from[next_node] = current
-                    
-        return Pathfinding.reconstruct_path(came_from, start, goal)
+            if len(queue) > peak:
+                peak = len(queue)
+
+        Pathfinding._record(stats, expanded, peak)
+        return Pathfinding.reconstruct_path(came_from, s, g, grid)
+
+    @staticmethod
+    def alt(start, goal, width, height, obstacles, grid=None, stats=None):
+        # A* con heurística de landmarks (tablas precalculadas una vez por versión del mapa)
+        return Pathfinding.a_star(start, goal, width, height, obstacles, grid=grid, stats=stats, landmarks=True)
+
+    @staticmethod
+    def jps(start, goal, width, height, obstacles, grid=None, stats=None):
+        # Jump Point Search (4 vecinos): mismo largo de camino que a_star, muchos menos nodos
+        grid = Pathfinding.get_grid(width, height, obstacles, grid)
+        return jump_point_search(grid, start, goal, stats)
+
+    @staticmethod
+    def _cost_values(grid_costs, grid):
+        # Costos de terreno por índice de celda (CostMap o array plano); None = todo cuesta 1
+        if grid_costs is None:
+            return None
+        costs = getattr(grid_costs, "values", grid_costs)
+        return costs if len(costs) == grid.size else None
+
+    @staticmethod
+    def _record(stats, expanded, frontier_peak):
+        # Métricas de la última búsqueda para quien las pida (stats es un dict opcional)
+        if stats is not None:
+            stats["expanded"] = expanded
+            stats["frontier_peak"] = frontier_peak
+
+    @staticmethod
+    def hpa(start, goal, width, height, obstacles, grid=None, stats=None):
+        # HPA*: A* sobre el grafo de entradas entre clusters (caminos casi mínimos, mapas grandes)
+        grid = Pathfinding.get_grid(width, height, obstacles, grid)
+        return ClusterGraph.for_grid(grid).find_path(start, goal, stats)
 
     @staticmethod
-    def reconstruct_path(came_from, start, goal):
+    def reconstruct_path(came_from, start, goal, grid):
+        # start / goal / came_from trabajan con índices de celda del GridMap
         if goal not in came_from:
             return []
         current = goal
         path = []
         while current != start:
-            path.append(current)
+            path.append(grid.cell(current))
             current = came_from[current]
-        # Retorna el siguiente paso inmediato (dx, dy)
-        if path:
-            next_step = path[-1]
-            return next_step[0] - start[0], next_step[1] - start[1]
-        return 0, 0
\ No newline at end of file
+        # Retorna el camino completo [start, ..., goal] (vacío si no hay camino)
+        path.append(grid.cell(start))
+        path.reverse()
+        return path
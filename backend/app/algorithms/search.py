@@ -2,58 +2,166 @@
 import heapq
 from collections import deque
 
+from .grid import GridMap, SEARCH_DIRECTIONS
+
 class SearchAlgorithms:
-    
+    # Las búsquedas guardan solo un mapa de padres (índice -> índice) y arman
+    # el camino una vez al llegar a la meta: la memoria queda acotada por el
+    # número de celdas visitadas en vez de una lista de camino por nodo en cola.
+
+    @staticmethod
+    def get_grid(grid_width, grid_height, obstacles, grid=None):
+        """Mapa compacto del mundo: aquí todo obstáculo bloquea (también los destructibles)"""
+        if grid is not None and grid.width == grid_width and grid.height == grid_height:
+            return grid
+        return GridMap(grid_width, grid_height, obstacles,
+                       destructible_passable=False, directions=SEARCH_DIRECTIONS)
+
+    @staticmethod
+    def reconstruct_path(parents, goal, grid):
+        """Camino [start, ..., goal] siguiendo los padres desde la meta"""
+        path = []
+        current = goal
+        while current is not None:
+            path.append(grid.cell(current))
+            current = parents[current]
+        path.reverse()
+        return path
+
     @staticmethod
-    def bfs(start, goal, grid_width, grid_height, obstacles):
+    def bfs(start, goal, grid_width, grid_height, obstacles, grid=None):
         """Búsqueda en Amplitud (Breadth-First Search)"""
-        queue = deque([[start]])
-        visited = set((start[0], start[1]))
-        obs_set = set((o['x'], o['y']) for o in obstacles)
+        if start == goal:
+            return [start]
+        grid = SearchAlgorithms.get_grid(grid_width, grid_height, obstacles, grid)
+        if not (grid.contains(*start) and grid.contains(*goal)):
+            return []
+        adjacency, passable = grid.adjacency, grid.passable
+        s, g = grid.index(*start), grid.index(*goal)
+        queue = deque([s])
+        parents = {s: None}
 
         while queue:
-            path = queue.popleft()
-            x, y = path[-1]
-
-            if (x, y) == goal:
-                return path # Devuelve el camino completo
-
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]: # Vecinos
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < grid_width and 0 <= ny < grid_height:
-                    if (nx, ny) not in visited and (nx, ny) not in obs_set:
-                        visited.add((nx, ny))
-                        new_path = list(path)
-                        new_path.append((nx, ny))
-                        queue.append(new_path)
+            current = queue.popleft()
+            for j in adjacency[current]: # Vecinos
+                if j not in parents and passable[j]:
+                    parents[j] = current
+                    if j == g:
+                        return SearchAlgorithms.reconstruct_path(parents, g, grid) # Camino completo
+                    queue.append(j)
         return []
 
     @staticmethod
-    def a_star(start, goal, grid_width, grid_height, obstacles):
+    def bidirectional_bfs(start, goal, grid_width, grid_height, obstacles, grid=None, stats=None):
+        """
+        BFS desde ambos extremos: en pasillos largos cada lado recorre la mitad.
+        `stats` (opcional) recibe los nodos expandidos y el pico de las fronteras,
+        como en Pathfinding.
+        """
+        if start == goal:
+            SearchAlgorithms._record(stats, 0, 0)
+            return [start]
+        grid = SearchAlgorithms.get_grid(grid_width, grid_height, obstacles, grid)
+        if not (grid.contains(*start) and grid.contains(*goal)):
+            return []
+        adjacency, passable = grid.adjacency, grid.passable
+        s, g = grid.index(*start), grid.index(*goal)
+        if not passable[g]:
+            SearchAlgorithms._record(stats, 0, 0)
+            return [] # La meta bloqueada nunca se alcanza (el inicio sí puede estar sobre un obstáculo)
+
+        # Padres hacia el inicio / hacia la meta, y la distancia de cada celda a su extremo
+        forward, backward = {s: None}, {g: None}
+        dist_forward, dist_backward = {s: 0}, {g: 0}
+        frontier_forward, frontier_backward = [s], [g]
+        expanded, peak = 0, 2
+
+        while frontier_forward and frontier_backward:
+            # Se expande por capas el lado con la frontera más chica
+            if len(frontier_forward) <= len(frontier_backward):
+                frontier, parents, dist = frontier_forward, forward, dist_forward
+                other_dist = dist_backward
+                is_forward = True
+            else:
+                frontier, parents, dist = frontier_backward, backward, dist_backward
+                other_dist = dist_forward
+                is_forward = False
+
+            next_frontier = []
+            best, meeting = None, None
+            expanded += len(frontier)
+            for current in frontier:
+                d = dist[current] + 1
+                for j in adjacency[current]:
+                    if not passable[j] and j != s:
+                        continue
+                    if j in other_dist:
+                        # Se tocan las dos búsquedas: se termina la capa y se queda el cruce más corto
+                        total = d + other_dist[j]
+                        if best is None or total < best:
+                            best, meeting = total, (current, j)
+                        continue
+                    if j not in parents:
+                        parents[j] = current
+                        dist[j] = d
+                        next_frontier.append(j)
+
+            if meeting is not None:
+                SearchAlgorithms._record(stats, expanded, peak)
+                near, far = meeting
+                # near pertenece al lado expandido y far al otro lado
+                if is_forward:
+                    head, tail = near, far
+                else:
+                    head, tail = far, near
+                path = SearchAlgorithms.reconstruct_path(forward, head, grid)
+                current = tail
+                while current is not None:
+                    path.append(grid.cell(current))
+                    current = backward[current]
+                return path
+
+            if is_forward:
+                frontier_forward = next_frontier
+            else:
+                frontier_backward = next_frontier
+            peak = max(peak, len(frontier_forward) + len(frontier_backward))
+        SearchAlgorithms._record(stats, expanded, peak)
+        return []
+
+    @staticmethod
+    def _record(stats, expanded, frontier_peak):
+        if stats is not None:
+            stats["expanded"] = expanded
+            stats["frontier_peak"] = frontier_peak
+
+    @staticmethod
+    def a_star(start, goal, grid_width, grid_height, obstacles, grid=None):
         """Algoritmo A* (A Star)"""
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1]) # Distancia Manhattan
+        if start == goal:
+            return [start]
+        grid = SearchAlgorithms.get_grid(grid_width, grid_height, obstacles, grid)
+        if not (grid.contains(*start) and grid.contains(*goal)):
+            return []
+        adjacency, passable, cells = grid.adjacency, grid.passable, grid.cells
+        s, g = grid.index(*start), grid.index(*goal)
+        gx, gy = goal
 
-        # Cola de prioridad: (costo_f, x, y, camino)
-        pq = [(0, start[0], start[1], [start])]
-        visited = set()
-        obs_set = set((o['x'], o['y']) for o in obstacles)
+        # Cola de prioridad: (costo_f, índice, costo_g, padre). El padre se fija al sacar la celda
+        pq = [(0, s, 0, None)]
+        parents = {}
 
         while pq:
-            cost, x, y, path = heapq.heappop(pq)
+            _, current, cost, parent = heapq.heappop(pq)
+            if current in parents: continue
+            parents[current] = parent
 
-            if (x, y) == goal:
-                return path
+            if current == g:
+                return SearchAlgorithms.reconstruct_path(parents, g, grid)
 
-            if (x, y) in visited: continue
-            visited.add((x, y))
-
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < grid_width and 0 <= ny < grid_height:
-                    if (nx, ny) not in obs_set:
-                        new_cost = len(path) + heuristic((nx, ny), goal)
-                        new_path = list(path)
-                        new_path.append((nx, ny))
-                        heapq.heappush(pq, (new_cost, nx, ny, new_path))
-        return []
\ No newline at end of file
+            new_cost = cost + 1
+            for j in adjacency[current]:
+                if passable[j] and j not in parents:
+                    nx, ny = cells[j]
+                    heapq.heappush(pq, (new_cost + abs(nx - gx) + abs(ny - gy), j, new_cost, current)) # Distancia Manhattan
+        return []
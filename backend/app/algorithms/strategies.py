@@ -0,0 +1,67 @@
+# backend/app/algorithms/strategies.py
+"""
+Registro de estrategias de búsqueda que puede elegir un agente (agent.strategy).
+
+Cada estrategia es una función con la firma de Pathfinding
+(start, goal, width, height, obstacles, grid=None, stats=None) que devuelve el
+camino completo [start, ..., goal] y deja en `stats` los nodos expandidos y el
+pico de la frontera. `shortest` indica si siempre devuelve un camino mínimo:
+esas estrategias pueden compartir caminos cacheados entre sí. `weighted` indica
+si acepta costos de terreno (`grid_costs`).
+"""
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .pathfinding import Pathfinding
+
+DEFAULT_STRATEGY = "a_star"
+
+
+class Strategy(NamedTuple):
+    name: str
+    finder: Callable
+    shortest: bool
+    weighted: bool = False
+
+
+class PathfindingStrategies:
+    _registry: Dict[str, Strategy] = {}
+
+    @staticmethod
+    def register(name: str, finder: Callable, shortest: bool = True, weighted: bool = False):
+        """Agrega (o reemplaza) una estrategia disponible para los agentes."""
+        PathfindingStrategies._registry[name] = Strategy(name, finder, shortest, weighted)
+
+    @staticmethod
+    def get(name: Optional[str]) -> Strategy:
+        """La estrategia pedida, o A* si el nombre no está registrado."""
+        registry = PathfindingStrategies._registry
+        return registry.get(name) or registry[DEFAULT_STRATEGY]
+
+    @staticmethod
+    def names() -> List[str]:
+        return list(PathfindingStrategies._registry)
+
+    @staticmethod
+    def find(name, start, goal, width, height, obstacles, grid=None, costs=None) -> Tuple[List, Dict]:
+        """Corre la estrategia y devuelve (camino, métricas de la llamada)."""
+        strategy = PathfindingStrategies.get(name)
+        stats = {}
+        started = time.perf_counter()
+        if costs is not None and strategy.weighted:
+            path = strategy.finder(start, goal, width, height, obstacles, grid=grid, stats=stats, grid_costs=costs)
+        else:
+            path = strategy.finder(start, goal, width, height, obstacles, grid=grid, stats=stats)
+        stats["micros"] = int((time.perf_counter() - started) * 1e6)
+        stats["algorithm"] = strategy.name
+        return path, stats
+
+
+PathfindingStrategies.register("bfs", Pathfinding.bfs)
+PathfindingStrategies.register("bidirectional_bfs", Pathfinding.bidirectional_bfs)
+PathfindingStrategies.register("dfs", Pathfinding.dfs, shortest=False)
+PathfindingStrategies.register("dijkstra", Pathfinding.dijkstra, weighted=True)
+PathfindingStrategies.register("a_star", Pathfinding.a_star, weighted=True)
+PathfindingStrategies.register("alt", Pathfinding.alt)
+PathfindingStrategies.register("jps", Pathfinding.jps)
+PathfindingStrategies.register("hpa", Pathfinding.hpa, shortest=False)
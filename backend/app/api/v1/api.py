@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import tutorials, projects, auth, tutorial_progress
+from app.api.v1.endpoints import tutorials, projects, auth, tutorial_progress, simulation
 
 api_router = APIRouter()
 
@@ -18,3 +18,7 @@ api_router.include_router(
 # Rutas de proyectos (RF5)
 api_router.include_router(
     projects.router, prefix="/projects", tags=["projects"])
+
+# Control de simulaciones (avance rápido sin WebSocket)
+api_router.include_router(
+    simulation.router, prefix="/simulation", tags=["simulation"])
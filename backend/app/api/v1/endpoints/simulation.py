@@ -0,0 +1,63 @@
+"""
+Endpoints REST de control de simulaciones.
+Permiten ejecutar corridas largas del motor sin el loop del WebSocket.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_active_user
+from app.db.models.user import User
+from app.db.models.project import Project
+from app.services.game_instance import get_engine_handle
+from app.services.engine.loop import find_engine_loop
+from app.schemas.simulation import RunStepsRequest, RunStepsResponse
+
+router = APIRouter()
+
+
+@router.post("/run", response_model=RunStepsResponse)
+async def run_simulation_steps(
+    request: RunStepsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Ejecuta N pasos (o hasta una condición de parada) del motor del workspace
+    tan rápido como permita la CPU y devuelve solo el estado final y un resumen.
+    Equivalente REST de los comandos RUN_STEPS / RUN_UNTIL del WebSocket.
+    """
+    # El permiso se revisa en cada petición, no solo al hidratar: el motor puede
+    # estar ya en memoria por la conexión de otro usuario
+    project = None
+    if request.project_id:
+        project = db.query(Project).filter(Project.id == request.project_id).first()
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Proyecto no encontrado"
+            )
+        if project.user_id != current_user.id and not project.is_public:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="No tienes permisos para ejecutar este proyecto"
+            )
+
+    engine = get_engine_handle(project_id=request.project_id, workspace_id=request.workspace_id)
+
+    # Igual que el WebSocket: hidratamos desde DB solo si el motor no tiene estado
+    if project and project.world_state and await engine.is_empty():
+        await engine.load_state(project.world_state)
+
+    command = "RUN_STEPS" if request.steps else "RUN_UNTIL"
+    state = await engine.command(command, {"steps": request.steps} if request.steps else {})
+    if state.get("type") == "ERROR":
+        # El motor ya está en un avance rápido (de otra petición o de un WebSocket)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=state["message"])
+
+    # Si había espectadores con la simulación en marcha, su loop retoma el ritmo normal
+    engine_loop = find_engine_loop(engine)
+    if engine_loop:
+        engine_loop.ensure_running()
+
+    summary = state["data"].pop("runSummary")
+    return {"summary": summary, "state": state["data"]}
@@ -1,10 +1,9 @@
-import asyncio
 from datetime import datetime
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from app.websockets.connection_manager import manager
-from app.websockets.events import process_command
-from app.services.game_instance import get_engine
+from app.services.game_instance import get_engine_handle, schedule_release
+from app.services.engine.loop import get_engine_loop
 from app.db.session import SessionLocal
 from app.db.models.project import Project
 from app.services.sandbox.code_parser import CodeParser
@@ -19,80 +18,87 @@ async def websocket_endpoint(websocket: WebSocket):
     workspace_id = websocket.query_params.get("workspace") or "default"
     session_id = websocket.query_params.get("instance") or "default_session"
     readonly_flag = websocket.query_params.get("readonly") == "1"
+    # Stream en modo delta (WORLD_DELTA + keyframes periódicos)
+    delta_flag = websocket.query_params.get("delta") == "1"
 
-    # Motor aislado por workspace
-    engine = get_engine(project_id=project_id, workspace_id=workspace_id, session_id=session_id)
+    # Motor aislado por workspace (local o alojado en un worker del EngineHost)
+    engine = get_engine_handle(project_id=project_id, workspace_id=workspace_id, session_id=session_id)
 
     # Hidratamos desde DB solo si el motor no tiene estado
-    if project_id and not (engine.agents or engine.food or engine.obstacles):
+    if project_id and await engine.is_empty():
         session = SessionLocal()
         try:
             project = session.query(Project).filter(Project.id == project_id).first()
             if project and project.world_state:
-                engine.load_state(project.world_state)
+                await engine.load_state(project.world_state)
         finally:
             session.close()
 
     # Registrar conexión en su workspace
-    await manager.connect(websocket, workspace_id, session_id)
+    await manager.connect(websocket, workspace_id, session_id, delta=delta_flag)
     print(f"[WS] Cliente conectado (project={project_id}, workspace={workspace_id}, session={session_id})")
 
+    engine_loop = None
     try:
         # Enviar estado inicial
-        await manager.send_personal_message(engine.get_state(), websocket)
+        await manager.send_personal_message(await engine.get_state(), websocket)
 
-        while True:
-            timeout = engine.speed if engine.is_running else None
-
-            try:
-                raw_data = await asyncio.wait_for(websocket.receive_json(), timeout=timeout)
-                cmd_type = raw_data.get("type")
-                data = raw_data.get("data", {})
+        # El motor avanza en su propio loop (uno por motor); aquí solo nos suscribimos.
+        # Se pide después del envío y sin awaits hasta subscribe(): si el último
+        # espectador se fue mientras tanto, el loop viejo ya no está registrado y se
+        # crea uno nuevo en vez de quedar colgados de uno huérfano.
+        engine_loop = get_engine_loop(engine)
+        engine_loop.subscribe(websocket)
 
-                # En modo lectura solo permitimos controles de simulacion (no mutar mundo)
-                if readonly_flag:
-                    allowed = {"START", "STOP", "PAUSE", "STEP", "SET_SPEED"}
-                    if cmd_type not in allowed:
-                        await manager.send_personal_message(
-                            {"type": "ERROR", "message": "Sesion en modo lectura"},
-                            websocket,
-                        )
-                        continue
+        while True:
+            raw_data = await websocket.receive_json()
+            cmd_type = raw_data.get("type")
+            data = raw_data.get("data", {})
 
-                # Actualizar código custom de agentes
-                if cmd_type == "UPDATE_AGENT_CODE":
-                    new_code = data.get("code")
-                    try:
-                        CodeParser.validate(new_code)
-                        count = 0
-                        for agent in engine.agents:
-                            if getattr(agent, "type", "").lower() == "custom":
-                                agent.custom_code = new_code
-                                count += 1
-                        await manager.send_personal_message(
-                            {"type": "NOTIFICATION", "message": f"Codigo validado y aplicado a {count} agentes."},
-                            websocket,
-                        )
-                    except Exception as e:
-                        await manager.send_personal_message(
-                            {"type": "ERROR", "message": f"Error de seguridad/sintaxis: {str(e)}"},
-                            websocket,
-                        )
+            # En modo lectura solo permitimos controles de simulacion (no mutar mundo);
+            # el avance rápido queda fuera: movería miles de pasos el mundo compartido
+            if readonly_flag:
+                allowed = {"START", "STOP", "PAUSE", "STEP", "SET_SPEED", "GET_PATH_HISTORY"}
+                if cmd_type not in allowed:
+                    await manager.send_personal_message(
+                        {"type": "ERROR", "message": "Sesion en modo lectura"},
+                        websocket,
+                    )
                     continue
 
-                # Procesamiento normal
-                new_state = await process_command(engine, cmd_type, data)
-                if new_state:
-                    await manager.send_personal_message(new_state, websocket)
+            # Actualizar código custom de agentes
+            if cmd_type == "UPDATE_AGENT_CODE":
+                new_code = data.get("code")
+                try:
+                    CodeParser.validate(new_code)
+                    count = await engine.set_custom_code(new_code)
+                    await manager.send_personal_message(
+                        {"type": "NOTIFICATION", "message": f"Codigo validado y aplicado a {count} agentes."},
+                        websocket,
+                    )
+                except Exception as e:
+                    await manager.send_personal_message(
+                        {"type": "ERROR", "message": f"Error de seguridad/sintaxis: {str(e)}"},
+                        websocket,
+                    )
+                continue
+
+            # Procesamiento normal
+            new_state = await engine.command(cmd_type, data)
+            if new_state:
+                await manager.send_personal_message(new_state, websocket)
 
-            except asyncio.TimeoutError:
-                if engine.is_running:
-                    engine.step()
-                    await manager.broadcast(workspace_id, engine.get_state())
+            # START (o cualquier comando que deje el motor corriendo) arranca el loop
+            engine_loop.ensure_running()
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket, workspace_id, session_id)
         print(f"[WS] Cliente desconectado (workspace={workspace_id}, session={session_id})")
     except Exception as e:
-        manager.disconnect(websocket, workspace_id, session_id)
         print(f"[WS] Error critico en loop: {e}")
+    finally:
+        if engine_loop is not None:
+            engine_loop.unsubscribe(websocket)
+        manager.disconnect(websocket, workspace_id, session_id)
+        # Última conexión del motor: se libera (también en su worker) tras un margen
+        if engine_loop is None or not engine_loop.subscribers:
+            schedule_release(engine)
@@ -35,7 +35,10 @@ class Settings(BaseSettings):
     MAX_AGENTS_PER_SIMULATION: int = 100
     DEFAULT_GRID_SIZE: int = 25
     MIN_GRID_SIZE: int = 5
-    MAX_GRID_SIZE: int = 50
+    MAX_GRID_SIZE: int = 1000  # Mapas grandes usan HPA* (ver simulation.HIERARCHICAL_MIN_CELLS)
+    MAX_FAST_FORWARD_STEPS: int = 100_000  # Tope de RUN_STEPS / RUN_UNTIL por petición
+    ENGINE_HOST_WORKERS: int = 0  # Procesos worker para los motores (0 = en el proceso web)
+    ENGINE_RELEASE_GRACE_SECONDS: float = 60.0  # Espera antes de liberar un motor sin conexiones
 
     # === FILE UPLOADS ===
     MAX_UPLOAD_SIZE_MB: int = 10
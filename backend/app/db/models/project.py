@@ -83,9 +83,9 @@ class Project(Base):
 
     # Constraints
     __table_args__ = (
-        CheckConstraint('grid_width >= 5 AND grid_width <= 50',
+        CheckConstraint('grid_width >= 5 AND grid_width <= 1000',
                         name='check_grid_width'),
-        CheckConstraint('grid_height >= 5 AND grid_height <= 50',
+        CheckConstraint('grid_height >= 5 AND grid_height <= 1000',
                         name='check_grid_height'),
         CheckConstraint('cell_size >= 10 AND cell_size <= 50',
                         name='check_cell_size'),
@@ -24,9 +24,9 @@ class ProjectBase(BaseModel):
     thumbnail_url: Optional[str] = Field(None, max_length=500)
     is_public: bool = Field(default=False, description="Visibilidad pública")
     is_template: bool = Field(default=False, description="Es plantilla")
-    grid_width: int = Field(default=25, ge=10, le=100,
+    grid_width: int = Field(default=25, ge=10, le=1000,
                             description="Ancho del grid")
-    grid_height: int = Field(default=25, ge=10, le=100,
+    grid_height: int = Field(default=25, ge=10, le=1000,
                              description="Alto del grid")
     cell_size: int = Field(default=20, ge=10, le=50,
                            description="Tamaño de celda")
@@ -62,8 +62,8 @@ class ProjectUpdate(BaseModel):
     thumbnail_url: Optional[str] = Field(None, max_length=500)
     is_public: Optional[bool] = None
     is_template: Optional[bool] = None
-    grid_width: Optional[int] = Field(None, ge=10, le=100)
-    grid_height: Optional[int] = Field(None, ge=10, le=100)
+    grid_width: Optional[int] = Field(None, ge=10, le=1000)
+    grid_height: Optional[int] = Field(None, ge=10, le=1000)
     cell_size: Optional[int] = Field(None, ge=10, le=50)
     user_code: Optional[str] = None
     code_language: Optional[str] = None
@@ -92,9 +92,9 @@ class ProjectBase(BaseModel):
     thumbnail_url: Optional[str] = Field(None, max_length=500)
     is_public: bool = Field(default=False, description="Visibilidad pública")
     is_template: bool = Field(default=False, description="Es plantilla")
-    grid_width: int = Field(default=25, ge=10, le=100,
+    grid_width: int = Field(default=25, ge=10, le=1000,
                             description="Ancho del grid")
-    grid_height: int = Field(default=25, ge=10, le=100,
+    grid_height: int = Field(default=25, ge=10, le=1000,
                              description="Alto del grid")
     cell_size: int = Field(default=20, ge=10, le=50,
                            description="Tamaño de celda")
@@ -0,0 +1,35 @@
+"""
+Schemas de Pydantic para el control de simulaciones por REST.
+"""
+from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+
+
+class RunStepsRequest(BaseModel):
+    """Avance rápido de una simulación sin pasar por el loop en vivo"""
+    project_id: Optional[str] = Field(None, description="Proyecto del motor")
+    workspace_id: Optional[str] = Field(
+        "default", description="Workspace del motor (igual que ?workspace= en el WebSocket)")
+    steps: Optional[int] = Field(
+        None, ge=1, description="Pasos a ejecutar; vacío = hasta una condición de parada")
+
+
+class RunSummary(BaseModel):
+    """Contadores resumen del avance rápido"""
+    stepsRun: int
+    startStep: int
+    finalStep: int
+    stopped: bool
+    stopReason: Optional[str] = None
+    foodCollected: int
+    foodRemaining: int
+    agentsAlive: int
+    energyConsumed: float
+    coveragePercent: float
+    elapsedMs: float
+
+
+class RunStepsResponse(BaseModel):
+    """Estado final del mundo y resumen del avance"""
+    summary: RunSummary
+    state: Dict[str, Any]
@@ -0,0 +1,264 @@
+# backend/app/services/engine/agent_controller.py
+"""
+Paso vectorizado (NumPy) para los comportamientos integrados más simples.
+
+Los agentes 'reactive' y 'competitive' se copian a un almacén por columnas
+(structure-of-arrays), se decide y aplica el movimiento de todos a la vez con
+operaciones de arrays y al final se vuelca el resultado a los objetos Agent,
+que siguen siendo la fuente de verdad para el resto del motor.
+
+Diferencias con el bucle por objeto (documentadas a propósito):
+- Todos los agentes del lote deciden con las posiciones del inicio del tick.
+  Si dos agentes eligen la misma casilla libre, gana el primero de la lista.
+- 'competitive' avanza con el paso directo hacia el objetivo
+  (mismo criterio que _get_direction_towards) en lugar de planificar con A*.
+"""
+import random
+from typing import List
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él el motor usa el bucle por objeto
+    np = None
+
+# Tipos de agente que soporta el paso vectorizado y su código numérico
+TYPE_CODES = {"reactive": 0, "competitive": 1}
+
+# Mismo orden que _logic_reactive para que la elección aleatoria sea comparable
+NEIGHBOR_OFFSETS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+RANDOM_OFFSETS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+OBS_NONE = 0
+OBS_SOLID = 1
+OBS_DESTRUCTIBLE = 2
+
+
+def vectorization_available() -> bool:
+    return np is not None
+
+
+class AgentStore:
+    """
+    Almacén structure-of-arrays de los agentes que participan en el paso vectorizado.
+    Los arrays se reutilizan entre ticks y solo crecen cuando hace falta.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.agents = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.energy = np.zeros(capacity, dtype=np.float64)
+        self.vision_radius = np.zeros(capacity, dtype=np.int64)
+        self.type_code = np.zeros(capacity, dtype=np.int8)
+        self.steps_taken = np.zeros(capacity, dtype=np.int64)
+
+    def load(self, agents: List):
+        """Copia los atributos de los objetos Agent a los arrays."""
+        n = len(agents)
+        if n > self.capacity:
+            self._allocate(max(n, self.capacity * 2))
+        self.size = n
+        self.agents = agents
+        if n == 0:
+            return
+        self.x[:n] = [a.x for a in agents]
+        self.y[:n] = [a.y for a in agents]
+        self.energy[:n] = [a.energy for a in agents]
+        self.vision_radius[:n] = [
+            5 if getattr(a, "vision_radius", None) is None else a.vision_radius for a in agents
+        ]
+        self.type_code[:n] = [TYPE_CODES[a.type] for a in agents]
+        self.steps_taken[:n] = [a.steps_taken for a in agents]
+
+    def flush(self, old_energy, movers):
+        """Vuelca energía y pasos a los objetos (las posiciones las mueve el motor)."""
+        n = self.size
+        energy = self.energy[:n]
+        for i in np.nonzero(energy != old_energy)[0].tolist():
+            self.agents[i].energy = float(energy[i])
+        for i in movers.tolist():
+            self.agents[i].steps_taken = int(self.steps_taken[i])
+
+
+def is_vectorizable(agent, width: int, height: int) -> bool:
+    return (getattr(agent, "type", None) in TYPE_CODES
+            and 0 <= agent.x < width and 0 <= agent.y < height)
+
+
+def vectorized_step(engine, agents: List) -> List:
+    """
+    Ejecuta el tick de los agentes vectorizables y devuelve los agentes
+    restantes, que el motor procesa después con el bucle normal.
+    """
+    eligible = [is_vectorizable(a, engine.width, engine.height) for a in agents]
+    batch = [a for a, ok in zip(agents, eligible) if ok and a.energy > 0]
+    rest = [a for a, ok in zip(agents, eligible) if not ok]
+    if not batch:
+        return rest
+
+    if engine.agent_store is None:
+        engine.agent_store = AgentStore()
+    store = engine.agent_store
+    store.load(batch)
+    n = store.size
+    W, H = engine.width, engine.height
+    rng = np.random.default_rng(random.getrandbits(32))
+
+    x = store.x[:n]
+    y = store.y[:n]
+    energy = store.energy[:n]
+    old_energy = energy.copy()
+
+    # --- 1. Rejillas del mundo (con borde de 1 celda para vecinos fuera de límites) ---
+    obstacle_grid = np.zeros((W + 2, H + 2), dtype=np.int8)
+    for (ox, oy), obs in engine.grid.obstacles.items():
+        if 0 <= ox < W and 0 <= oy < H:
+            obstacle_grid[ox + 1, oy + 1] = OBS_DESTRUCTIBLE if obs.get("destructible", False) else OBS_SOLID
+
+    all_x = np.fromiter((a.x for a in engine.agents), dtype=np.int64, count=len(engine.agents))
+    all_y = np.fromiter((a.y for a in engine.agents), dtype=np.int64, count=len(engine.agents))
+    agent_grid = np.zeros((W + 2, H + 2), dtype=bool)
+    inside = (all_x >= 0) & (all_x < W) & (all_y >= 0) & (all_y < H)
+    agent_grid[all_x[inside] + 1, all_y[inside] + 1] = True
+
+    # Igual que _is_blocked: los obstáculos destructibles no bloquean la IA
+    blocked_grid = (obstacle_grid == OBS_SOLID) | agent_grid
+
+    # --- 2. Decisión ---
+    has_target = np.zeros(n, dtype=bool)
+    tx = np.zeros(n, dtype=np.int64)
+    ty = np.zeros(n, dtype=np.int64)
+    is_competitive = store.type_code[:n] == TYPE_CODES["competitive"]
+
+    if engine.food:
+        fx = np.fromiter((f['x'] for f in engine.food), dtype=np.int64, count=len(engine.food))
+        fy = np.fromiter((f['y'] for f in engine.food), dtype=np.int64, count=len(engine.food))
+        dist = np.abs(x[:, None] - fx[None, :]) + np.abs(y[:, None] - fy[None, :])
+        visible = dist <= store.vision_radius[:n, None]
+        has_target = visible.any(axis=1)
+
+        # Reactivo: la comida visible más cercana (primera en caso de empate)
+        nearest = np.where(visible, dist, np.iinfo(np.int64).max).argmin(axis=1)
+
+        # Competitivo: distancia del rival más cercano a cada comida (excluyéndose a sí mismo)
+        if is_competitive.any():
+            all_dist = np.abs(all_x[:, None] - fx[None, :]) + np.abs(all_y[:, None] - fy[None, :])
+            closest = all_dist.argmin(axis=0)
+            min1 = all_dist[closest, np.arange(len(fx))]
+            if len(all_x) > 1:
+                min2 = np.partition(all_dist, 1, axis=0)[1]
+            else:
+                min2 = np.full(len(fx), np.iinfo(np.int64).max)
+            index_of = {id(a): i for i, a in enumerate(engine.agents)}
+            own = np.array([index_of[id(a)] for a in batch], dtype=np.int64)
+            enemy = np.where(closest[None, :] == own[:, None], min2[None, :], min1[None, :])
+            score = np.where(enemy <= dist, -100, 100 - dist).astype(np.float64)
+            score[~visible] = -np.inf
+            best = score.argmax(axis=1)
+            target = np.where(is_competitive, best, nearest)
+        else:
+            target = nearest
+
+        tx = fx[target]
+        ty = fy[target]
+
+    # Paso directo hacia el objetivo (réplica vectorizada de _get_direction_towards)
+    ddx = tx - x
+    ddy = ty - y
+    sx = np.where(ddx > 0, 1, -1)
+    sy = np.where(ddy > 0, 1, -1)
+    x_first = np.abs(ddx) > np.abs(ddy)
+    p_dx = np.where(x_first, sx, 0)
+    p_dy = np.where(x_first, 0, sy)
+    s_dx = np.where(x_first, 0, sx)
+    s_dy = np.where(x_first, sy, 0)
+    p_free = ~blocked_grid[x + p_dx + 1, y + p_dy + 1]
+    s_free = ~blocked_grid[x + s_dx + 1, y + s_dy + 1]
+    t_dx = np.where(p_free, p_dx, np.where(s_free, s_dx, 0))
+    t_dy = np.where(p_free, p_dy, np.where(s_free, s_dy, 0))
+
+    # Sin objetivo: reactivo elige un vecino libre al azar, competitivo cualquier dirección
+    offsets = np.array(NEIGHBOR_OFFSETS, dtype=np.int64)
+    nx = x[:, None] + offsets[None, :, 0]
+    ny = y[:, None] + offsets[None, :, 1]
+    in_bounds = (nx >= 0) & (nx < W) & (ny >= 0) & (ny < H)
+    valid = in_bounds & ~blocked_grid[np.clip(nx + 1, 0, W + 1), np.clip(ny + 1, 0, H + 1)]
+    pick = np.where(valid, rng.random((n, 4)) + 1.0, 0.0)
+    choice = pick.argmax(axis=1)
+    any_valid = valid.any(axis=1)
+    r_dx = np.where(any_valid, offsets[choice, 0], 0)
+    r_dy = np.where(any_valid, offsets[choice, 1], 0)
+
+    random_offsets = np.array(RANDOM_OFFSETS, dtype=np.int64)
+    c_choice = rng.integers(0, 4, size=n)
+    c_dx = random_offsets[c_choice, 0]
+    c_dy = random_offsets[c_choice, 1]
+
+    w_dx = np.where(is_competitive, c_dx, r_dx)
+    w_dy = np.where(is_competitive, c_dy, r_dy)
+    dx = np.where(has_target, t_dx, w_dx)
+    dy = np.where(has_target, t_dy, w_dy)
+
+    # --- 3. Movimiento (réplica vectorizada de _apply_movement) ---
+    new_x = np.clip(x + dx, 0, W - 1)
+    new_y = np.clip(y + dy, 0, H - 1)
+    obs_kind = obstacle_grid[new_x + 1, new_y + 1]
+    stays = (new_x == x) & (new_y == y)
+
+    # Choque contra obstáculo indestructible
+    solid_hit = obs_kind == OBS_SOLID
+    energy[solid_hit] -= 0.1
+
+    # Obstáculos destructibles: pocos casos, se resuelven en orden
+    for i in np.nonzero(obs_kind == OBS_DESTRUCTIBLE)[0].tolist():
+        obstacle = engine.grid.obstacle_at(int(new_x[i]), int(new_y[i]))
+        if obstacle is None:
+            continue  # Otro agente del lote ya lo rompió este tick
+        cost = obstacle.get("cost", 20)
+        if energy[i] > cost:
+            energy[i] -= cost
+            engine.obstacles.remove(obstacle)
+            engine.grid.remove_obstacle(obstacle)
+            print(f"💥 Agente {batch[i].id} rompió muro en ({new_x[i]}, {new_y[i]})")
+        else:
+            energy[i] -= 0.1
+
+    # Casilla libre de obstáculos y sin otro agente (o el propio agente sin desplazarse)
+    free = (obs_kind == OBS_NONE) & (stays | ~agent_grid[new_x + 1, new_y + 1])
+    candidates = np.nonzero(free)[0]
+    if len(candidates):
+        # Si varios agentes eligen la misma casilla, gana el primero de la lista
+        cells = new_x[candidates] * H + new_y[candidates]
+        _, first = np.unique(cells, return_index=True)
+        movers = np.sort(candidates[first])
+    else:
+        movers = candidates
+
+    # Gasto de moverse escalado por el costo de la celda de llegada (array del terreno, sin copiar)
+    terrain = np.frombuffer(engine.terrain.values, dtype=np.float64)
+    energy[movers] -= 0.5 * terrain[new_x[movers] * H + new_y[movers]]
+    store.steps_taken[movers] += 1
+
+    # --- 4. Aplicar posiciones y recoger comida ---
+    grid = engine.grid
+    for i in movers.tolist():
+        agent = batch[i]
+        mx, my = int(new_x[i]), int(new_y[i])
+        grid.move_agent(agent, mx, my)
+        agent.path_history.append((mx, my))
+        agent.visited.add((mx, my))
+        engine.coverage.visit(mx, my)
+        f = grid.food_at(mx, my)
+        if f:
+            energy[i] = min(150, energy[i] + f.get("value", 20))
+            engine.food.remove(f)
+            grid.remove_food(f)
+            engine.claims.release((mx, my))
+
+    store.flush(old_energy, movers)
+    return rest
@@ -0,0 +1,358 @@
+# backend/app/services/engine/host.py
+"""
+Alojamiento de motores de simulación.
+
+Las conexiones WebSocket, el EngineLoop y la API REST hablan con los motores a
+través de un "handle" asíncrono con la misma interfaz en los dos modos:
+
+- LocalEngine: el motor vive en el proceso de uvicorn (modo por defecto).
+- RemoteEngine: el motor vive como actor en un proceso worker del EngineHost
+  (Settings.ENGINE_HOST_WORKERS > 0). Los comandos viajan por un Pipe y los
+  frames vuelven ya codificados en JSON, así step() y la serialización usan
+  todos los núcleos y un mundo pesado no bloquea a los demás usuarios.
+"""
+import asyncio
+import itertools
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Peso fijo por motor al repartir: evita amontonar motores nuevos (aún sin medir)
+ENGINE_BASE_LOAD_MS = 1.0
+# Suavizado de la media móvil del tiempo de step por motor
+LOAD_EMA_ALPHA = 0.2
+# Cada cuánto se revisa si terminó un avance rápido local antes de tocar el motor
+FAST_FORWARD_POLL_SECONDS = 0.05
+
+
+def tick_engine(engine, full: bool, delta: bool) -> Dict[str, Any]:
+    """Un tick del loop en vivo: avanza el motor y arma los frames pedidos."""
+    if engine.is_fast_forwarding:
+        # El motor está en un avance rápido en otro hilo: este tick no se envía
+        return {"delta": None, "full": None, "stepMs": 0.0}
+    started = time.perf_counter()
+    try:
+        engine.step()
+    except Exception as e:
+        print(f"[EngineHost] Error en step, se detiene la simulación: {e}")
+        engine.is_running = False
+    step_ms = (time.perf_counter() - started) * 1000
+    return {
+        "delta": engine.get_delta_state() if delta else None,
+        "full": engine.get_tick_state() if full else None,
+        "stepMs": step_ms,
+    }
+
+
+# =========================================================
+# MODO LOCAL
+# =========================================================
+class LocalEngine:
+    """
+    Handle de un motor que vive en este mismo proceso.
+
+    El avance rápido corre en un hilo aparte (events.fast_forward): lo que lee o
+    reemplaza el estado espera a que termine en lugar de tocar el motor a mitad
+    de la corrida. En los workers no hace falta: atienden una petición por vez.
+    """
+
+    def __init__(self, key: str, engine):
+        self.key = key
+        self.engine = engine
+
+    @property
+    def is_running(self) -> bool:
+        return self.engine.is_running
+
+    @property
+    def speed(self) -> float:
+        return self.engine.speed
+
+    async def command(self, cmd_type: str, data: dict):
+        from app.websockets.events import process_command
+        return await process_command(self.engine, cmd_type, data)
+
+    async def _wait_fast_forward(self):
+        while self.engine.is_fast_forwarding:
+            await asyncio.sleep(FAST_FORWARD_POLL_SECONDS)
+
+    async def get_state(self):
+        await self._wait_fast_forward()
+        return self.engine.get_state()
+
+    async def is_empty(self) -> bool:
+        return not (self.engine.agents or self.engine.food or self.engine.obstacles)
+
+    async def load_state(self, state: Dict[str, Any]):
+        await self._wait_fast_forward()
+        self.engine.load_state(state)
+
+    async def set_custom_code(self, code: str) -> int:
+        await self._wait_fast_forward()
+        return self.engine.set_custom_code(code)
+
+    async def tick(self, full: bool, delta: bool) -> Dict[str, Any]:
+        return tick_engine(self.engine, full, delta)
+
+    async def release(self):
+        pass
+
+
+# =========================================================
+# MODO PROCESOS (actores en workers)
+# =========================================================
+def _worker_main(conn):
+    """
+    Bucle de un proceso worker: mantiene sus motores por clave y atiende
+    peticiones (req_id, key, op, args) en orden.
+    """
+    from app.simulation import SimulationEngine
+    from app.websockets.events import apply_command
+
+    engines: Dict[str, Any] = {}
+
+    def _engine(key):
+        if key not in engines:
+            engines[key] = SimulationEngine()
+        return engines[key]
+
+    def _tick(engine, full, delta):
+        frames = tick_engine(engine, full, delta)
+        # Los frames viajan ya codificados: el proceso web solo los reenvía
+        for kind in ("full", "delta"):
+            if frames[kind] is not None:
+                frames[kind] = json.dumps(frames[kind])
+        return frames
+
+    ops = {
+        "command": lambda e, cmd_type, data: apply_command(e, cmd_type, data),
+        "get_state": lambda e: e.get_state(),
+        "is_empty": lambda e: not (e.agents or e.food or e.obstacles),
+        "load_state": lambda e, state: e.load_state(state),
+        "set_custom_code": lambda e, code: e.set_custom_code(code),
+        "tick": _tick,
+    }
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        req_id, key, op, args = message
+        if op == "release":
+            engines.pop(key, None)
+            conn.send((req_id, True, None, False, 0.5))
+            continue
+        engine = _engine(key)
+        try:
+            result = ops[op](engine, *args)
+            conn.send((req_id, True, result, engine.is_running, engine.speed))
+        except Exception as e:
+            conn.send((req_id, False, repr(e), engine.is_running, engine.speed))
+
+
+class _Worker:
+    """
+    Lado del proceso web de un worker: envía peticiones y resuelve futures.
+
+    Escribir en el Pipe bloquea (un load_state grande, un worker ocupado que no
+    lee), así que las peticiones pasan por una cola a un hilo escritor y el event
+    loop nunca espera al worker. Si el proceso muere el worker queda marcado como
+    caído: las peticiones en vuelo y las nuevas fallan en vez de colgarse.
+    """
+
+    def __init__(self, ctx, index: int):
+        self.index = index
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True,
+                                   name=f"engine-worker-{index}")
+        self.process.start()
+        child_conn.close()
+        self.alive = True
+        self.engine_loads: Dict[str, float] = {}  # key -> media del tiempo de step (ms)
+        self._pending: Dict[int, Any] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._outbox = queue.SimpleQueue()
+        self._stopping = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @property
+    def load(self) -> float:
+        return sum(ENGINE_BASE_LOAD_MS + ms for ms in self.engine_loads.values())
+
+    async def call(self, key: str, op: str, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if not self.alive:
+                raise RuntimeError(f"[EngineHost] El worker {self.index} no está disponible")
+            req_id = next(self._ids)
+            self._pending[req_id] = (loop, future)
+        self._outbox.put((req_id, key, op, args))
+        return await future
+
+    def stop(self):
+        """Pide al proceso que termine (después de lo que ya está en cola)."""
+        self._stopping = True
+        self._outbox.put(None)
+
+    def _write_loop(self):
+        while True:
+            message = self._outbox.get()
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError):
+                self._mark_dead()
+                break
+            except Exception as e:
+                # No se pudo serializar la petición: falla solo esa
+                self._fail([message[0]], repr(e))
+                continue
+            if message is None:
+                break
+
+    def _read_loop(self):
+        while True:
+            try:
+                req_id, ok, result, is_running, speed = self.conn.recv()
+            except (EOFError, OSError):
+                self._mark_dead()
+                break
+            with self._lock:
+                loop, future = self._pending.pop(req_id)
+            loop.call_soon_threadsafe(_resolve, future, ok, (result, is_running, speed))
+
+    def _mark_dead(self):
+        with self._lock:
+            if not self.alive:
+                return
+            self.alive = False
+            pending = list(self._pending)
+        if not self._stopping:
+            print(f"[EngineHost] Se perdió la conexión con el worker {self.index}")
+        self._fail(pending, "worker terminado")
+        self._outbox.put(None)  # Despierta al escritor si está esperando
+
+    def _fail(self, req_ids, reason: str):
+        with self._lock:
+            entries = [self._pending.pop(req_id) for req_id in req_ids if req_id in self._pending]
+        for loop, future in entries:
+            loop.call_soon_threadsafe(_resolve, future, False, (reason, False, 0.5))
+
+
+def _resolve(future, ok, payload):
+    if future.done():
+        return
+    if ok:
+        future.set_result(payload)
+    else:
+        future.set_exception(RuntimeError(f"[EngineHost] Error en worker: {payload[0]}"))
+
+
+class EngineHost:
+    """
+    Pool de procesos worker; cada motor se asigna al worker con menos carga.
+    Un worker caído se reemplaza por uno nuevo la próxima vez que se pide un
+    motor; los motores que alojaba se pierden y se vuelven a ubicar (vacíos, así
+    que la próxima conexión los hidrata desde la DB).
+    """
+
+    def __init__(self, workers: int):
+        self._ctx = multiprocessing.get_context("spawn")
+        self.workers = [_Worker(self._ctx, i) for i in range(workers)]
+        self._placement: Dict[str, _Worker] = {}
+
+    def _replace_dead_workers(self):
+        for i, worker in enumerate(self.workers):
+            if worker.alive:
+                continue
+            for key in worker.engine_loads:
+                self._placement.pop(key, None)
+            self.workers[i] = _Worker(self._ctx, i)
+            print(f"[EngineHost] Worker {i} reiniciado ({len(worker.engine_loads)} motores perdidos)")
+
+    def worker_for(self, key: str) -> _Worker:
+        worker = self._placement.get(key)
+        if worker is None or not worker.alive:
+            self._replace_dead_workers()
+            worker = min(self.workers, key=lambda w: w.load)
+            worker.engine_loads[key] = 0.0
+            self._placement[key] = worker
+        return worker
+
+    def report_step(self, key: str, step_ms: float):
+        worker = self._placement.get(key)
+        if worker is not None:
+            previous = worker.engine_loads.get(key, step_ms)
+            worker.engine_loads[key] = previous + LOAD_EMA_ALPHA * (step_ms - previous)
+
+    def forget(self, key: str):
+        worker = self._placement.pop(key, None)
+        if worker is not None:
+            worker.engine_loads.pop(key, None)
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.stop()
+        for worker in self.workers:
+            worker.process.join(timeout=2)
+
+
+class RemoteEngine:
+    """Handle de un motor alojado en un worker del EngineHost."""
+
+    def __init__(self, key: str, host: EngineHost):
+        self.key = key
+        self.host = host
+        # Últimos valores informados por el worker (los usa el EngineLoop)
+        self.is_running = False
+        self.speed = 0.5
+
+    async def _call(self, op: str, *args):
+        worker = self.host.worker_for(self.key)
+        result, self.is_running, self.speed = await worker.call(self.key, op, *args)
+        return result
+
+    async def command(self, cmd_type: str, data: dict):
+        return await self._call("command", cmd_type, data)
+
+    async def get_state(self):
+        return await self._call("get_state")
+
+    async def is_empty(self) -> bool:
+        return await self._call("is_empty")
+
+    async def load_state(self, state: Dict[str, Any]):
+        await self._call("load_state", state)
+
+    async def set_custom_code(self, code: str) -> int:
+        return await self._call("set_custom_code", code)
+
+    async def tick(self, full: bool, delta: bool) -> Dict[str, Any]:
+        frames = await self._call("tick", full, delta)
+        self.host.report_step(self.key, frames["stepMs"])
+        return frames
+
+    async def release(self):
+        await self._call("release")
+        self.host.forget(self.key)
+
+
+_host: Optional[EngineHost] = None
+
+
+def get_engine_host(workers: int) -> EngineHost:
+    """Crea el pool la primera vez que se necesita."""
+    global _host
+    if _host is None:
+        _host = EngineHost(workers)
+    return _host
@@ -0,0 +1,91 @@
+# backend/app/services/engine/loop.py
+"""
+Reloj central de la simulación: una sola tarea asyncio por motor en ejecución.
+
+Antes cada conexión WebSocket avanzaba el motor en su propio timeout, así que con
+varias pestañas abiertas el mundo corría N veces más rápido y se enviaban frames
+repetidos. Ahora las conexiones solo se suscriben al EngineLoop de su motor y el
+ritmo de ticks no depende de cuántas haya.
+
+El loop trabaja sobre el handle del motor (ver host.py), así que funciona igual
+con el motor en este proceso o alojado en un worker del EngineHost.
+"""
+import asyncio
+from typing import Dict, Set
+
+from fastapi import WebSocket
+
+from app.websockets.connection_manager import manager
+
+# clave del motor -> EngineLoop
+_loops: Dict[str, "EngineLoop"] = {}
+
+
+class EngineLoop:
+    """
+    Avanza un motor a paso fijo (engine.speed segundos por tick) y difunde cada
+    frame a sus suscriptores. El siguiente tick se agenda sobre un reloj absoluto,
+    de modo que el tiempo de step() y del envío no acumula deriva; si el motor se
+    atrasa más de un tick, se descarta el atraso en vez de encadenar ticks.
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.subscribers: Set[WebSocket] = set()
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, websocket: WebSocket):
+        self.subscribers.add(websocket)
+        self.ensure_running()
+
+    def unsubscribe(self, websocket: WebSocket):
+        self.subscribers.discard(websocket)
+        if not self.subscribers:
+            if self._task and not self._task.done():
+                self._task.cancel()
+            # Solo si seguimos registrados: la clave pudo pasar ya a un loop más nuevo
+            if _loops.get(self.handle.key) is self:
+                del _loops[self.handle.key]
+
+    def ensure_running(self):
+        """Arranca la tarea si el motor está corriendo y hay alguien mirando."""
+        if not (self.handle.is_running and self.subscribers):
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        clock = asyncio.get_running_loop()
+        next_tick = clock.time()
+        while self.handle.is_running and self.subscribers:
+            next_tick += self.handle.speed
+            subscribers = list(self.subscribers)
+            wants_delta = [ws in manager.delta_connections for ws in subscribers]
+            try:
+                frames = await self.handle.tick(full=not all(wants_delta), delta=any(wants_delta))
+            except Exception as e:
+                print(f"[EngineLoop] Error en tick, se detiene el loop: {e}")
+                break
+            await manager.send_frames(subscribers, frames["full"], frames["delta"])
+
+            delay = next_tick - clock.time()
+            if delay < 0:
+                # Atrasados: re-sincronizamos el reloj en lugar de ponernos al día de golpe
+                next_tick = clock.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+
+def get_engine_loop(handle) -> EngineLoop:
+    """Retorna (creando si hace falta) el loop del motor."""
+    loop = _loops.get(handle.key)
+    if loop is None or loop.handle is not handle:
+        loop = EngineLoop(handle)
+        _loops[handle.key] = loop
+    return loop
+
+
+def find_engine_loop(handle) -> EngineLoop | None:
+    """Retorna el loop del motor solo si ya existe (hay suscriptores)."""
+    loop = _loops.get(handle.key)
+    return loop if loop is not None and loop.handle is handle else None
@@ -0,0 +1,152 @@
+# backend/app/services/engine/perception.py
+"""
+Percepción compartida del tick: estructuras que se construyen una sola vez al
+inicio de cada paso y que leen todas las lógicas de agente en lugar de volver a
+recorrer self.agents.
+
+Como en el paso vectorizado, las posiciones son las del inicio del tick: un
+agente que ya se movió en este tick sigue figurando donde estaba.
+
+AgentPerception es la vista de un solo agente (la `perception` del código
+personalizado): se arma al momento y calcula cada campo solo si se usa.
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, List, Tuple
+
+from .world import SpatialBuckets, Cell
+
+INF = float('inf')
+
+
+class TickSnapshot:
+    """
+    Posiciones de los agentes al inicio del tick:
+    - `agents_at`: celda -> agentes en esa celda (índice de posiciones),
+    - `agent_index`: las mismas celdas en cubetas para consultas por cercanía,
+    - `rival_distance`: distancia del agente más cercano a una celda sin contar
+      a uno dado, calculada la primera vez que se pide y guardada por celda.
+    """
+
+    def __init__(self, agents: List[Any], step: int = 0):
+        self.step = step
+        self.agents_at: Dict[Cell, Tuple[Any, ...]] = {}
+        for a in agents:
+            cell = (a.x, a.y)
+            self.agents_at[cell] = self.agents_at.get(cell, ()) + (a,)
+        self.agent_index = SpatialBuckets()
+        for cell, group in self.agents_at.items():
+            self.agent_index.add(cell, (cell, group))
+        # celda -> (agentes más cercanos, su distancia, distancia del siguiente agente)
+        self._nearest: Dict[Cell, Tuple[Tuple[Any, ...], float, float]] = {}
+
+    def agents_near(self, x: int, y: int, radius: int) -> List[Any]:
+        """Agentes a distancia Manhattan <= radius de (x, y)."""
+        return [a for _, group in self.agent_index.within(x, y, radius) for a in group]
+
+    def rival_distance(self, cell: Cell, agent: Any) -> float:
+        """Distancia Manhattan desde `cell` al agente más cercano que no sea `agent`."""
+        entry = self._nearest.get(cell)
+        if entry is None:
+            entry = self._nearest_two(cell)
+            self._nearest[cell] = entry
+        group, first, second = entry
+        if len(group) == 1 and group[0] is agent:
+            return second
+        return first
+
+    def _nearest_two(self, cell: Cell):
+        nearest = self.agent_index.k_nearest(cell[0], cell[1], 2)
+        if not nearest:
+            return (), INF, INF
+        first, (_, group) = nearest[0]
+        if len(group) > 1:
+            return group, first, first  # Dos agentes en la misma celda
+        return group, first, nearest[1][0] if len(nearest) > 1 else INF
+
+
+class AgentPerception(Mapping):
+    """
+    Lo que ve un agente personalizado. Se usa como el diccionario de siempre
+    (perception["nearby_food"], perception.get("x"), ...), pero cada campo se
+    calcula recién la primera vez que el código del usuario lo pide y sale de los
+    índices del motor, recortado al radio de visión del agente.
+
+    Además ofrece consultas directas para no recorrer listas desde el código del
+    usuario: is_blocked(x, y), food_in_radius(r) y get_neighbors().
+
+    No guarda el motor ni el agente: solo sus valores y las pocas consultas que
+    necesita, para que el código del usuario no llegue al resto del mundo.
+    """
+
+    FIELDS = ("x", "y", "energy", "width", "height", "nearby_food", "nearby_obstacles")
+
+    def __init__(self, engine, agent):
+        self._x, self._y = agent.x, agent.y
+        self._width, self._height = engine.width, engine.height
+        self._vision = engine._get_vision_radius(agent)
+        self._values: Dict[str, Any] = {
+            "x": self._x, "y": self._y, "energy": agent.energy,
+            "width": self._width, "height": self._height,
+        }
+        self._blocked = engine._is_blocked
+        self._visible_food = lambda: engine._get_visible_food(agent)
+        self._obstacles = lambda: engine.grid.obstacles
+
+    # --- INTERFAZ DE DICCIONARIO ---
+
+    def __getitem__(self, key: str):
+        values = self._values
+        if key not in values:
+            if key not in self.FIELDS:
+                raise KeyError(key)
+            values[key] = getattr(self, "_field_" + key)()
+        return values[key]
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    # --- CONSULTAS ---
+
+    def in_view(self, x: int, y: int) -> bool:
+        return abs(x - self._x) + abs(y - self._y) <= self._vision
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        """
+        ¿La celda bloquea el paso? Fuera del mapa siempre; fuera del radio de visión
+        el agente no lo sabe y responde False. Los muros destructibles no bloquean.
+        """
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return True
+        return self.in_view(x, y) and self._blocked(x, y)
+
+    def food_in_radius(self, radius: int) -> List[Cell]:
+        """Comida alcanzable a distancia Manhattan <= radius (como mucho el radio de visión)."""
+        radius = min(radius, self._vision)
+        if radius == self._vision:
+            return self["nearby_food"]
+        return [cell for cell in self["nearby_food"]
+                if abs(cell[0] - self._x) + abs(cell[1] - self._y) <= radius]
+
+    def get_neighbors(self) -> List[Cell]:
+        """Celdas vecinas (arriba, derecha, abajo, izquierda) a las que se puede mover."""
+        x, y = self._x, self._y
+        return [(x + dx, y + dy) for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0))
+                if not self.is_blocked(x + dx, y + dy)]
+
+    # --- CAMPOS ---
+
+    def _field_nearby_food(self):
+        return [(f['x'], f['y']) for f in self._visible_food()]
+
+    def _field_nearby_obstacles(self):
+        # Lo que sea más chico: las celdas del rombo de visión o la lista de obstáculos
+        x, y, r = self._x, self._y, self._vision
+        obstacles = self._obstacles()
+        if 2 * r * (r + 1) + 1 > len(obstacles):
+            return [cell for cell in obstacles if abs(cell[0] - x) + abs(cell[1] - y) <= r]
+        return [(x + dx, y + dy) for dx in range(-r, r + 1)
+                for dy in range(-(r - abs(dx)), r - abs(dx) + 1)
+                if (x + dx, y + dy) in obstacles]
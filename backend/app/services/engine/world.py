@@ -0,0 +1,620 @@
+# backend/app/services/engine/world.py
+"""
+Estructuras de datos del mundo (grid) compartidas por el motor de simulación.
+"""
+import base64
+import heapq
+import sys
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ...agents.models import VisitedMap
+
+Cell = Tuple[int, int]
+
+# Cambios de obstáculos recordados para la replanificación incremental
+LAYOUT_LOG_SIZE = 256
+# Lado (en celdas) de las cubetas del índice espacial de comida
+BUCKET_SIZE = 8
+
+
+class SpatialBuckets:
+    """
+    Índice espacial por cubetas uniformes: el mapa se parte en cuadrados de
+    `size` x `size` celdas y cada cubeta guarda sus entidades {celda: (orden, item)}.
+
+    Una consulta por radio solo mira las cubetas que tocan la zona (no la lista
+    completa) y el vecino más cercano recorre anillos de cubetas hasta que el
+    siguiente anillo ya no puede mejorar lo encontrado. Los empates se resuelven
+    por orden de inserción, igual que al recorrer la lista original.
+    """
+
+    def __init__(self, size: int = BUCKET_SIZE):
+        self.size = size
+        self._buckets: Dict[Cell, Dict[Cell, Tuple[int, Any]]] = {}
+        self._seq = 0
+        self.count = 0
+
+    def clear(self):
+        self._buckets.clear()
+        self.count = 0
+
+    def add(self, cell: Cell, item: Any):
+        key = (cell[0] // self.size, cell[1] // self.size)
+        bucket = self._buckets.setdefault(key, {})
+        if cell not in bucket:
+            self.count += 1
+        self._seq += 1
+        bucket[cell] = (self._seq, item)
+
+    def remove(self, cell: Cell):
+        key = (cell[0] // self.size, cell[1] // self.size)
+        bucket = self._buckets.get(key)
+        if bucket and bucket.pop(cell, None) is not None:
+            self.count -= 1
+            if not bucket:
+                del self._buckets[key]
+
+    def within(self, x: int, y: int, radius: int) -> List[Any]:
+        """Entidades a distancia Manhattan <= radius de (x, y), en orden de inserción."""
+        found = []
+        for bucket in self._buckets_in_square(x, y, radius):
+            for (cx, cy), entry in bucket.items():
+                if abs(cx - x) + abs(cy - y) <= radius:
+                    found.append(entry)
+        found.sort(key=lambda e: e[0])
+        return [item for _, item in found]
+
+    def nearest(self, x: int, y: int, max_radius: Optional[int] = None,
+                accept: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        Entidad más cercana (Manhattan) a (x, y) que cumpla `accept`, hasta `max_radius`.
+        None si no hay ninguna.
+        """
+        best = self.k_nearest(x, y, 1, max_radius, accept)
+        return best[0][1] if best else None
+
+    def k_nearest(self, x: int, y: int, k: int, max_radius: Optional[int] = None,
+                  accept: Optional[Callable[[Any], bool]] = None) -> List[Tuple[int, Any]]:
+        """Las `k` entidades más cercanas como [(distancia, item), ...] de menor a mayor."""
+        size, buckets = self.size, self._buckets
+        bx, by = x // size, y // size
+        # Distancia de (x, y) a los bordes de su cubeta (para acotar cada anillo)
+        left, right = x - bx * size, (bx + 1) * size - 1 - x
+        down, up = y - by * size, (by + 1) * size - 1 - y
+        edge = min(left, right, down, up)
+        best = []  # (distancia, orden, item), ordenada
+        seen = 0
+        ring = 0
+        while seen < len(buckets):
+            # Todo lo que está en el anillo `ring` queda al menos a esta distancia
+            bound = (ring - 1) * size + edge + 1 if ring else 0
+            if (len(best) == k and bound > best[-1][0]) or (max_radius is not None and bound > max_radius):
+                break
+            if 8 * ring > len(buckets):
+                # Anillos más grandes que las cubetas ocupadas: basta con recorrerlas todas
+                candidates = [b for (kx, ky), b in buckets.items()
+                              if max(abs(kx - bx), abs(ky - by)) >= ring]
+                seen = len(buckets)
+            else:
+                candidates = [buckets[key] for key in self._ring_keys(bx, by, ring) if key in buckets]
+                seen += len(candidates)
+            for bucket in candidates:
+                for (cx, cy), (order, item) in bucket.items():
+                    d = abs(cx - x) + abs(cy - y)
+                    if max_radius is not None and d > max_radius:
+                        continue
+                    if len(best) == k and (d, order) >= best[-1][:2]:
+                        continue
+                    if accept is None or accept(item):
+                        best.append((d, order, item))
+                        best.sort(key=lambda e: e[:2])
+                        del best[k:]
+            ring += 1
+        return [(d, item) for d, _, item in best]
+
+    def _buckets_in_square(self, x: int, y: int, radius: int):
+        size, buckets = self.size, self._buckets
+        x0, x1 = (x - radius) // size, (x + radius) // size
+        y0, y1 = (y - radius) // size, (y + radius) // size
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(buckets):
+            # La zona abarca más cubetas que las ocupadas: se recorren las ocupadas
+            return [b for (kx, ky), b in buckets.items() if x0 <= kx <= x1 and y0 <= ky <= y1]
+        return [buckets[(kx, ky)] for kx in range(x0, x1 + 1) for ky in range(y0, y1 + 1)
+                if (kx, ky) in buckets]
+
+    @staticmethod
+    def _ring_keys(bx: int, by: int, ring: int):
+        if ring == 0:
+            yield (bx, by)
+            return
+        for kx in range(bx - ring, bx + ring + 1):
+            yield (kx, by - ring)
+            yield (kx, by + ring)
+        for ky in range(by - ring + 1, by + ring):
+            yield (bx - ring, ky)
+            yield (bx + ring, ky)
+
+
+class OccupancyGrid:
+    """
+    Índice por celda de las entidades del mundo: (x, y) -> agente / comida / obstáculo.
+
+    Permite responder "¿qué hay en esta casilla?" en O(1) en lugar de recorrer
+    las listas completas. El motor es responsable de mantenerlo sincronizado
+    cada vez que agrega, mueve o elimina una entidad.
+
+    `layout_version` aumenta con cada cambio en los obstáculos (nunca se reinicia):
+    todo lo calculado sobre el mapa (p. ej. caminos) es válido mientras no cambie.
+    `food_version` hace lo mismo con la comida (campos de distancia hacia comida).
+    `food_index` agrupa la comida por cubetas para las consultas de visión y
+    "comida más cercana" sin recorrer toda la lista.
+    Los últimos cambios de obstáculos quedan registrados por celda para que los
+    planificadores incrementales sepan qué reparar (layout_changes_since).
+    Los obstáculos 'dynamic' se llevan además en su propia colección (`dynamic`)
+    para moverlos sin recorrer todos los obstáculos.
+    """
+
+    def __init__(self):
+        self.agents: Dict[Cell, Any] = {}
+        self.food: Dict[Cell, Dict[str, Any]] = {}
+        self.obstacles: Dict[Cell, Dict[str, Any]] = {}
+        self.dynamic: Dict[int, Dict[str, Any]] = {}  # id(obstáculo) -> obstáculo 'dynamic'
+        self.food_index = SpatialBuckets()
+        self.layout_version = 0
+        self.food_version = 0
+        self._layout_log = deque()  # (versión, celda) de cada cambio de obstáculos
+        self._log_floor = 0  # Cambios anteriores a esta versión ya no se conocen
+
+    def clear(self):
+        self.agents.clear()
+        self.food.clear()
+        self.food_index.clear()
+        self.obstacles.clear()
+        self.dynamic.clear()
+        self._reset_layout()
+        self.food_version += 1
+
+    def rebuild(self, agents, food, obstacles):
+        """Reconstruye el índice completo (tras reset o carga de snapshot)."""
+        self.clear()
+        for a in agents:
+            self.agents[(a.x, a.y)] = a
+        for f in food:
+            self.food[(f['x'], f['y'])] = f
+            self.food_index.add((f['x'], f['y']), f)
+        for o in obstacles:
+            self.obstacles[(o['x'], o['y'])] = o
+            if o.get("type") == "dynamic":
+                self.dynamic[id(o)] = o
+        self._reset_layout()
+        self.food_version += 1
+
+    # --- VERSIONES DEL MAPA ---
+
+    def _reset_layout(self):
+        """Cambio total del mapa: no se puede describir celda por celda."""
+        self.layout_version += 1
+        self._layout_log.clear()
+        self._log_floor = self.layout_version
+
+    def _touch_layout(self, *cells: Cell):
+        self.layout_version += 1
+        for cell in cells:
+            if len(self._layout_log) >= LAYOUT_LOG_SIZE:
+                self._log_floor = self._layout_log.popleft()[0]
+            self._layout_log.append((self.layout_version, cell))
+
+    def layout_changes_since(self, version: int) -> Optional[Set[Cell]]:
+        """Celdas cuyos obstáculos cambiaron después de `version` (None si ya no se sabe)."""
+        if version < self._log_floor:
+            return None
+        return {cell for v, cell in self._layout_log if v > version}
+
+    # --- CONSULTAS ---
+
+    def is_occupied(self, x: int, y: int) -> bool:
+        cell = (x, y)
+        return cell in self.agents or cell in self.food or cell in self.obstacles
+
+    def agent_at(self, x: int, y: int):
+        return self.agents.get((x, y))
+
+    def food_at(self, x: int, y: int) -> Optional[Dict[str, Any]]:
+        return self.food.get((x, y))
+
+    def food_within(self, x: int, y: int, radius: int) -> List[Dict[str, Any]]:
+        """Comida a distancia Manhattan <= radius (en el orden en que se agregó)."""
+        return self.food_index.within(x, y, radius)
+
+    def nearest_food(self, x: int, y: int, max_radius: Optional[int] = None,
+                     accept: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Dict[str, Any]]:
+        return self.food_index.nearest(x, y, max_radius, accept)
+
+    def obstacle_at(self, x: int, y: int) -> Optional[Dict[str, Any]]:
+        return self.obstacles.get((x, y))
+
+    # --- AGENTES ---
+
+    def place_agent(self, agent):
+        self.agents[(agent.x, agent.y)] = agent
+
+    def remove_agent(self, agent):
+        cell = (agent.x, agent.y)
+        # Solo borramos si la casilla apunta a este agente (evita pisar a otro)
+        if self.agents.get(cell) is agent:
+            del self.agents[cell]
+
+    def move_agent(self, agent, new_x: int, new_y: int):
+        """Actualiza el índice y las coordenadas del agente en un solo paso."""
+        self.remove_agent(agent)
+        agent.x = new_x
+        agent.y = new_y
+        self.agents[(new_x, new_y)] = agent
+
+    # --- COMIDA ---
+
+    def add_food(self, food: Dict[str, Any]):
+        cell = (food['x'], food['y'])
+        self.food[cell] = food
+        self.food_index.add(cell, food)
+        self.food_version += 1
+
+    def remove_food(self, food: Dict[str, Any]):
+        cell = (food['x'], food['y'])
+        if self.food.get(cell) is food:
+            del self.food[cell]
+            self.food_index.remove(cell)
+            self.food_version += 1
+
+    # --- OBSTÁCULOS ---
+
+    def add_obstacle(self, obstacle: Dict[str, Any]):
+        cell = (obstacle['x'], obstacle['y'])
+        self.obstacles[cell] = obstacle
+        if obstacle.get("type") == "dynamic":
+            self.dynamic[id(obstacle)] = obstacle
+        self._touch_layout(cell)
+
+    def remove_obstacle(self, obstacle: Dict[str, Any]):
+        cell = (obstacle['x'], obstacle['y'])
+        if self.obstacles.get(cell) is obstacle:
+            del self.obstacles[cell]
+            self.dynamic.pop(id(obstacle), None)
+            self._touch_layout(cell)
+
+    def move_obstacle(self, obstacle: Dict[str, Any], new_x: int, new_y: int):
+        old_cell = (obstacle['x'], obstacle['y'])
+        if old_cell == (new_x, new_y):
+            return
+        if self.obstacles.get(old_cell) is obstacle:
+            del self.obstacles[old_cell]
+        obstacle['x'] = new_x
+        obstacle['y'] = new_y
+        self.obstacles[(new_x, new_y)] = obstacle
+        self._touch_layout(old_cell, (new_x, new_y))
+
+    def move_obstacles(self, moves: List[Tuple[Dict[str, Any], int, int]]) -> List[Cell]:
+        """
+        Mueve varios obstáculos a la vez [(obstáculo, x, y), ...] con un solo cambio
+        de versión del mapa. Los destinos ya tienen que estar libres (o liberarse en
+        este mismo lote). Devuelve las celdas que cambiaron.
+        """
+        obstacles = self.obstacles
+        changed = []
+        # Primero se sacan todos: un destino puede ser el origen de otro del lote
+        for obstacle, new_x, new_y in moves:
+            old_cell = (obstacle['x'], obstacle['y'])
+            if obstacles.get(old_cell) is obstacle:
+                del obstacles[old_cell]
+            changed.append(old_cell)
+        for obstacle, new_x, new_y in moves:
+            obstacle['x'] = new_x
+            obstacle['y'] = new_y
+            obstacles[(new_x, new_y)] = obstacle
+            changed.append((new_x, new_y))
+        if changed:
+            self._touch_layout(*changed)
+        return changed
+
+
+class PathCache:
+    """
+    Caché LRU acotada de caminos: (layout_version, start, goal) -> camino.
+
+    Como la clave incluye la versión del mapa, un cambio de obstáculos invalida
+    todo sin recorrer la caché; las entradas viejas simplemente salen por LRU.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, Cell, Cell], Tuple[Cell, ...]]" = OrderedDict()
+
+    def get(self, version: int, start: Cell, goal: Cell) -> Optional[Tuple[Cell, ...]]:
+        key = (version, start, goal)
+        path = self._entries.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def put(self, version: int, start: Cell, goal: Cell, path) -> Tuple[Cell, ...]:
+        path = tuple(path)
+        self._entries[(version, start, goal)] = path
+        self._entries.move_to_end((version, start, goal))
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return path
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ClaimBoard:
+    """
+    Pizarra de reclamos de los agentes cooperativos: celda -> quién la reclamó.
+
+    Reemplaza a los mensajes CLAIMED: preguntar si una celda está tomada es una
+    consulta al diccionario en lugar de recorrer todos los mensajes del tick.
+    Cada agente tiene como mucho un reclamo (reclamar otra celda suelta la
+    anterior) y cada reclamo dura `ttl` ticks; con ttl=1 se olvida al empezar
+    el tick siguiente, como los mensajes.
+    """
+
+    def __init__(self, ttl: int = 1):
+        self.ttl = max(1, ttl)
+        self.step = 0
+        self._claims: Dict[Cell, Tuple[str, int]] = {}  # celda -> (agente, último tick válido)
+        self._by_agent: Dict[str, Cell] = {}
+
+    def clear(self):
+        self._claims.clear()
+        self._by_agent.clear()
+
+    def begin_tick(self, step: int):
+        """Avanza al tick `step` y descarta los reclamos vencidos."""
+        self.step = step
+        expired = [cell for cell, (_, until) in self._claims.items() if until < step]
+        for cell in expired:
+            self.release(cell)
+
+    def claim(self, cell: Cell, agent_id: str, ttl: Optional[int] = None) -> bool:
+        """Reclama `cell` para el agente. False si ya la tiene otro."""
+        owner = self.claimer(cell)
+        if owner is not None and owner != agent_id:
+            return False
+        previous = self._by_agent.get(agent_id)
+        if previous is not None and previous != cell:
+            self._claims.pop(previous, None)
+        self._claims[cell] = (agent_id, self.step + (ttl or self.ttl) - 1)
+        self._by_agent[agent_id] = cell
+        return True
+
+    def claimer(self, cell: Cell) -> Optional[str]:
+        entry = self._claims.get(cell)
+        return entry[0] if entry is not None else None
+
+    def claimed_by(self, agent_id: str) -> Optional[Cell]:
+        """Celda que tiene reclamada el agente (None si ninguna)."""
+        return self._by_agent.get(agent_id)
+
+    def taken(self, cell: Cell, agent_id: Optional[str] = None) -> bool:
+        """¿`cell` está reclamada por alguien distinto de `agent_id`?"""
+        owner = self.claimer(cell)
+        return owner is not None and owner != agent_id
+
+    def release(self, cell: Cell):
+        entry = self._claims.pop(cell, None)
+        if entry is not None and self._by_agent.get(entry[0]) == cell:
+            del self._by_agent[entry[0]]
+
+    def release_agent(self, agent_id: str):
+        cell = self._by_agent.pop(agent_id, None)
+        if cell is not None:
+            self._claims.pop(cell, None)
+
+    def to_dict(self) -> Dict[Cell, str]:
+        return {cell: owner for cell, (owner, _) in self._claims.items()}
+
+    def __len__(self):
+        return len(self._claims)
+
+
+class CoverageMap:
+    """
+    Cobertura del mapa en toda la simulación: mapa de bits de celdas pisadas por
+    algún agente + cantidad de visitas por celda (array compacto, índice
+    x * height + y). Se actualiza en cada movimiento y de ahí salen el mapa de
+    calor y el porcentaje de cobertura de las métricas (HeatmapData).
+
+    Viaja en el estado (get_state / load_state) como las visitas por celda en
+    uint32 little-endian, comprimidas con zlib y en base64: casi todo son ceros,
+    así que pesa poco aunque el mapa sea grande. Las celdas pisadas se deducen
+    de las visitas.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.covered = VisitedMap(width, height)
+        self.counts = array('I', [0]) * (width * height)
+        self.visits = 0  # Total de visitas: si no cambió, to_dict() reusa lo ya comprimido
+        self._packed: Optional[Tuple[int, Dict[str, Any]]] = None
+
+    def visit(self, x: int, y: int):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.counts[x * self.height + y] += 1
+            self.covered.add((x, y))
+            self.visits += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self._packed is not None and self._packed[0] == self.visits:
+            return self._packed[1]
+        counts = self.counts
+        if sys.byteorder == "big":
+            counts = array('I', counts)
+            counts.byteswap()
+        packed = zlib.compress(counts.tobytes(), 1)
+        data = {"width": self.width, "height": self.height,
+                "counts": base64.b64encode(packed).decode("ascii")}
+        self._packed = (self.visits, data)
+        return data
+
+    def load(self, data: Optional[Dict[str, Any]]) -> bool:
+        """
+        Restaura lo que devolvió to_dict(). False (sin tocar nada) si no hay datos,
+        no se pueden leer o son de un mapa de otro tamaño.
+        """
+        if not data or data.get("width") != self.width or data.get("height") != self.height:
+            return False
+        try:
+            counts = array('I')
+            counts.frombytes(zlib.decompress(base64.b64decode(data["counts"])))
+        except (KeyError, TypeError, ValueError, zlib.error):
+            return False
+        if len(counts) != self.width * self.height:
+            return False
+        if sys.byteorder == "big":
+            counts.byteswap()
+        H = self.height
+        covered = VisitedMap(self.width, H)
+        for i, visits in enumerate(counts):
+            if visits:
+                covered.add((i // H, i % H))
+        self.counts, self.covered = counts, covered
+        self.visits = sum(counts)
+        self._packed = None
+        return True
+
+    @property
+    def percent(self) -> float:
+        cells = self.width * self.height
+        return round(100.0 * len(self.covered) / cells, 2) if cells else 0.0
+
+    def to_heatmap(self, hotspots: int = 10) -> Dict[str, Any]:
+        """Formato de HeatmapData: visitMatrix[y][x], máximo y las celdas más visitadas."""
+        W, H, counts = self.width, self.height, self.counts
+        top = heapq.nlargest(hotspots, (i for i in range(W * H) if counts[i]), key=counts.__getitem__)
+        return {
+            "width": W,
+            "height": H,
+            "visitMatrix": [[counts[x * H + y] for x in range(W)] for y in range(H)],
+            "maxVisits": max(counts, default=0),
+            "hotspots": [{"x": i // H, "y": i % H, "visits": counts[i]} for i in top],
+            "cellsVisited": len(self.covered),
+            "coveragePercent": self.percent,
+        }
+
+
+class FrameEncoder:
+    """
+    Codifica el estado del mundo como frames delta numerados (protocolo WORLD_DELTA).
+
+    Cada frame lleva solo los agentes, comida y obstáculos que cambiaron desde el
+    frame anterior (seq - 1). Cada `keyframe_interval` frames, o cuando se pide
+    explícitamente (p. ej. tras cargar un snapshot), se emite un WORLD_UPDATE
+    completo marcado como keyframe para que los clientes se resincronicen.
+
+    Las entradas de un delta son "upserts" idempotentes: aplicarlas sobre un estado
+    más reciente que la base no rompe nada. El historial de cada agente viaja como
+    `pathAppend` (posiciones nuevas según `pathTotal`) + `pathLength` (largo de la
+    cola que debe quedar en el cliente) para no reenviar el camino en cada tick.
+    El terreno (costos por celda) solo viaja cuando cambia `terrainVersion` y la
+    cobertura solo en los keyframes.
+    """
+
+    def __init__(self, keyframe_interval: int = 50):
+        self.seq = 0
+        self.keyframe_interval = keyframe_interval
+        self._frames_since_keyframe: Optional[int] = None  # None => el próximo es keyframe
+        self._agents: Dict[str, Tuple[Dict[str, Any], int]] = {}
+        self._food: Dict[str, Dict[str, Any]] = {}
+        self._obstacles: Dict[str, Dict[str, Any]] = {}
+        self._terrain_version: Optional[int] = None
+
+    def request_keyframe(self):
+        self._frames_since_keyframe = None
+
+    def keyframe_due(self) -> bool:
+        """¿El próximo encode() emite un keyframe?"""
+        return (self._frames_since_keyframe is None
+                or self._frames_since_keyframe >= self.keyframe_interval)
+
+    def encode(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Recibe el `data` de get_state() y devuelve el siguiente frame (delta o keyframe)."""
+        self.seq += 1
+        agents = self._diff_agents(data["agents"])
+        food = self._diff_records(self._food, data["food"])
+        obstacles = self._diff_records(self._obstacles, data["obstacles"])
+        terrain_version = data.get("terrainVersion")
+        terrain_changed = terrain_version != self._terrain_version
+        self._terrain_version = terrain_version
+
+        if self.keyframe_due():
+            self._frames_since_keyframe = 0
+            return {"type": "WORLD_UPDATE", "data": {**data, "seq": self.seq, "keyframe": True}}
+
+        self._frames_since_keyframe += 1
+        delta = {
+            "seq": self.seq,
+            "baseSeq": self.seq - 1,
+            "step": data["step"],
+            "width": data["width"],
+            "height": data["height"],
+            "isRunning": data["isRunning"],
+            "agents": agents,
+            "food": food,
+            "obstacles": obstacles,
+        }
+        if terrain_changed and "terrain" in data:
+            delta["terrain"] = data["terrain"]
+            delta["terrainVersion"] = terrain_version
+        return {"type": "WORLD_DELTA", "data": delta}
+
+    def _diff_agents(self, records) -> Dict[str, List]:
+        updated = []
+        current = {}
+        for rec in records:
+            path = rec.get("path") or []
+            total = rec.get("pathTotal", len(path))
+            base = {k: v for k, v in rec.items() if k != "path"}
+            prev = self._agents.get(rec["id"])
+            current[rec["id"]] = (base, total)
+            if prev is not None and prev[0] == base and prev[1] == total:
+                continue
+            new_points = total - prev[1] if prev is not None else -1
+            if 0 <= new_points <= len(path):
+                updated.append({**base, "pathAppend": path[len(path) - new_points:],
+                                "pathLength": len(path)})
+            else:
+                # Agente nuevo o historial reemplazado: se envía completo
+                updated.append(rec)
+        removed = [aid for aid in self._agents if aid not in current]
+        self._agents = current
+        return {"updated": updated, "removed": removed}
+
+    @staticmethod
+    def _diff_records(snapshot: Dict[str, Dict[str, Any]], records) -> Dict[str, List]:
+        updated = []
+        current = {}
+        for rec in records:
+            rid = rec.get("id")
+            if rid is None:
+                rid = f"{rec['x']},{rec['y']}"
+            # Copia: los obstáculos dinámicos se mutan en el sitio
+            current[rid] = dict(rec)
+            if snapshot.get(rid) != rec:
+                updated.append(rec)
+        removed = [rid for rid in snapshot if rid not in current]
+        snapshot.clear()
+        snapshot.update(current)
+        return {"updated": updated, "removed": removed}
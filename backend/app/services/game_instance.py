@@ -1,8 +1,17 @@
+import asyncio
+
 # Importamos la clase de simulation.py
 from app.simulation import SimulationEngine
+from app.core.config import settings
+from app.services.engine.host import LocalEngine, RemoteEngine, get_engine_host
+from app.services.engine.loop import find_engine_loop
 
 # Almacenamos instancias aisladas: clave = project_id + workspace/session_id
 _engines = {}
+# Handles asíncronos por clave (locales o alojados en workers, según configuración)
+_handles = {}
+# Liberaciones agendadas de motores sin conexiones: clave -> tarea
+_pending_releases = {}
 
 
 def _normalize_session(workspace_id=None, session_id=None, instance_id=None):
@@ -30,11 +39,61 @@ def get_engine(project_id=None, workspace_id=None, session_id=None, instance_id=
     return _engines[key]
 
 
-def release_engine(project_id=None, workspace_id=None, session_id=None, instance_id=None):
-    """Elimina una instancia especifica para liberar memoria."""
+def get_engine_handle(project_id=None, workspace_id=None, session_id=None, instance_id=None):
+    """
+    Retorna el handle asíncrono del motor de un proyecto/sesion.
+    Con ENGINE_HOST_WORKERS > 0 el motor vive en un proceso worker del EngineHost;
+    si no, el handle envuelve el motor local de get_engine().
+    """
     key = _make_key(project_id, workspace_id, session_id, instance_id)
-    if key in _engines:
-        _engines.pop(key, None)
+    # Alguien volvió a usar el motor: se cancela la liberación pendiente
+    pending = _pending_releases.pop(key, None)
+    if pending is not None:
+        pending.cancel()
+    if key not in _handles:
+        if settings.ENGINE_HOST_WORKERS > 0:
+            _handles[key] = RemoteEngine(key, get_engine_host(settings.ENGINE_HOST_WORKERS))
+        else:
+            _handles[key] = LocalEngine(key, get_engine(project_id, workspace_id, session_id, instance_id))
+    return _handles[key]
+
+
+async def release_engine(project_id=None, workspace_id=None, session_id=None, instance_id=None):
+    """Elimina una instancia especifica para liberar memoria (también en su worker)."""
+    await _release_key(_make_key(project_id, workspace_id, session_id, instance_id))
+
+
+async def _release_key(key: str):
+    _engines.pop(key, None)
+    handle = _handles.pop(key, None)
+    if handle is not None:
+        await handle.release()
+
+
+def schedule_release(handle):
+    """
+    Libera el motor si nadie lo vuelve a pedir en ENGINE_RELEASE_GRACE_SECONDS
+    (p. ej. al cerrarse su última conexión). Recargar la página dentro de ese
+    margen conserva el estado en memoria.
+    """
+    key = handle.key
+    if _handles.get(key) is not handle:
+        return
+    pending = _pending_releases.pop(key, None)
+    if pending is not None:
+        pending.cancel()
+    _pending_releases[key] = asyncio.create_task(_release_later(key, handle))
+
+
+async def _release_later(key: str, handle):
+    await asyncio.sleep(settings.ENGINE_RELEASE_GRACE_SECONDS)
+    _pending_releases.pop(key, None)
+    # Solo si sigue sin espectadores y nadie lo reemplazó
+    if _handles.get(key) is handle and find_engine_loop(handle) is None:
+        try:
+            await _release_key(key)
+        except Exception as e:
+            print(f"[Engines] Error liberando motor {key}: {e}")
 
 
 def get_any_engine_for_project(project_id):
@@ -10,6 +10,8 @@ class CodeParser:
     # Lista negra de módulos y funciones peligrosas
     FORBIDDEN_MODULES = {'os', 'sys', 'subprocess', 'shutil', 'builtins', 'importlib'}
     FORBIDDEN_FUNCTIONS = {'open', 'eval', 'exec', 'input', 'exit', 'quit'}
+    # "{0._x}".format(obj) lee atributos privados sin pasar por un ast.Attribute
+    FORBIDDEN_ATTRIBUTES = {'format', 'format_map'}
 
     @staticmethod
     def validate(code_str: str):
@@ -33,4 +35,10 @@ class CodeParser:
                 if isinstance(node.func, ast.Name):
                     if node.func.id in CodeParser.FORBIDDEN_FUNCTIONS:
                         raise SecurityViolation(f"Función prohibida: '{node.func.id}'")
+            # 4. Bloquear atributos privados (p. ej. perception._values)
+            elif isinstance(node, ast.Attribute):
+                if node.attr.startswith('_'):
+                    raise SecurityViolation(f"Atributo privado: '{node.attr}'")
+                if node.attr in CodeParser.FORBIDDEN_ATTRIBUTES:
+                    raise SecurityViolation(f"Método prohibido: '{node.attr}'")
         return True
\ No newline at end of file
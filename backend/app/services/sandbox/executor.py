@@ -1,12 +1,14 @@
 import math
 import random
+from collections.abc import Mapping
 # Importamos el parser de seguridad (ahora sí funcionará porque creamos el archivo arriba)
 from .code_parser import CodeParser, SecurityViolation
 
-def execute_custom_agent_code(code_str: str, perception_data: dict) -> tuple[int, int]:
+def execute_custom_agent_code(code_str: str, perception_data: Mapping) -> tuple[int, int]:
     """
     Ejecuta código Python personalizado en un entorno local restringido.
     Versión PRO: Con validación de seguridad y wrapping.
+    `perception_data` puede ser un dict o la AgentPerception perezosa del motor.
     """
     
     # 0. Validación básica
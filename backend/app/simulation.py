@@ -1,8 +1,28 @@
 import random
 import math
+import time
+from contextlib import contextmanager
 from typing import List, Dict, Any, Tuple
 from .agents.factory import AgentFactory
+from .agents.models import PathHistory, VisitedMap, DEFAULT_PATH_CAPACITY
 from .algorithms.pathfinding import Pathfinding
+from .algorithms.grid import GridMap, CostMap
+from .algorithms.flow_field import DistanceField, local_routes
+from .algorithms.dstar_lite import DStarLite
+from .algorithms.connectivity import ConnectivityIndex
+from .algorithms.hpa import ClusterGraph
+from .algorithms.strategies import PathfindingStrategies
+from .algorithms.assignment import auction_assignment
+from .services.engine.world import OccupancyGrid, FrameEncoder, PathCache, ClaimBoard, CoverageMap
+from .services.engine.perception import TickSnapshot, AgentPerception
+from .services.engine.agent_controller import vectorized_step, vectorization_available
+
+# Más celdas cambiadas que esto y conviene planificar desde cero en vez de reparar
+MAX_INCREMENTAL_CHANGES = 64
+# Desde este tamaño de mapa las estrategias de camino mínimo se resuelven con HPA*
+HIERARCHICAL_MIN_CELLS = 100 * 100
+# ALT solo rinde si sus tablas duran: con cambios de muros más recientes que esto se usa A*
+ALT_STABLE_TICKS = 10
 
 class SimulationEngine:
     def __init__(self):
@@ -12,20 +32,56 @@ class SimulationEngine:
         self.food = []      
         self.obstacles = [] 
         self.messages = []  
-        self.claims = {}    
+        self.claims = ClaimBoard()  # Reclamos de comida de los cooperativos (celda -> agente)
+        self.grid = OccupancyGrid()  # Índice (x, y) -> entidad para consultas O(1)
         self.is_running = False
         self.step_count = 0
         self.speed = 0.5
         self.max_steps = 100
         self.is_unlimited = False
         self.stop_on_food = True
+        self.is_fast_forwarding = False  # True mientras corre run_steps (motor ocupado)
+        self.vectorized = False  # Paso NumPy para reactive/competitive (opcional)
+        self.agent_store = None  # AgentStore reutilizable del paso vectorizado
+        self.path_capacity = DEFAULT_PATH_CAPACITY  # Posiciones guardadas por agente
+        self.path_tail = 20  # Posiciones del historial que viajan en cada frame en vivo
+        self.frames = FrameEncoder()  # Frames delta (WORLD_DELTA) con número de secuencia
+        self.path_cache = PathCache()  # Caminos por (versión del mapa, inicio, meta)
+        self.terrain = CostMap(self.width, self.height)  # Costo de entrar a cada celda (movimiento y búsquedas)
+        self.coverage = CoverageMap(self.width, self.height)  # Celdas pisadas y visitas por celda (métricas)
+        self._plans = {}  # agent_id -> (versión, meta, camino, índice actual en el camino)
+        self._layout_seen = None  # Versión del mapa vista al empezar el último tick
+        self._layout_changed_at = -ALT_STABLE_TICKS  # Tick en que se vio cambiar el mapa
+        self._replanners = {}  # agent_id -> DStarLite (búsqueda incremental hacia la meta actual)
+        self._grid_map = None  # GridMap (máscara + vecinos) de la versión actual del mapa
+        self._connectivity = None  # Componentes conexas del mapa (qué metas son alcanzables)
+        self._cluster_graph = None  # Grafo HPA* (mapas grandes), se actualiza por clusters
+        self._food_field = None  # DistanceField hacia toda la comida (compartido por todos los agentes)
+        self.snapshot = TickSnapshot([])  # Percepción compartida del tick (posiciones al inicio del paso)
+        self.assignments = {}  # agent_id -> comida asignada a cada cooperativo en este tick
+        self._routes = {}  # agent_id -> {comida visible: (pasos, primera celda)} de los cooperativos
+        self.flow_fields = True  # Usar el campo compartido cuando sale más barato que buscar por agente
+        self._tick_search_time = 0.0  # Segundos gastados en búsquedas A* reales en el tick actual
+        self._food_field_cost = 0.001  # Segundos que tomó construir el último campo (estimación inicial)
+        # Contadores de IDs: nunca se reutilizan aunque se borren elementos
+        self._next_ids = {"agent": 0, "food": 0, "obs": 0}
 
     def reset(self):
         self.agents = []
         self.food = []
         self.obstacles = []
         self.messages = []
-        self.claims = {}
+        self.claims.clear()
+        self.grid.clear()
+        self.path_cache.clear()
+        self.terrain = CostMap(self.width, self.height)
+        self.coverage = CoverageMap(self.width, self.height)
+        self.snapshot = TickSnapshot([])
+        self._plans = {}
+        self._layout_seen = None
+        self._layout_changed_at = -ALT_STABLE_TICKS
+        self._replanners = {}
+        self._next_ids = {"agent": 0, "food": 0, "obs": 0}
         self.step_count = 0
         self.is_running = False
 
@@ -75,7 +131,11 @@ class SimulationEngine:
                         setattr(agent, attr, a[attr])
                 
                 if "path_history" in a:
-                    agent.path_history = a["path_history"]
+                    agent.path_history = PathHistory(a["path_history"], capacity=self.path_capacity)
+                else:
+                    agent.path_history.set_capacity(self.path_capacity)
+                # Memoria de visitadas: lo que quedó en el historial guardado
+                agent.visited = VisitedMap(self.width, self.height, agent.path_history)
                 
                 # Restaurar código personalizado si existe
                 if "custom_code" in a:
@@ -85,11 +145,158 @@ class SimulationEngine:
             except Exception as e:
                 print(f"⚠️  Error al recrear agente desde snapshot: {e}")
 
+        self._sync_ids()
+        self.grid.rebuild(self.agents, self.food, self.obstacles)
+        self.terrain = CostMap(self.width, self.height)
+        try:
+            self.terrain.load(state.get("terrain"))
+        except (ValueError, TypeError) as e:
+            # Un terreno guardado corrupto no debe cortar la hidratación a medias
+            print(f"⚠️  Terreno inválido en el snapshot, se usa terreno normal: {e}")
+            self.terrain = CostMap(self.width, self.height)
+        self.claims.clear()
+        self.coverage = CoverageMap(self.width, self.height)
+        if not self.coverage.load(state.get("coverage")):
+            # Estados guardados sin cobertura: solo se conoce lo que quedó en cada historial
+            for agent in self.agents:
+                for x, y in agent.path_history:
+                    self.coverage.visit(x, y)
+        self._plans = {}
+        self._layout_seen = None
+        self._layout_changed_at = -ALT_STABLE_TICKS
+        self._replanners = {}
+        self.frames.request_keyframe()
+
+    def set_terrain(self, cells: List[Dict] = None, fill: float = None):
+        """
+        Cambia costos de terreno en bloque: `fill` rellena todo el mapa y luego
+        `cells` ([{"x", "y", "cost"}]) fija celdas sueltas. Lanza ValueError (sin
+        cambiar nada) si algún costo no es un número finito.
+        """
+        self.terrain.update(cells=cells, fill=fill)
+        # Los planes se calcularon con los costos anteriores
+        self._plans = {}
+        self._replanners = {}
+
+    @property
+    def layout_version(self) -> int:
+        """Versión del mapa de obstáculos (cambia al agregar, quitar, romper o mover uno)."""
+        return self.grid.layout_version
+
+    def get_grid_map(self) -> GridMap:
+        """Mapa compacto para los algoritmos de búsqueda; se reconstruye solo si cambió el mapa."""
+        grid_map = self._grid_map
+        if (grid_map is None or grid_map.version != self.layout_version
+                or grid_map.width != self.width or grid_map.height != self.height):
+            grid_map = GridMap(self.width, self.height, self.obstacles, version=self.layout_version)
+            self._grid_map = grid_map
+        return grid_map
+
+    def get_connectivity(self) -> ConnectivityIndex:
+        """
+        Componentes conexas de la versión actual del mapa. Se actualiza con las celdas
+        que cambiaron desde la última consulta; solo se reconstruye si no se conocen.
+        """
+        grid_map = self.get_grid_map()
+        index = self._connectivity
+        if index is None or index.width != grid_map.width or index.height != grid_map.height:
+            index = ConnectivityIndex(grid_map)
+        elif index.version != grid_map.version:
+            changes = self.grid.layout_changes_since(index.version)
+            if changes is None:
+                index = ConnectivityIndex(grid_map)
+            else:
+                index.update(grid_map, changes)
+        self._connectivity = index
+        return index
+
+    def get_cluster_graph(self) -> ClusterGraph:
+        """
+        Grafo de clusters de HPA* para la versión actual del mapa. Al cambiar los
+        obstáculos se recalculan solo los clusters tocados del grafo anterior.
+        """
+        grid_map = self.get_grid_map()
+        graph = grid_map.derived.get("hpa")
+        if graph is None:
+            graph = self._cluster_graph
+            changes = None
+            if graph is not None and graph.grid.width == grid_map.width and graph.grid.height == grid_map.height:
+                changes = self.grid.layout_changes_since(graph.version)
+            if changes is None:
+                graph = ClusterGraph(grid_map)
+            else:
+                graph.update(grid_map, changes)
+            grid_map.derived["hpa"] = graph
+            self._cluster_graph = graph
+        return graph
+
+    def _is_reachable(self, agent, target) -> bool:
+        return self.get_connectivity().connected(self.get_grid_map(), (agent.x, agent.y), target)
+
+    def get_food_field(self) -> DistanceField:
+        """
+        Distancia a la comida más cercana desde cada celda. Se recalcula si cambian
+        los obstáculos, o si cambió la comida y empezó otro tick: la comida que se
+        come durante el tick no fuerza un recálculo por agente (quien ve que su meta
+        ya no existe planifica por su cuenta). Solo se recorre hasta el mayor
+        radio de visión de los agentes, que es lo único que se consulta.
+        """
+        field = self._current_food_field()
+        if field is None:
+            started = time.perf_counter()
+            reach = max((self._get_vision_radius(a) for a in self.agents), default=0)
+            field = DistanceField(self.get_grid_map(), [(f['x'], f['y']) for f in self.food],
+                                  version=(self.grid.food_version, self.step_count),
+                                  max_distance=reach)
+            self._food_field = field
+            self._food_field_cost = time.perf_counter() - started
+        return field
+
+    def _current_food_field(self):
+        """El campo ya calculado si sigue vigente (no lo construye)."""
+        field = self._food_field
+        if (field is None or field.grid is not self.get_grid_map()
+                or (field.version[0] != self.grid.food_version and field.version[1] != self.step_count)):
+            return None
+        return field
+
+    def _new_id(self, prefix: str) -> str:
+        new_id = f"{prefix}_{self._next_ids[prefix]}"
+        self._next_ids[prefix] += 1
+        return new_id
+
+    def _sync_ids(self):
+        """Ajusta los contadores de IDs tras cargar un snapshot y asigna IDs faltantes."""
+        groups = {"agent": [a.id for a in self.agents],
+                  "food": [f.get("id") for f in self.food],
+                  "obs": [o.get("id") for o in self.obstacles]}
+        for prefix, ids in groups.items():
+            numbers = [int(i.rsplit("_", 1)[1]) for i in ids
+                       if isinstance(i, str) and i.startswith(prefix + "_") and i.rsplit("_", 1)[1].isdigit()]
+            self._next_ids[prefix] = max(numbers, default=-1) + 1
+        for f in self.food:
+            if not f.get("id"):
+                f["id"] = self._new_id("food")
+        for o in self.obstacles:
+            if not o.get("id"):
+                o["id"] = self._new_id("obs")
+
     def update_config(self, config: Dict[str, Any]):
         print(f" 🔧  Configuración actualizada: {config}")
         if "maxSteps" in config: self.max_steps = int(config["maxSteps"])
         if "isUnlimited" in config: self.is_unlimited = bool(config["isUnlimited"])
         if "stopOnFood" in config: self.stop_on_food = bool(config["stopOnFood"])
+        if "pathHistoryLimit" in config and int(config["pathHistoryLimit"]) > 0:
+            self.path_capacity = int(config["pathHistoryLimit"])
+            for agent in self.agents:
+                agent.path_history.set_capacity(self.path_capacity)
+        if "pathTail" in config: self.path_tail = max(0, int(config["pathTail"]))
+        if "flowFields" in config: self.flow_fields = bool(config["flowFields"])
+        if "claimTtl" in config: self.claims.ttl = max(1, int(config["claimTtl"]))
+        if "vectorized" in config:
+            self.vectorized = bool(config["vectorized"]) and vectorization_available()
+            if config["vectorized"] and not self.vectorized:
+                print("⚠️ [Simulation] NumPy no está instalado: se usa el paso por objeto.")
         if "speed" in config and float(config["speed"]) > 0: self.speed = 0.5 / float(config["speed"])
 
     # =========================================================
@@ -102,7 +309,7 @@ class SimulationEngine:
             return
 
         try:
-            new_id = f"agent_{len(self.agents)}"
+            new_id = self._new_id("agent")
             
             # --- INTENTO DE CREACIÓN ROBUSTO ---
             try:
@@ -132,13 +339,16 @@ class SimulationEngine:
             else:
                 agent.vision_radius = 5
 
-            # Inicializar conjunto de visitados si no existe
-            if not hasattr(agent, "visited"):
-                agent.visited = set()
+            agent.path_history.set_capacity(self.path_capacity)
+
+            # Memoria de visitadas: un bit por celda del grid
+            agent.visited = VisitedMap(self.width, self.height)
             agent.visited.add((x, y))
+            self.coverage.visit(x, y)
             
             # --- EXITO ---
             self.agents.append(agent)
+            self.grid.place_agent(agent)
             print(f"✅ [Simulation] Agente {new_id} ({agent_type}) creado en ({x}, {y})")
             
         except Exception as e:
@@ -149,12 +359,14 @@ class SimulationEngine:
 
     def add_food(self, x: int, y: int, food_type: str = "food", config: Dict = None):
         if self._is_occupied(x, y): return
-        self.food.append({
+        food = {
             "x": x, "y": y,
-            "id": f"food_{len(self.food)}",
+            "id": self._new_id("food"),
             "type": food_type,
             "value": 20
-        })
+        }
+        self.food.append(food)
+        self.grid.add_food(food)
 
     # ========================================================
     #  LEER CONFIGURACIÓN DEL OBSTÁCULO (Frontend)
@@ -175,29 +387,61 @@ class SimulationEngine:
             except:
                 destruction_cost = 20
 
-        self.obstacles.append({
+        obstacle = {
             "x": x, "y": y,
+            "id": self._new_id("obs"),
             "type": obs_type,
             "destructible": is_destructible,
             "cost": destruction_cost
-        })
+        }
+        self.obstacles.append(obstacle)
+        self.grid.add_obstacle(obstacle)
 
     def remove_at(self, x: int, y: int):
-        self.agents = [a for a in self.agents if not (a.x == x and a.y == y)]
-        self.food = [f for f in self.food if not (f['x'] == x and f['y'] == y)]
-        self.obstacles = [o for o in self.obstacles if not (o['x'] == x and o['y'] == y)]
+        agent = self.grid.agent_at(x, y)
+        if agent:
+            self.grid.remove_agent(agent)
+            self.agents.remove(agent)
+            self._plans.pop(agent.id, None)
+            self._replanners.pop(agent.id, None)
+            self.claims.release_agent(agent.id)
+        food = self.grid.food_at(x, y)
+        if food:
+            self.grid.remove_food(food)
+            self.food.remove(food)
+        obstacle = self.grid.obstacle_at(x, y)
+        if obstacle:
+            self.grid.remove_obstacle(obstacle)
+            self.obstacles.remove(obstacle)
+
+    def move_agent(self, agent_id: str, x: int, y: int) -> bool:
+        """Reubica manualmente un agente (BATCH_MOVE) manteniendo el índice de ocupación."""
+        agent = next((a for a in self.agents if a.id == agent_id), None)
+        if not agent:
+            return False
+        x = max(0, min(self.width - 1, x))
+        y = max(0, min(self.height - 1, y))
+        self.grid.move_agent(agent, x, y)
+        return True
+
+    def set_custom_code(self, code: str, agent_type: str = "custom") -> int:
+        """Asigna código (ya validado) a los agentes del tipo dado. Retorna cuántos cambió."""
+        count = 0
+        for agent in self.agents:
+            if getattr(agent, "type", "").lower() == agent_type.lower():
+                agent.custom_code = code
+                count += 1
+        return count
 
     # --- HELPERS DE VALIDACIÓN ---
     
     def _is_occupied(self, x: int, y: int) -> bool:
-        return any(a.x == x and a.y == y for a in self.agents) or \
-               any(f['x'] == x and f['y'] == y for f in self.food) or \
-               any(o['x'] == x and o['y'] == y for o in self.obstacles)
+        return self.grid.is_occupied(x, y)
 
     # PERMITIR "VER" CAMINO SI ES DESTRUCTIBLE
     def _is_blocked(self, x: int, y: int) -> bool:
         # 1. Revisar Obstáculos
-        obs = next((o for o in self.obstacles if o['x'] == x and o['y'] == y), None)
+        obs = self.grid.obstacle_at(x, y)
         if obs:
             # Si el obstáculo es destructible, NO lo consideramos "bloqueado" para la IA.
             # Esto permite que el agente intente moverse hacia él y active la destrucción en _apply_movement
@@ -208,7 +452,7 @@ class SimulationEngine:
             return True
 
         # 2. Revisar otros Agentes
-        if any(a.x == x and a.y == y for a in self.agents):
+        if self.grid.agent_at(x, y):
             return True
             
         return False
@@ -217,32 +461,65 @@ class SimulationEngine:
     # MOVER OBSTÁCULOS DINÁMICOS
     # ========================================================
     def _update_dynamic_obstacles(self):
-        """Mueve aleatoriamente los obstáculos marcados como 'dynamic'"""
-        for obs in self.obstacles:
-            if obs.get("type") == "dynamic":
-                # Intentamos movernos en una dirección aleatoria
-                moves = [(0, 1), (0, -1), (1, 0), (-1, 0), (0, 0)] 
-                dx, dy = random.choice(moves)
-                nx, ny = obs['x'] + dx, obs['y'] + dy
-                
-                # Verificamos límites y colisiones (no pisar nada)
-                if (0 <= nx < self.width and 0 <= ny < self.height and 
-                    not self._is_occupied(nx, ny)):
-                    obs['x'] = nx
-                    obs['y'] = ny
+        """
+        Mueve aleatoriamente los obstáculos marcados como 'dynamic'. Se proponen todos
+        los movimientos, los conflictos se resuelven en orden contra el índice de
+        ocupación (como si se movieran de a uno) y se aplican en un solo lote: el mapa
+        cambia de versión una vez por tick con todas las celdas tocadas.
+        """
+        grid = self.grid
+        dynamic = grid.dynamic
+        if not dynamic:
+            return
+        moves = [(0, 1), (0, -1), (1, 0), (-1, 0), (0, 0)]
+        vacated, taken = set(), set()
+        batch = []
+        for obs in dynamic.values():
+            # Intentamos movernos en una dirección aleatoria
+            dx, dy = random.choice(moves)
+            if dx == 0 and dy == 0:
+                continue
+            nx, ny = obs['x'] + dx, obs['y'] + dy
+            target = (nx, ny)
+            # Verificamos límites y colisiones (no pisar nada, tampoco lo que ya se movió en este lote)
+            if not (0 <= nx < self.width and 0 <= ny < self.height) or target in taken:
+                continue
+            if target in grid.agents or target in grid.food:
+                continue
+            if target in grid.obstacles and target not in vacated:
+                continue
+            vacated.add((obs['x'], obs['y']))
+            taken.add(target)
+            batch.append((obs, nx, ny))
+        if batch:
+            grid.move_obstacles(batch)
 
     def step(self):
         if self._check_stop_conditions(): return
         self.step_count += 1
         self.messages = [] 
-        self.claims = {} 
+        self.claims.begin_tick(self.step_count)
+        self._tick_search_time = 0.0
 
         # 1. Movemos obstáculos dinámicos
         self._update_dynamic_obstacles()
+        if self.layout_version != self._layout_seen:
+            if self._layout_seen is not None:
+                self._layout_changed_at = self.step_count
+            self._layout_seen = self.layout_version
 
-        world_state = { "food": self.food, "obstacles": self.obstacles, "agents": self.agents }
+        # Percepción compartida: se arma una vez y la leen todas las lógicas del tick
+        self.snapshot = TickSnapshot(self.agents, self.step_count)
+        self.assignments = self._allocate_cooperative()
+        world_state = { "food": self.food, "obstacles": self.obstacles, "agents": self.agents,
+                        "terrain": self.terrain, "snapshot": self.snapshot, "claims": self.claims }
 
-        for agent in self.agents:
+        # 2. Lote vectorizado (reactive/competitive) y el resto agente por agente
+        agents = self.agents
+        if self.vectorized:
+            agents = vectorized_step(self, agents)
+
+        for agent in agents:
             if agent.energy <= 0: continue
             dx, dy = self._get_agent_decision(agent, world_state)
             self._apply_movement(agent, dx, dy)
@@ -258,7 +535,7 @@ class SimulationEngine:
         new_y = max(0, min(self.height - 1, agent.y + dy))
 
         # Buscamos si hay un obstáculo en la nueva posición
-        obstacle = next((o for o in self.obstacles if o['x'] == new_x and o['y'] == new_y), None)
+        obstacle = self.grid.obstacle_at(new_x, new_y)
         
         if obstacle:
             # ¿Es destructible?
@@ -269,6 +546,7 @@ class SimulationEngine:
                 if agent.energy > cost:
                     agent.energy -= cost
                     self.obstacles.remove(obstacle) # 💥 Eliminar obstáculo
+                    self.grid.remove_obstacle(obstacle)
                     print(f"💥 Agente {agent.id} rompió muro en ({new_x}, {new_y})")
                     # El agente se queda quieto este turno mientras rompe el muro
                     return 
@@ -278,45 +556,156 @@ class SimulationEngine:
             return 
 
         # Si hay otro agente, choque simple
-        if any(a.id != agent.id and a.x == new_x and a.y == new_y for a in self.agents):
+        other = self.grid.agent_at(new_x, new_y)
+        if other is not None and other is not agent:
             return 
 
-        # Movimiento normal
-        agent.x = new_x
-        agent.y = new_y
-        agent.energy -= 0.5
+        # Movimiento normal (el terreno multiplica el gasto de entrar a la celda)
+        self.grid.move_agent(agent, new_x, new_y)
+        agent.energy -= 0.5 * self.terrain.values[new_x * self.height + new_y]
         agent.steps_taken += 1
         agent.path_history.append((new_x, new_y))
+        agent.visited.add((new_x, new_y))
+        self.coverage.visit(new_x, new_y)
 
     def _handle_interactions(self, agent):
-        for f in self.food[:]:
-            if f['x'] == agent.x and f['y'] == agent.y:
-                gain = f.get("value", 20)
-                agent.energy = min(150, agent.energy + gain)
-                self.food.remove(f)
+        f = self.grid.food_at(agent.x, agent.y)
+        if f:
+            gain = f.get("value", 20)
+            agent.energy = min(150, agent.energy + gain)
+            self.food.remove(f)
+            self.grid.remove_food(f)
+            self.claims.release((agent.x, agent.y))
 
-    def _check_stop_conditions(self):
+    # ========================================================
+    # AVANCE RÁPIDO (sin pausas ni broadcast)
+    # ========================================================
+    @contextmanager
+    def reserve_fast_forward(self):
+        """
+        Marca el motor como ocupado mientras dura el bloque. Quien corre el avance en
+        otro hilo lo reserva antes de cambiar de hilo, así ningún otro comando ni el
+        loop en vivo se cuela entre la comprobación y el arranque.
+        """
+        if self.is_fast_forwarding:
+            raise RuntimeError("Ya hay un avance rápido en curso")
+        self.is_fast_forwarding = True
+        try:
+            yield
+        finally:
+            self.is_fast_forwarding = False
+
+    def run_steps(self, steps: int = None, limit: int = 100_000, reserved: bool = False) -> Dict[str, Any]:
+        """
+        Ejecuta hasta `steps` pasos seguidos (o hasta `limit` si no se indica) tan rápido
+        como permita la CPU. Se detiene antes si se cumple una condición de parada.
+        Devuelve solo contadores resumen; el estado final se pide con get_state().
+        `reserved`: el llamador ya tiene el motor tomado con reserve_fast_forward().
+        """
+        if not reserved:
+            with self.reserve_fast_forward():
+                return self.run_steps(steps, limit, reserved=True)
+        steps = limit if steps is None else max(0, min(int(steps), limit))
+
+        was_running = self.is_running
+        start_step = self.step_count
+        food_before = len(self.food)
+        energy_before = sum(a.energy for a in self.agents)
+        stop_reason = None
+        started = time.perf_counter()
+
+        # Mientras dura el avance los loops en vivo no deben avanzar este motor
+        self.is_running = False
+        for _ in range(steps):
+            if self._check_stop_conditions():
+                break
+            self.step()
+        stop_reason = self._stop_reason()
+
+        self.is_running = was_running and stop_reason is None
+        return {
+            "stepsRun": self.step_count - start_step,
+            "startStep": start_step,
+            "finalStep": self.step_count,
+            "stopped": stop_reason is not None,
+            "stopReason": stop_reason,
+            "foodCollected": food_before - len(self.food),
+            "foodRemaining": len(self.food),
+            "agentsAlive": sum(1 for a in self.agents if a.energy > 0),
+            "energyConsumed": round(energy_before - sum(a.energy for a in self.agents), 2),
+            "coveragePercent": self.coverage.percent,
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _stop_reason(self):
         if not self.is_unlimited and self.step_count >= self.max_steps:
-            self.is_running = False
-            return True
+            return "max_steps"
         if self.stop_on_food and len(self.food) == 0 and len(self.agents) > 0:
+            return "all_food_collected"
+        return None
+
+    def _check_stop_conditions(self):
+        if self._stop_reason():
             self.is_running = False
             return True
         return False
 
-    def get_state(self) -> Dict[str, Any]:
-        return {
+    def get_state(self, full_history: bool = False, coverage: bool = True) -> Dict[str, Any]:
+        # En vivo solo viaja la cola del historial; el completo se pide aparte
+        path_tail = None if full_history else self.path_tail
+        state = {
             "type": "WORLD_UPDATE",
             "data": {
                 "step": self.step_count,
-                "agents": [a.to_dict() for a in self.agents],
+                "seq": self.frames.seq,
+                "agents": [a.to_dict(path_tail=path_tail) for a in self.agents],
                 "food": self.food,
                 "obstacles": self.obstacles,
                 "width": self.width,
                 "height": self.height,
                 "isRunning": self.is_running,
+                "terrain": self.terrain.to_dict(),
+                "terrainVersion": self.terrain.version,
             }
         }
+        if coverage:
+            # Visitas por celda comprimidas: caro en mapas grandes, no va en cada tick
+            state["data"]["coverage"] = self.coverage.to_dict()
+        return state
+
+    def get_delta_state(self) -> Dict[str, Any]:
+        """
+        Siguiente frame del stream en modo delta: WORLD_DELTA con solo lo que cambió
+        desde el frame anterior, o un WORLD_UPDATE completo cuando toca keyframe.
+        La cobertura solo se arma para los keyframes.
+        """
+        keyframe = self.frames.keyframe_due()
+        return self.frames.encode(self.get_state(coverage=keyframe)["data"])
+
+    def get_tick_state(self) -> Dict[str, Any]:
+        """
+        Frame completo del stream en vivo. Como en los keyframes del modo delta, la
+        cobertura viaja solo cada `keyframe_interval` pasos.
+        """
+        return self.get_state(coverage=self.step_count % self.frames.keyframe_interval == 0)
+
+    def get_path_history(self, agent_ids: List[str] = None) -> Dict[str, Any]:
+        """Historial completo guardado de los agentes (bajo demanda o para exportar métricas)."""
+        agents = [a for a in self.agents if agent_ids is None or a.id in agent_ids]
+        return {
+            "type": "PATH_HISTORY",
+            "data": {
+                "step": self.step_count,
+                "agents": {
+                    a.id: {"path": a.path_history.to_list(), "total": a.path_history.total}
+                    for a in agents
+                },
+            }
+        }
+
+    def get_coverage(self) -> Dict[str, Any]:
+        """Mapa de calor y cobertura del grid (bajo demanda o para exportar métricas)."""
+        return {"type": "COVERAGE", "data": {"step": self.step_count, **self.coverage.to_heatmap()}}
 
     # =========================================================================
     # LÓGICA DE IA
@@ -344,20 +733,33 @@ class SimulationEngine:
             print(f" ⚠️ Error en lógica del agente {agent.id}: {e}")
             return 0, 0
 
-    def _get_visible_food(self, agent):
-        visible = []
+    def _get_vision_radius(self, agent):
         try:
             vr = getattr(agent, "vision_radius", 5)
             if vr is None: vr = 5
         except:
             vr = 5
-            
-        for f in self.food:
-            dist = abs(f['x'] - agent.x) + abs(f['y'] - agent.y)
-            if dist <= vr:
-                visible.append(f)
+        return vr
+
+    def _get_visible_food(self, agent):
+        # Solo las cubetas del índice espacial que tocan el radio de visión
+        visible = self.grid.food_within(agent.x, agent.y, self._get_vision_radius(agent))
+        if visible:
+            # La comida encerrada por muros no sirve como meta: se descarta sin buscar
+            reachable = self.get_connectivity().connected_to(self.get_grid_map(), (agent.x, agent.y))
+            visible = [f for f in visible if reachable((f['x'], f['y']))]
         return visible
 
+    def _nearest_visible_food(self, agent, skip=None):
+        """
+        Comida alcanzable más cercana dentro del radio de visión (None si no hay),
+        sin armar la lista de todo lo visible. `skip(celda)`: celdas que no cuentan.
+        """
+        def accept(f):
+            cell = (f['x'], f['y'])
+            return (skip is None or not skip(cell)) and self._is_reachable(agent, cell)
+        return self.grid.nearest_food(agent.x, agent.y, self._get_vision_radius(agent), accept)
+
     def _get_direction_towards(self, agent, tx, ty):
         dx = tx - agent.x
         dy = ty - agent.y
@@ -383,10 +785,8 @@ class SimulationEngine:
 
     # ... LÓGICAS DE AGENTES ...
     def _logic_reactive(self, agent, ws):
-        visible = self._get_visible_food(agent)
-        if visible:
-            target = self._find_nearest_dict_from_list(agent, visible)
-            if target: return self._get_direction_towards(agent, target['x'], target['y'])
+        target = self._nearest_visible_food(agent)
+        if target: return self._get_direction_towards(agent, target['x'], target['y'])
         valid = []
         for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)]:
             nx, ny = agent.x + dx, agent.y + dy
@@ -396,72 +796,120 @@ class SimulationEngine:
         return random.choice(valid) if valid else (0, 0)
 
     def _logic_explorer(self, agent, ws):
-        if not hasattr(agent, "visited"): agent.visited = set()
         agent.visited.add((agent.x, agent.y))
 
         # Prioridad: si ve comida, ir hacia la comida usando A* (o fallback directo)
-        visible_food = self._get_visible_food(agent)
-        if visible_food:
-            target = self._find_nearest_dict_from_list(agent, visible_food)
-            if target:
-                move = self._calculate_path_safe(agent, (target['x'], target['y']))
-                # Si A* no devuelve movimiento pero aún no estamos en la casilla, intentar moverse directamente
-                if move == (0, 0) and (agent.x, agent.y) != (target['x'], target['y']):
-                    return self._get_direction_towards(agent, target['x'], target['y'])
-                return move
+        target = self._nearest_visible_food(agent)
+        if target:
+            # Camino compartido: bajar por el campo de distancia hacia la comida
+            move = self._follow_food_field(agent)
+            if move: return move
+            move = self._calculate_path_safe(agent, (target['x'], target['y']))
+            # Si A* no devuelve movimiento pero aún no estamos en la casilla, intentar moverse directamente
+            if move == (0, 0) and (agent.x, agent.y) != (target['x'], target['y']):
+                return self._get_direction_towards(agent, target['x'], target['y'])
+            return move
 
         # Comportamiento exploratorio por defecto (vecinos no visitados)
-        neighbors = Pathfinding.get_neighbors(agent.x, agent.y, self.width, self.height, self.obstacles)
+        neighbors = Pathfinding.get_neighbors(agent.x, agent.y, self.width, self.height, self.obstacles,
+                                              grid=self.get_grid_map())
         unvisited = [pos for pos in neighbors if pos not in agent.visited]
         if unvisited: return self._target_to_move(agent, random.choice(unvisited))
         if neighbors: return self._target_to_move(agent, random.choice(neighbors))
         return 0, 0
 
     def _logic_collector(self, agent, ws):
-        visible_food = self._get_visible_food(agent)
-        if not visible_food: return self._logic_explorer(agent, ws)
-
-        # Usamos la versión que devuelve el diccionario para acceder a coordenadas
-        target_dict = self._find_nearest_dict_from_list(agent, visible_food)
-        if target_dict:
-            move = self._calculate_path_safe(agent, (target_dict['x'], target_dict['y']))
-            # Fallback: si A* no devuelve movimiento pero aún no estamos en la casilla objetivo,
-            # intentamos moverse directamente en la dirección del objetivo para evitar quedarse quieto.
-            if move == (0, 0) and (agent.x, agent.y) != (target_dict['x'], target_dict['y']):
-                return self._get_direction_towards(agent, target_dict['x'], target_dict['y'])
-            return move
-        return 0, 0
+        target_dict = self._nearest_visible_food(agent)
+        if not target_dict: return self._logic_explorer(agent, ws)
+
+        move = self._follow_food_field(agent)
+        if move: return move
+
+        move = self._calculate_path_safe(agent, (target_dict['x'], target_dict['y']))
+        # Fallback: si A* no devuelve movimiento pero aún no estamos en la casilla objetivo,
+        # intentamos moverse directamente en la dirección del objetivo para evitar quedarse quieto.
+        if move == (0, 0) and (agent.x, agent.y) != (target_dict['x'], target_dict['y']):
+            return self._get_direction_towards(agent, target_dict['x'], target_dict['y'])
+        return move
+
+    def _allocate_cooperative(self):
+        """
+        Reparte la comida visible entre todos los cooperativos de una vez (subasta
+        sobre los pasos reales hasta cada comida) en lugar de que cada uno reclame la
+        más cercana por orden de lista. Las asignaciones quedan en la pizarra de
+        reclamos y duran lo que su TTL: solo vuelven a subasta los agentes cuyo
+        reclamo venció, se comió o dejó de tener camino.
+        """
+        self._routes = {}
+        team = [a for a in self.agents if a.type == "cooperative" and a.energy > 0]
+        if not team:
+            return {}
+        claims = self.claims
+        grid_map = self.get_grid_map()
+        assignments = {}
+        bidders = []
+        for agent in team:
+            vision = self._get_vision_radius(agent)
+            # Un rodeo de más del doble del radio de visión no se considera
+            routes = local_routes(grid_map, (agent.x, agent.y),
+                                  [(f['x'], f['y']) for f in self._get_visible_food(agent)],
+                                  2 * vision)
+            self._routes[agent.id] = routes
+            held = claims.claimed_by(agent.id)
+            if held is not None and held in routes and self.grid.food_at(*held):
+                assignments[agent.id] = held
+                continue
+            if held is not None:
+                claims.release_agent(agent.id)
+            bidders.append(agent)
+        costs = {
+            agent.id: {cell: route[0] for cell, route in self._routes[agent.id].items()
+                       if not claims.taken(cell)}  # Reclamos de otros (TTL) se respetan
+            for agent in bidders
+        }
+        for agent_id, cell in auction_assignment(costs).items():
+            claims.claim(cell, agent_id)
+            assignments[agent_id] = cell
+        return assignments
 
     def _logic_cooperative(self, agent, ws):
-        claimed_locations = set()
-        for msg in self.messages:
-            if msg.get('type') == 'CLAIMED' and 'pos' in msg:
-                claimed_locations.add(msg['pos'])
-        visible_food = self._get_visible_food(agent)
-        available_food = [f for f in visible_food if (f['x'], f['y']) not in claimed_locations]
-        if not available_food: return self._logic_explorer(agent, ws)
-        target_dict = self._find_nearest_dict_from_list(agent, available_food)
-        if target_dict:
+        claims = self.claims
+        target_pos = self.assignments.get(agent.id)
+        if target_pos is None or not self.grid.food_at(*target_pos):
+            # Sin asignación (o alguien ya se la comió en este tick): la libre más cercana
+            target_dict = self._nearest_visible_food(agent, skip=lambda cell: claims.taken(cell, agent.id))
+            if not target_dict:
+                claims.release_agent(agent.id)
+                return self._logic_explorer(agent, ws)
             target_pos = (target_dict['x'], target_dict['y'])
-            self.messages.append({"type": "CLAIMED", "sender_id": agent.id, "pos": target_pos})
-            move = self._calculate_path_safe(agent, target_pos)
-            if move == (0, 0) and (agent.x, agent.y) != target_pos:
-                 return self._get_direction_towards(agent, target_pos[0], target_pos[1])
-            return move
-        return 0, 0
+            claims.claim(target_pos, agent.id)
+
+        # Si el campo compartido lleva a la misma comida, se baja por él sin buscar
+        if self._food_field_target(agent) == target_pos:
+            return self.get_food_field().next_move(agent.x, agent.y)
+
+        # La subasta ya recorrió el camino: su primer paso sirve si la estrategia
+        # del agente da caminos mínimos y el terreno no tiene pesos
+        route = self._routes.get(agent.id, {}).get(target_pos)
+        if (route is not None and self.terrain.uniform
+                and PathfindingStrategies.get(getattr(agent, "strategy", None)).shortest):
+            return self._target_to_move(agent, route[1])
+
+        move = self._calculate_path_safe(agent, target_pos)
+        if move == (0, 0) and (agent.x, agent.y) != target_pos:
+             return self._get_direction_towards(agent, target_pos[0], target_pos[1])
+        return move
 
     def _logic_competitive(self, agent, ws):
         visible_food = self._get_visible_food(agent)
         if not visible_food: return random.choice([(0,1), (0,-1), (1,0), (-1,0)])
         best_target = None
         best_score = -float('inf')
+        snapshot = self.snapshot
         for f in visible_food:
             my_dist = abs(agent.x - f['x']) + abs(agent.y - f['y'])
-            enemy_dist = float('inf')
-            for other in self.agents:
-                if other.id != agent.id:
-                    d = abs(other.x - f['x']) + abs(other.y - f['y'])
-                    if d < enemy_dist: enemy_dist = d
+            # Rival más cercano a esta comida: calculado una vez por tick y compartido
+            enemy_dist = snapshot.rival_distance((f['x'], f['y']), agent)
             score = -100 if enemy_dist <= my_dist else (100 - my_dist)
             if score > best_score:
                 best_score = score
@@ -484,17 +932,8 @@ class SimulationEngine:
         if not getattr(agent, "custom_code", None):
             return 0, 0
             
-        # Construimos la "Percepción" (lo que ve el agente)
-        visible_food = self._get_visible_food(agent)
-        perception = {
-            "x": agent.x,
-            "y": agent.y,
-            "energy": agent.energy,
-            "width": self.width,
-            "height": self.height,
-            "nearby_food": [(f['x'], f['y']) for f in visible_food],
-            "nearby_obstacles": [(o['x'], o['y']) for o in self.obstacles]
-        }
+        # Construimos la "Percepción" (lo que ve el agente): cada campo se calcula al pedirlo
+        perception = AgentPerception(self, agent)
         
         # IMPORTACIÓN SEGURA AQUÍ ADENTRO
         try:
@@ -509,39 +948,140 @@ class SimulationEngine:
             return 0, 0
 
     # --- HELPERS ---
+    def _food_field_target(self, agent):
+        """
+        Comida más cercana por camino real si está dentro del radio de visión (None si no).
+        El campo solo se construye cuando lo gastado en búsquedas individuales en este
+        tick ya supera lo que cuesta construirlo (a partir de ahí sale más barato).
+        """
+        if not PathfindingStrategies.get(getattr(agent, "strategy", None)).shortest:
+            return None  # El campo da caminos mínimos: no sirve para quien explora con DFS
+        if not self.terrain.uniform:
+            return None  # El campo mide pasos, no costo de terreno
+        field = self._current_food_field()
+        if field is None:
+            if not self.flow_fields or self._tick_search_time < self._food_field_cost:
+                return None
+            field = self.get_food_field()
+        d = field.distance(agent.x, agent.y)
+        if d is None or d == 0 or d > self._get_vision_radius(agent):
+            return None
+        target = field.source_at(agent.x, agent.y)
+        # Comida ya comida en este tick: el campo está desactualizado para este agente
+        return target if self.grid.food_at(*target) else None
+
+    def _follow_food_field(self, agent):
+        """Siguiente paso hacia la comida visible más cercana leyendo el campo compartido."""
+        if self._food_field_target(agent) is None:
+            return None
+        return self.get_food_field().next_move(agent.x, agent.y)
+
     def _target_to_move(self, agent, target_pos):
         return target_pos[0] - agent.x, target_pos[1] - agent.y
 
-    def _find_nearest_from_list(self, agent, food_list):
-        if not food_list: return None
-        target = None
-        min_dist = float('inf')
-        for f in food_list:
-            dist = abs(f['x'] - agent.x) + abs(f['y'] - agent.y)
-            if dist < min_dist:
-                min_dist = dist
-                target = (f['x'], f['y'])
-        return target
-
-    def _find_nearest_dict_from_list(self, agent, food_list):
-        if not food_list: return None
-        target = None
-        min_dist = float('inf')
-        for f in food_list:
-            dist = abs(f['x'] - agent.x) + abs(f['y'] - agent.y)
-            if dist < min_dist:
-                min_dist = dist
-                target = f
-        return target
-
     def _calculate_path_safe(self, agent, target):
         try:
             start = (agent.x, agent.y)
-            path = Pathfinding.a_star(start, target, self.width, self.height, self.obstacles)
-            if path and len(path) > 1:
-                return path[1][0] - agent.x, path[1][1] - agent.y
-            elif path and len(path) == 1:
-                return path[0][0] - agent.x, path[0][1] - agent.y
+            version = self.layout_version
+
+            # Si el mapa y la meta no cambiaron, seguimos el plan anterior sin buscar
+            plan = self._plans.get(agent.id)
+            if plan and plan[0] == version and plan[1] == target:
+                _, _, path, index = plan
+                # Avanzó un paso (o sigue donde estaba si otro agente le bloqueó)
+                for i in (index + 1, index):
+                    if i < len(path) and path[i] == start:
+                        self._plans[agent.id] = (version, target, path, i)
+                        return self._next_move_on_path(agent, path, i)
+
+            if not self._is_reachable(agent, target):
+                self._plans.pop(agent.id, None)
+                return 0, 0
+
+            requested = getattr(agent, "strategy", None)
+            strategy = PathfindingStrategies.get(requested)
+            # Por qué se busca con otra estrategia que la elegida (queda en search_stats)
+            override = None if strategy.name == requested else "unknown_strategy"
+            weighted = not self.terrain.uniform
+            if weighted and strategy.shortest:
+                # Con terreno el camino mínimo depende de los costos: se busca con pesos
+                if not strategy.weighted:
+                    strategy = PathfindingStrategies.get("a_star")
+                    override = "weighted_terrain"
+            elif strategy.shortest and self.width * self.height >= HIERARCHICAL_MIN_CELLS:
+                # Mapa grande: A* plano por agente es demasiado caro, se usa el grafo de clusters
+                self.get_cluster_graph()
+                strategy = PathfindingStrategies.get("hpa")
+                override = "large_map"
+            elif strategy.name == "alt" and self.step_count - self._layout_changed_at < ALT_STABLE_TICKS:
+                # Las tablas de landmarks se rehacen con cada versión del mapa: con muros
+                # que cambian seguido cuestan más que lo que ahorran
+                strategy = PathfindingStrategies.get("a_star")
+                override = "unstable_layout"
+
+            if plan and plan[1] == target and not strategy.shortest:
+                # Sin garantía de camino mínimo basta con que el resto del plan siga libre
+                _, _, path, index = plan
+                changes = self.grid.layout_changes_since(plan[0])
+                for i in (index + 1, index):
+                    if (changes is not None and i < len(path) and path[i] == start
+                            and changes.isdisjoint(path[i:])):
+                        self._plans[agent.id] = (version, target, path, i)
+                        return self._next_move_on_path(agent, path, i)
+            # Las estrategias de camino mínimo comparten la caché; las demás (DFS) tienen la suya
+            # Con terreno también dependen de la versión de los costos
+            if weighted:
+                cache_goal = (target, strategy.name, self.terrain.version)
+            else:
+                cache_goal = target if strategy.shortest else (target, strategy.name)
+            path = self.path_cache.get(version, start, cache_goal)
+            if path is None:
+                started = time.perf_counter()
+                if plan and plan[1] == target and strategy.shortest and not weighted:
+                    # Misma meta pero cambió el mapa (p. ej. muros dinámicos): se repara la búsqueda
+                    path, stats = self._replan_incremental(agent, start, target)
+                    override = "dynamic_walls"
+                else:
+                    self._replanners.pop(agent.id, None)
+                    path, stats = PathfindingStrategies.find(strategy.name, start, target, self.width,
+                                                             self.height, self.obstacles, grid=self.get_grid_map(),
+                                                             costs=self.terrain if weighted else None)
+                stats["requested"] = requested
+                stats["override"] = override if stats.get("algorithm") != requested else None
+                agent.search_stats.record(stats)
+                path = self.path_cache.put(version, start, cache_goal, path)
+                self._tick_search_time += time.perf_counter() - started
+            if path:
+                self._plans[agent.id] = (version, target, path, 0)
+                return self._next_move_on_path(agent, path, 0)
+            self._plans.pop(agent.id, None)
         except Exception:
             pass
+        return 0, 0
+
+    def _replan_incremental(self, agent, start, target):
+        """
+        D* Lite por agente: conserva la búsqueda hacia la misma meta entre ticks y
+        solo repara las celdas que cambiaron desde la última vez.
+        """
+        version = self.layout_version
+        planner = self._replanners.get(agent.id)
+        changes = None
+        if planner is not None and planner.goal == target:
+            changes = self.grid.layout_changes_since(planner.version)
+        started = time.perf_counter()
+        if changes is None or len(changes) > MAX_INCREMENTAL_CHANGES:
+            planner = DStarLite(self.get_grid_map(), start, target, version=version)
+            self._replanners[agent.id] = planner
+        else:
+            planner.update(self.get_grid_map(), start, changes, version=version)
+        path = planner.path()
+        stats = {"algorithm": "dstar_lite", "expanded": planner.expanded,
+                 "frontier_peak": planner.frontier_peak,
+                 "micros": int((time.perf_counter() - started) * 1e6)}
+        return path, stats
+
+    def _next_move_on_path(self, agent, path, index):
+        if index + 1 < len(path):
+            return path[index + 1][0] - agent.x, path[index + 1][1] - agent.y
         return 0, 0
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Set
 from fastapi import WebSocket
 
 
@@ -6,15 +6,20 @@ class ConnectionManager:
     def __init__(self):
         # workspace_id -> {session_id: websocket}
         self.active_connections: Dict[str, Dict[str, WebSocket]] = {}
+        # Conexiones que pidieron el stream en modo delta (?delta=1)
+        self.delta_connections: Set[WebSocket] = set()
 
-    async def connect(self, websocket: WebSocket, workspace_id: str, session_id: str):
+    async def connect(self, websocket: WebSocket, workspace_id: str, session_id: str, delta: bool = False):
         await websocket.accept()
         if workspace_id not in self.active_connections:
             self.active_connections[workspace_id] = {}
         self.active_connections[workspace_id][session_id] = websocket
-        print(f"[Manager] Conexion registrada (workspace={workspace_id}, session={session_id})")
+        if delta:
+            self.delta_connections.add(websocket)
+        print(f"[Manager] Conexion registrada (workspace={workspace_id}, session={session_id}, delta={delta})")
 
     def disconnect(self, websocket: WebSocket, workspace_id: str, session_id: str | None = None):
+        self.delta_connections.discard(websocket)
         rooms = [workspace_id] if workspace_id else list(self.active_connections.keys())
         for room in rooms:
             sessions = self.active_connections.get(room, {})
@@ -43,5 +48,23 @@ class ConnectionManager:
                 # Si falla una conexión (ej: usuario cerró pestaña), seguimos
                 pass
 
+    async def send_frames(self, connections, full_frame, delta_frame):
+        """
+        Envía un tick ya construido: el frame delta a las conexiones en modo delta
+        y el WORLD_UPDATE completo al resto. Los frames pueden llegar como dict o
+        ya codificados en JSON (motores alojados en workers); estos se reenvían tal cual.
+        """
+        for connection in list(connections):
+            message = delta_frame if connection in self.delta_connections else full_frame
+            if message is None:
+                continue
+            try:
+                if isinstance(message, str):
+                    await connection.send_text(message)
+                else:
+                    await connection.send_json(message)
+            except Exception:
+                pass
+
 
 manager = ConnectionManager()
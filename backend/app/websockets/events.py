@@ -1,17 +1,80 @@
 # backend/app/websockets/events.py
 
+import asyncio
+
 # 1. IMPORTAMOS LA SEGURIDAD
 from app.services.sandbox.code_parser import CodeParser
+from app.core.config import settings
+
+FAST_FORWARD_COMMANDS = {"RUN_STEPS", "RUN_UNTIL"}
+
+
+BUSY_ERROR = {"type": "ERROR", "message": "Simulación ocupada: avance rápido en curso"}
+
+
+def _fast_forward_steps(cmd_type: str, data: dict):
+    # RUN_UNTIL no fija pasos: corre hasta una condición de parada (con tope)
+    if cmd_type != "RUN_STEPS":
+        return None
+    steps = data.get("steps", 1)
+    if isinstance(steps, (int, float, str)) and not isinstance(steps, bool):
+        try:
+            return int(steps)
+        except (ValueError, OverflowError):
+            pass
+    raise ValueError("'steps' debe ser un número entero")
+
+
+def run_and_summarize(engine, steps=None, reserved=False):
+    """
+    Avanza el motor `steps` pasos (o hasta una condición de parada si es None) y
+    retorna el estado final junto con los contadores resumen.
+    """
+    summary = engine.run_steps(steps, settings.MAX_FAST_FORWARD_STEPS, reserved=reserved)
+    state = engine.get_state()
+    state["data"]["runSummary"] = summary
+    return state
+
+
+async def fast_forward(engine, steps=None):
+    """
+    Igual que run_and_summarize pero fuera del event loop. El motor se reserva aquí,
+    antes de pasar al hilo, y queda tomado hasta tener el estado final.
+    """
+    with engine.reserve_fast_forward():
+        return await asyncio.to_thread(run_and_summarize, engine, steps, True)
+
 
 async def process_command(engine, cmd_type: str, data: dict):
     """
     Recibe un comando y ejecuta la acción en el motor.
     Retorna el estado actualizado (dict) para notificar al cliente.
     """
+    # El avance rápido corre en un hilo para no bloquear a las demás conexiones
+    if cmd_type in FAST_FORWARD_COMMANDS:
+        if engine.is_fast_forwarding:
+            return BUSY_ERROR
+        try:
+            steps = _fast_forward_steps(cmd_type, data)
+        except ValueError as e:
+            return {"type": "ERROR", "message": str(e)}
+        return await fast_forward(engine, steps)
+    return apply_command(engine, cmd_type, data)
+
+
+def apply_command(engine, cmd_type: str, data: dict):
+    """
+    Versión síncrona de process_command (la usan también los procesos worker
+    del EngineHost, donde el avance rápido corre directamente).
+    """
     
     if cmd_type != "STEP": 
         print(f"⚙️ Procesando evento: {cmd_type}")
 
+    # Durante un avance rápido el motor está ocupado en otro hilo
+    if engine.is_fast_forwarding:
+        return BUSY_ERROR
+
     # --- COMANDOS DE CONTROL ---
     if cmd_type == "START":
         engine.is_running = True
@@ -21,16 +84,36 @@ async def process_command(engine, cmd_type: str, data: dict):
         engine.reset()
     elif cmd_type == "STEP":
         engine.step()
+    elif cmd_type in FAST_FORWARD_COMMANDS:
+        try:
+            steps = _fast_forward_steps(cmd_type, data)
+        except ValueError as e:
+            return {"type": "ERROR", "message": str(e)}
+        return run_and_summarize(engine, steps)
     elif cmd_type == "SET_SPEED":
         spd = data.get("speed", 1)
         if spd > 0: engine.speed = 0.5 / spd
 
     # --- CONFIGURACIÓN ---
     elif cmd_type == "RESIZE_GRID":
-        width = int(data.get("width", 25))
-        height = int(data.get("height", 25))
+        # Mismo rango que permite guardar el proyecto (settings.MIN/MAX_GRID_SIZE)
+        width = max(settings.MIN_GRID_SIZE, min(settings.MAX_GRID_SIZE, int(data.get("width", 25))))
+        height = max(settings.MIN_GRID_SIZE, min(settings.MAX_GRID_SIZE, int(data.get("height", 25))))
         engine.update_dimensions(width, height)
     
+    elif cmd_type == "SET_TERRAIN":
+        # Costos en bloque: {"fill": costo, "cells": [{"x", "y", "cost"}, ...]}
+        cells = data.get("cells")
+        if cells is not None and not isinstance(cells, list):
+            return {"type": "ERROR", "message": "'cells' debe ser una lista de {x, y, cost}"}
+        try:
+            engine.set_terrain(cells=cells, fill=data.get("fill"))
+        except ValueError as e:
+            return {"type": "ERROR", "message": str(e)}
+
+    elif cmd_type == "CLEAR_TERRAIN":
+        engine.set_terrain(fill=1.0)
+
     elif cmd_type == "UPDATE_CONFIG":
         engine.update_config(data)
 
@@ -45,11 +128,7 @@ async def process_command(engine, cmd_type: str, data: dict):
                 CodeParser.validate(new_code)
                 
                 # Si pasa la validación, aplicamos los cambios
-                count = 0
-                for agent in engine.agents:
-                    if getattr(agent, "type", "") == target_type:
-                        agent.custom_code = new_code
-                        count += 1
+                count = engine.set_custom_code(new_code, agent_type=target_type)
                 print(f"✅ Código seguro actualizado para {count} agentes.")
             
             except Exception as e:
@@ -94,15 +173,22 @@ async def process_command(engine, cmd_type: str, data: dict):
         moves = data.get("moves", [])
         count = 0
         for move in moves:
-            agent = next((a for a in engine.agents if a.id == move['id']), None)
-            if agent:
-                agent.x = max(0, min(engine.width - 1, move['x']))
-                agent.y = max(0, min(engine.height - 1, move['y']))
+            if engine.move_agent(move['id'], move['x'], move['y']):
                 count += 1
         print(f"📦 Se movieron {count} agentes manualmente.")    
 
     elif cmd_type == "REMOVE_ELEMENT":
         engine.remove_at(data.get("x"), data.get("y"))
 
+    # --- CONSULTAS ---
+    elif cmd_type == "GET_PATH_HISTORY":
+        # Historial completo solo bajo demanda (los frames en vivo llevan la cola)
+        agent_id = data.get("agent_id")
+        return engine.get_path_history([agent_id] if agent_id else None)
+
+    elif cmd_type == "GET_COVERAGE":
+        # Mapa de calor de visitas por celda y porcentaje de cobertura
+        return engine.get_coverage()
+
     # Retornamos el estado actual
     return engine.get_state()
\ No newline at end of file
@@ -138,8 +138,8 @@ CREATE TABLE projects (
     deleted_at TIMESTAMP,
     
     -- Constraints
-    CONSTRAINT check_grid_width CHECK (grid_width >= 5 AND grid_width <= 50),
-    CONSTRAINT check_grid_height CHECK (grid_height >= 5 AND grid_height <= 50),
+    CONSTRAINT check_grid_width CHECK (grid_width >= 5 AND grid_width <= 1000),
+    CONSTRAINT check_grid_height CHECK (grid_height >= 5 AND grid_height <= 1000),
     CONSTRAINT check_cell_size CHECK (cell_size >= 10 AND cell_size <= 50),
     CONSTRAINT check_difficulty CHECK (difficulty IN ('beginner', 'intermediate', 'advanced', 'expert') OR difficulty IS NULL)
 );
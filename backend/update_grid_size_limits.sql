@@ -0,0 +1,13 @@
+-- ================================================================
+-- AMPLIAR LÍMITE DE TAMAÑO DEL GRID (5-50 -> 5-1000)
+-- Ejecutar en pgAdmin sobre la base de datos 'agents_db'
+-- (las bases nuevas ya se crean con el límite nuevo)
+-- ================================================================
+
+ALTER TABLE projects DROP CONSTRAINT IF EXISTS check_grid_width;
+ALTER TABLE projects DROP CONSTRAINT IF EXISTS check_grid_height;
+
+ALTER TABLE projects
+    ADD CONSTRAINT check_grid_width CHECK (grid_width >= 5 AND grid_width <= 1000);
+ALTER TABLE projects
+    ADD CONSTRAINT check_grid_height CHECK (grid_height >= 5 AND grid_height <= 1000);
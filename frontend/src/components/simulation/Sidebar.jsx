@@ -23,6 +23,9 @@ import {
 import { useSimulation } from "../../context/SimulationContext";
 import PropertyConfigModal from "./PropertyConfigModal";
 
+// Tope de ancho/alto del mapa (igual que settings.MAX_GRID_SIZE en el backend)
+const MAX_GRID_SIZE = 1000;
+
 // --- A. DEFINICIÓN DE MODOS DE HERRAMIENTA ---
 const TOOL_MODES = [
   { id: "select", label: "Seleccionar", icon: MousePointer2 },
@@ -401,7 +404,7 @@ export default function Sidebar({ onSelectElement }) {
                   <input
                     type="range"
                     min="10"
-                    max="50"
+                    max={MAX_GRID_SIZE}
                     value={gridConfig?.width || 20}
                     disabled={isRunning}
                     onChange={(e) => handleGridResize("width", e.target.value)}
@@ -418,7 +421,7 @@ export default function Sidebar({ onSelectElement }) {
                   <input
                     type="range"
                     min="10"
-                    max="50"
+                    max={MAX_GRID_SIZE}
                     value={gridConfig?.height || 20}
                     disabled={isRunning}
                     onChange={(e) => handleGridResize("height", e.target.value)}
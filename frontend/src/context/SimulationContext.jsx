@@ -14,6 +14,8 @@ const initialState = {
   agents: [],
   food: [],
   obstacles: [],
+  terrain: null,
+  coverage: null,
   gridConfig: { width: 25, height: 25, cellSize: 20 },
   selectedTool: "select",
   code: "",
@@ -29,6 +31,33 @@ const initialState = {
   },
 };
 
+// Aplica una sección {updated, removed} de un WORLD_DELTA sobre una lista con id
+function mergeEntities(list, section, mergeItem = (_prev, next) => next) {
+  if (!section) return list;
+  const removed = new Set(section.removed || []);
+  const byId = new Map();
+  list.forEach((item) => {
+    if (!removed.has(item.id)) byId.set(item.id, item);
+  });
+  (section.updated || []).forEach((item) => {
+    byId.set(item.id, mergeItem(byId.get(item.id), item));
+  });
+  return Array.from(byId.values());
+}
+
+// Los agentes del delta traen solo los puntos nuevos del camino (pathAppend);
+// pathTotal indica cuántos faltan y pathLength el largo de la cola a conservar
+function mergeAgent(prev, next) {
+  if (next.path || !next.pathAppend) return next;
+  const { pathAppend, pathLength, ...rest } = next;
+  const have = (prev && prev.path) || [];
+  const missing = next.pathTotal - ((prev && prev.pathTotal) || 0);
+  const path = (
+    missing > 0 ? have.concat(pathAppend.slice(-missing)) : have
+  ).slice(-pathLength);
+  return { ...rest, path };
+}
+
 function simulationReducer(state, action) {
   switch (action.type) {
     case "SET_GRID_CONFIG":
@@ -42,6 +71,12 @@ function simulationReducer(state, action) {
         agents: action.payload.agents || [],
         food: action.payload.food || [],
         obstacles: action.payload.obstacles || [],
+        terrain: action.payload.terrain ?? null,
+        // La cobertura no viaja en todos los frames: se conserva la última recibida
+        coverage:
+          action.payload.coverage !== undefined
+            ? action.payload.coverage
+            : state.coverage,
         step: action.payload.step || 0,
         gridConfig: {
           ...state.gridConfig,
@@ -56,6 +91,28 @@ function simulationReducer(state, action) {
           ? { ...state.simulationConfig, ...action.payload.config }
           : state.simulationConfig,
       };
+    case "APPLY_WORLD_DELTA":
+      return {
+        ...state,
+        agents: mergeEntities(state.agents, action.payload.agents, mergeAgent),
+        food: mergeEntities(state.food, action.payload.food),
+        obstacles: mergeEntities(state.obstacles, action.payload.obstacles),
+        // El terreno solo viaja en el delta cuando cambió
+        terrain:
+          action.payload.terrain !== undefined
+            ? action.payload.terrain
+            : state.terrain,
+        step: action.payload.step || 0,
+        gridConfig: {
+          ...state.gridConfig,
+          width: action.payload.width || state.gridConfig.width,
+          height: action.payload.height || state.gridConfig.height,
+        },
+        isRunning:
+          action.payload.isRunning !== undefined
+            ? action.payload.isRunning
+            : state.isRunning,
+      };
     case "START_SIMULATION":
       return { ...state, isRunning: true };
     case "STOP_SIMULATION":
@@ -113,6 +170,7 @@ export function SimulationProvider({
     }
     url.searchParams.set("instance", instance);
     url.searchParams.set("readonly", readonlyFlag);
+    url.searchParams.set("delta", "1");
 
     if (socketRef.current) {
       try {
@@ -134,6 +192,8 @@ export function SimulationProvider({
         const message = JSON.parse(event.data);
         if (message.type === "WORLD_UPDATE") {
           dispatch({ type: "UPDATE_WORLD", payload: message.data });
+        } else if (message.type === "WORLD_DELTA") {
+          dispatch({ type: "APPLY_WORLD_DELTA", payload: message.data });
         }
       } catch (e) {
         console.error("Error socket:", e);
@@ -191,6 +251,8 @@ export function SimulationProvider({
       agents: state.agents,
       food: state.food,
       obstacles: state.obstacles,
+      terrain: state.terrain,
+      coverage: state.coverage,
       step: state.step,
     },
     selectedTemplate: state.selectedTemplate,
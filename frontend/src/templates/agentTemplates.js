@@ -163,12 +163,16 @@ const TEMPLATES = {
 # - 'perception': Un diccionario con datos del entorno.
 # - 'random', 'math': Librerías estándar.
 
-# Ejemplo de percepción:
+# Ejemplo de percepción (solo lo que está dentro de tu radio de visión):
 # perception = {
 #    "x": 5, "y": 5, "energy": 100,
 #    "nearby_food": [(6,5), (5,6)],
 #    "nearby_obstacles": [(4,4)]
 # }
+# Consultas rápidas:
+#   perception.is_blocked(x, y)      -> True si no se puede pasar
+#   perception.food_in_radius(r)     -> comida a distancia <= r
+#   perception.get_neighbors()       -> casillas vecinas libres
 
 # TU CÓDIGO DEBE TERMINAR DEVOLVIENDO UNA TUPLA (dx, dy)
 
@@ -75,8 +75,8 @@ create table if not exists projects (
   created_at timestamptz not null default now(),
   updated_at timestamptz not null default now(),
   deleted_at timestamptz,
-  constraint check_grid_width check (grid_width between 5 and 50),
-  constraint check_grid_height check (grid_height between 5 and 50),
+  constraint check_grid_width check (grid_width between 5 and 1000),
+  constraint check_grid_height check (grid_height between 5 and 1000),
   constraint check_cell_size check (cell_size between 10 and 50),
   constraint check_difficulty check (
     difficulty in ('beginner','intermediate','advanced','expert') or difficulty is null
@@ -0,0 +1,102 @@
+import sys, os, random, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.algorithms.grid import GridMap
+from app.algorithms.pathfinding import Pathfinding
+from app.algorithms.jps import JumpTables
+from app.algorithms.landmarks import Landmarks
+
+# Compara A*, A* con landmarks (ALT) y Jump Point Search (nodos expandidos y tiempo) en tres tipos de mapa.
+# Uso: python scripts/benchmark_pathfinding.py [tamaño] [consultas]
+
+SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+QUERIES = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+SEED = 42
+
+
+def layout_open(size, rnd):
+    # Campo abierto con algunos obstáculos sueltos (~10%)
+    return {(rnd.randrange(size), rnd.randrange(size)) for _ in range(size * size // 10)}
+
+
+def layout_rooms(size, rnd):
+    # Habitaciones de 10x10 separadas por muros con una puerta por lado
+    walls = set()
+    for k in range(0, size, 10):
+        for i in range(size):
+            walls.add((k, i))
+            walls.add((i, k))
+    for rx in range(0, size, 10):
+        for ry in range(0, size, 10):
+            walls.discard((rx, ry + rnd.randint(1, 8)))
+            walls.discard((rx + rnd.randint(1, 8), ry))
+    return walls
+
+
+def layout_maze(size, rnd):
+    # Laberinto perfecto (DFS aleatorio) sobre celdas impares
+    walls = {(x, y) for x in range(size) for y in range(size)}
+    stack = [(1, 1)]
+    walls.discard((1, 1))
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy, dx, dy) for dx, dy in [(2, 0), (-2, 0), (0, 2), (0, -2)]
+                   if 0 < x + dx < size - 1 and 0 < y + dy < size - 1 and (x + dx, y + dy) in walls]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny, dx, dy = rnd.choice(options)
+        walls.discard((x + dx // 2, y + dy // 2))
+        walls.discard((nx, ny))
+        stack.append((nx, ny))
+    return walls
+
+
+def run(name, walls, rnd):
+    obstacles = [{"x": x, "y": y} for x, y in walls]
+    grid = GridMap(SIZE, SIZE, obstacles)
+    free = [(x, y) for x in range(SIZE) for y in range(SIZE) if (x, y) not in walls]
+    pairs = [(rnd.choice(free), rnd.choice(free)) for _ in range(QUERIES)]
+
+    # Las tablas de saltos se construyen una vez por versión del mapa (el motor las reutiliza)
+    started = time.perf_counter()
+    JumpTables.for_grid(grid)
+    tables_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    Landmarks.for_grid(grid)
+    landmarks_ms = (time.perf_counter() - started) * 1000
+
+    results = {}
+    for algo in ("a_star", "alt", "jps"):
+        finder = getattr(Pathfinding, algo)
+        expanded = 0
+        lengths = []
+        started = time.perf_counter()
+        for start, goal in pairs:
+            stats = {}
+            path = finder(start, goal, SIZE, SIZE, obstacles, grid=grid, stats=stats)
+            expanded += stats.get("expanded", 0)
+            lengths.append(len(path))
+        elapsed = time.perf_counter() - started
+        results[algo] = (expanded, elapsed, lengths)
+
+    same = results["a_star"][2] == results["jps"][2] == results["alt"][2]
+    print(f"\n--- Mapa: {name} ({SIZE}x{SIZE}, {len(walls)} muros, {QUERIES} consultas) ---")
+    for algo, (expanded, elapsed, _) in results.items():
+        print(f"{algo:7s} expandidos/consulta: {expanded / QUERIES:8.1f}   "
+              f"tiempo/consulta: {elapsed / QUERIES * 1e6:8.1f} µs")
+    print(f"Tablas de saltos JPS (una vez por mapa): {tables_ms:.1f} ms")
+    print(f"Distancias de landmarks ALT (una vez por mapa): {landmarks_ms:.1f} ms")
+    # Con muros que cambian las tablas se rehacen: esto es lo que cuesta ALT si duran QUERIES búsquedas
+    alt_total = (results["alt"][1] * 1000 + landmarks_ms) / QUERIES * 1000
+    print(f"ALT con tablas repartidas en {QUERIES} consultas: {alt_total:.1f} µs/consulta "
+          f"(A*: {results['a_star'][1] / QUERIES * 1e6:.1f} µs)")
+    print("Largo de caminos igual en todos:", "OK" if same else "DIFERENTE")
+    return same
+
+
+if __name__ == "__main__":
+    rnd = random.Random(SEED)
+    ok = True
+    for name, build in [("abierto", layout_open), ("habitaciones", layout_rooms), ("laberinto", layout_maze)]:
+        ok &= run(name, build(SIZE, rnd), rnd)
+    print("\nResumen:", "OK" if ok else "ERROR: caminos de distinto largo")